@@ -6,4 +6,5 @@ admin.site.register(Book)
 admin.site.register(Target)
 admin.site.register(TargetName)
 admin.site.register(Curation)
-admin.site.register(Marc)
\ No newline at end of file
+admin.site.register(Marc)
+admin.site.register(SearchQueryLog)
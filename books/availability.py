@@ -0,0 +1,77 @@
+# 소장 상태 일괄 조회 (로비 전시/키오스크)
+# 도서마다 (id, book_status, 반납예정일, 예약 대기 수)를 한 번의 쿼리로 계산한다.
+# 같은 조회는 짧은 시간(settings.BOOK_AVAILABILITY_TTL, 기본 15초) 캐시해 두고, 만료 전 상태 변경은 반영하지 않는다.
+# 캐시는 공유 캐시일 때만 사용 (books.cache.shared_cache), 프로세스별 메모리 캐시면 매번 조회한다.
+# packed 형식: {"fields": [...], "statuses": [...], "rows": [id, 상태 번호, 반납예정일, 대기 수, id, ...]}
+
+import hashlib
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import shared_cache
+
+FIELDS = ("id", "book_status", "due_date", "queue_length")
+MAX_IDS = 500
+
+
+def _cache():
+    return shared_cache(getattr(settings, "BOOK_AVAILABILITY_CACHE", "default"))
+
+
+def _ttl() -> int:
+    return getattr(settings, "BOOK_AVAILABILITY_TTL", 15)
+
+
+def _key(book_ids: List[int] | None, location: str | None) -> str:
+    raw = f"{','.join(map(str, book_ids or ()))}|{location or ''}"
+    return f"book:availability:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def fetch_rows(book_ids: List[int] | None, location: str | None) -> List[Tuple]:
+    from rentals.models import Rental
+    from reservations.models import Reservation
+    from .models import Book
+
+    due = Rental.objects.filter(book=OuterRef("pk"), is_returned=False).values("due_date")[:1]
+    queue = (Reservation.objects.active().filter(book=OuterRef("pk")).order_by()
+             .values("book_id").annotate(n=Count("pk")).values("n"))
+    books = Book.objects.all()
+    if book_ids is not None:
+        books = books.filter(pk__in=book_ids)
+    if location:
+        books = books.filter(location=location)
+    return list(
+        books.annotate(due_date=Subquery(due), queue_length=Coalesce(Subquery(queue), 0))
+             .order_by("pk")
+             .values_list(*FIELDS)
+    )
+
+
+def availability(book_ids: Iterable[int] | None = None, location: str | None = None) -> List[Tuple]:
+    # [(id, book_status, due_date, queue_length), ...] (id 순)
+    if book_ids is not None:
+        book_ids = sorted(set(book_ids))
+    key = _key(book_ids, location)
+    cache = _cache()
+    if cache is None:
+        return fetch_rows(book_ids, location)
+    rows = cache.get(key)
+    if rows is None:
+        rows = fetch_rows(book_ids, location)
+        cache.set(key, rows, _ttl())
+    return rows
+
+
+def pack(rows: List[Tuple]) -> dict:
+    # 상태는 statuses의 번호, 반납예정일은 "YYYY-MM-DD" 또는 None, 행은 한 배열로 이어 붙임
+    from .models import BookStatus
+
+    statuses = list(BookStatus.values)
+    index = {value: i for i, value in enumerate(statuses)}
+    flat = []
+    for book_id, book_status, due_date, queue_length in rows:
+        flat += (book_id, index.get(book_status), due_date.isoformat() if due_date else None, queue_length)
+    return {"fields": list(FIELDS), "statuses": statuses, "rows": flat}
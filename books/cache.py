@@ -0,0 +1,109 @@
+# 도서 상세 응답 캐시
+# 키: book:<id>:detail:<버전>. Book/Marc/Target/Curation이 바뀌면 커밋 후 버전을 올려 이전 응답을 버린다.
+# 캐시 백엔드는 settings.BOOK_DETAIL_CACHE (기본 "default"). 버전 증가가 모든 웹 워커와 관리 명령(import_books 등)에
+# 닿아야 하므로 공유 캐시(Redis 등)일 때만 켠다. 프로세스별 메모리 캐시면 캐시 없이 동작한다. (shared_cache)
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+HITS_KEY = "book:detail:hits"
+MISSES_KEY = "book:detail:misses"
+
+
+def shared_cache(alias: str):
+    # 여러 프로세스가 함께 보는 캐시, 프로세스별 메모리 캐시면 None
+    # (settings.BOOK_CACHE_ALLOW_LOCAL = True면 허용: 테스트, 단일 프로세스 개발 서버)
+    cache = caches[alias]
+    if isinstance(cache, LocMemCache) and not getattr(settings, "BOOK_CACHE_ALLOW_LOCAL", False):
+        return None
+    return cache
+
+
+def _cache():
+    return shared_cache(getattr(settings, "BOOK_DETAIL_CACHE", "default"))
+
+
+def _ttl() -> int:
+    return getattr(settings, "BOOK_DETAIL_CACHE_TTL", 600)  # 기본 10분
+
+
+def _version_key(book_id) -> str:
+    return f"book:{book_id}:version"
+
+
+def _incr(key: str):
+    cache = _cache()
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # add와 incr 사이에 만료된 경우
+            cache.set(key, 1, None)
+
+
+def version(book_id) -> int:
+    # 버전 키가 없으면(만료/삭제) 이전 값과 겹치지 않도록 현재 시각으로 시작
+    cache = _cache()
+    key = _version_key(book_id)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key)
+    return value
+
+
+def get_detail(book_id):
+    # (캐시된 응답 또는 None, 저장할 때 쓸 버전), 공유 캐시가 없으면 (None, None)
+    if _cache() is None:
+        return None, None
+    ver = version(book_id)
+    data = _cache().get(f"book:{book_id}:detail:{ver}")
+    _incr(HITS_KEY if data is not None else MISSES_KEY)
+    return data, ver
+
+
+def set_detail(book_id, ver, data):
+    if ver is None or _cache() is None:
+        return
+    _cache().set(f"book:{book_id}:detail:{ver}", data, _ttl())
+
+
+def _bump(book_id):
+    cache = _cache()
+    if cache is None:
+        return
+    key = _version_key(book_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def invalidate(book_id):
+    # 트랜잭션 안이면 커밋 후 (일괄 import 중 롤백된 변경은 반영하지 않음)
+    if book_id is not None:
+        transaction.on_commit(lambda: _bump(book_id))
+
+
+def invalidate_many(book_ids):
+    book_ids = list(book_ids)
+    if book_ids:
+        transaction.on_commit(lambda: [_bump(pk) for pk in book_ids])
+
+
+def stats() -> dict:
+    cache = _cache()
+    if cache is None:
+        return {"enabled": False, "hits": 0, "misses": 0, "hit_rate": None}
+    hits, misses = cache.get(HITS_KEY, 0), cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {"enabled": True, "hits": hits, "misses": misses, "hit_rate": round(hits / total, 4) if total else None}
+
+
+def reset_stats():
+    if _cache() is not None:
+        _cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,117 @@
+# 변경 피드 (오프라인 목록 캐시 동기화, /books/changes/?since=<seq>)
+# Book/Marc/Target/Curation이 바뀌면 BookChange에 한 행을 남기고, 그 id를 변경 순번(seq)으로 쓴다.
+# 행은 커밋 후에 넣는다: 긴 트랜잭션(import_books 등)의 변경이 나중에 커밋되면서 이미 지나간 seq에 끼어들지 않도록.
+# 롤백된 변경은 남지 않는다.
+#
+# MySQL(InnoDB)은 id를 INSERT 시작 때 나눠 주므로, 동시에 넣는 두 행 중 id 11이 id 10보다 먼저 보일 수 있다.
+# 그때 11까지 읽은 클라이언트가 since=11로 넘어가면 10을 놓친다. 그래서 읽은 범위에 빈 id가 있고
+# 그 뒤 행이 아직 SETTLE_SECONDS보다 새것이면, 응답 seq를 빈 id 앞에서 멈춘다.
+# 클라이언트는 다음 요청에서 그 구간을 다시 읽는다 (같은 변경을 두 번 받을 수 있음, upsert/delete라 무해).
+# 그보다 오래된 빈 id는 롤백 등으로 영영 채워지지 않는 것으로 보고 넘어간다.
+#
+# 보존: prune()이 BOOK_CHANGES_RETENTION_DAYS(기본 30일)보다 오래된 행을 정리한다 (prune_book_changes, cron).
+# 같은 도서의 더 새 행이 있는 행은 지워도 어떤 since에서든 결과가 같다 (도서마다 마지막 변경만 보내므로).
+# 오래된 삭제 기록도 지우는데, 그러면 그 seq보다 작은 since로는 삭제를 놓치므로
+# 지운 최대 seq를 BookChangeFloor에 남기고, since가 0보다 크고 그보다 작으면 피드가 410을 돌려준다.
+# 클라이언트는 410을 받으면 목록 캐시를 비우고 since=0부터 다시 받는다.
+
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+MAX_LIMIT = 1000
+
+
+def _settle_seconds() -> float:
+    return getattr(settings, "BOOK_CHANGES_SETTLE_SECONDS", 10)
+
+
+def _retention_days() -> int:
+    return getattr(settings, "BOOK_CHANGES_RETENTION_DAYS", 30)
+
+
+def _write(book_ids: List[int], deleted: bool):
+    from .models import BookChange
+
+    BookChange.objects.bulk_create([BookChange(book_id=pk, deleted=deleted) for pk in book_ids])
+
+
+def record(book_ids: Iterable[int], deleted: bool = False):
+    book_ids = [pk for pk in dict.fromkeys(book_ids) if pk is not None]
+    if book_ids:
+        transaction.on_commit(lambda: _write(book_ids, deleted))
+
+
+def latest_seq() -> int:
+    from .models import BookChange
+
+    return BookChange.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+
+def settled_seq(since: int, rows: List[Tuple]) -> int:
+    # rows: (seq, changed_at) 순서대로, 아직 채워질 수 있는 빈 id 앞까지의 seq
+    cutoff = timezone.now() - timedelta(seconds=_settle_seconds())
+    seq = since
+    for pk, changed_at in rows:
+        if pk != seq + 1 and changed_at > cutoff:
+            break
+        seq = pk
+    return seq
+
+
+def changes_since(since: int, limit: int) -> Tuple[int, bool, Dict[int, bool]]:
+    # (다음 since로 쓸 seq, 더 남았는지, {book_id: 삭제 여부}) - 같은 도서는 마지막 변경만
+    from .models import BookChange
+
+    rows = list(BookChange.objects.filter(pk__gt=since).order_by("pk")
+                .values_list("pk", "book_id", "deleted", "changed_at")[:limit + 1])
+    more = len(rows) > limit
+    rows = rows[:limit]
+    latest = {book_id: deleted for _, book_id, deleted, _ in rows}
+    return settled_seq(since, [(pk, changed_at) for pk, _, _, changed_at in rows]), more, latest
+
+
+def floor_seq() -> int:
+    # 삭제 기록을 지운 최대 seq (0이 아닌 since가 이보다 작으면 전체 재동기화)
+    from .models import BookChangeFloor
+
+    return BookChangeFloor.objects.aggregate(seq=Max("seq"))["seq"] or 0
+
+
+def _delete_batches(queryset, batch_size: int) -> int:
+    from .models import BookChange
+
+    removed = 0
+    while True:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return removed
+        removed += BookChange.objects.filter(pk__in=ids).delete()[0]
+
+
+def prune(days: int | None = None, batch_size: int = 5000) -> Tuple[int, int]:
+    # 보존 기간보다 오래된 행 정리, (지운 행 수, floor seq) 반환
+    from .models import BookChange, BookChangeFloor
+
+    cutoff = timezone.now() - timedelta(days=_retention_days() if days is None else days)
+    # id 순서가 곧 기록 순서이므로 보존 기간 안의 첫 행 앞까지를 오래된 구간으로 본다
+    first_kept = (BookChange.objects.filter(changed_at__gte=cutoff).order_by("pk")
+                  .values_list("pk", flat=True).first())
+    old = BookChange.objects.all() if first_kept is None else BookChange.objects.filter(pk__lt=first_kept)
+
+    # 1) 같은 도서의 더 새 행이 있는 행
+    newer = BookChange.objects.filter(book_id=OuterRef("book_id"), pk__gt=OuterRef("pk"))
+    removed = _delete_batches(old.filter(Exists(newer)), batch_size)
+
+    # 2) 남은 오래된 삭제 기록 (도서마다 마지막 행), 지운 최대 seq를 floor로
+    tombstones = old.filter(deleted=True)
+    floor = tombstones.aggregate(seq=Max("pk"))["seq"]
+    if floor is not None:
+        with transaction.atomic():
+            BookChangeFloor.objects.create(seq=floor)
+            removed += _delete_batches(tombstones, batch_size)
+    return removed, floor_seq()
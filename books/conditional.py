@@ -0,0 +1,42 @@
+# 조건부 GET (ETag / Last-Modified)
+# 상세는 Book.version, Book.updated_at, 목록은 변경 피드 순번(books/changes.py)으로 검증값을 만들고,
+# 일치하면 직렬화 전에 304를 돌려준다.
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+
+def book_validators(book):
+    # 상세: (ETag, Last-Modified 초)
+    last_modified = int(book.updated_at.timestamp()) if book.updated_at else None
+    return f'"{book.pk}-{book.version}"', last_modified
+
+
+def list_etag(request) -> str:
+    # 목록: 요청 조건 + 사용자 + 카탈로그 변경 순번 (BookChange 마지막 id, 기본키 인덱스 한 번 읽기)
+    # 도서/관련 행 수정, 삭제, 좋아요가 모두 변경 순번을 올리므로 어느 페이지든 바뀌면 ETag가 달라진다.
+    # 삭제를 반영할 수 있는 수정 시각이 없어 목록에는 Last-Modified를 보내지 않는다.
+    from .changes import latest_seq
+
+    user = request.user.pk if request.user.is_authenticated else ""
+    raw = f"{request.get_full_path()}|{user}|{latest_seq()}"
+    return '"' + hashlib.md5(raw.encode("utf-8")).hexdigest() + '"'
+
+
+def not_modified(request, etag, last_modified):
+    # If-None-Match / If-Modified-Since가 맞으면 304 응답, 아니면 None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # 좋아요 여부가 사용자마다 다르다
+    patch_vary_headers(response, ["Authorization"])
+    return response
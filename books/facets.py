@@ -0,0 +1,111 @@
+# 검색 결과 패싯 (대출상태, 위치, 이용자대상, 출판사)
+# 전체 목록은 미리 집계해 둔 FacetCount에서, 필터가 걸린 목록은 UNION ALL 한 번으로 센다.
+
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from django.db import transaction
+from django.db.models import CharField, Count, F, Value
+
+# 패싯 이름 -> Book 기준 경로
+FACETS = {
+    "book_status": "book_status",
+    "location": "location",
+    "target": "targets__target__name",
+    "publisher": "publisher",
+}
+# Book 컬럼으로 바로 세는 패싯
+BOOK_FACETS = ("book_status", "location", "publisher")
+FACET_LIMIT = 20 # 패싯별 상위 값 개수
+
+
+def bump(deltas: List[Tuple[str, str, int]]):
+    # (패싯, 값, 증감) 반영
+    from .models import FacetCount
+
+    merged: Dict[Tuple[str, str], int] = defaultdict(int)
+    for facet, value, delta in deltas:
+        if value:
+            merged[(facet, value)] += delta
+    merged = {k: d for k, d in merged.items() if d}
+    if not merged:
+        return
+
+    with transaction.atomic():
+        FacetCount.objects.bulk_create(
+            [FacetCount(facet=f, value=v, count=0) for f, v in merged], ignore_conflicts=True
+        )
+        for (facet, value), delta in merged.items():
+            FacetCount.objects.filter(facet=facet, value=value).update(count=F("count") + delta)
+
+
+def book_deltas(book, update_fields=None) -> List[Tuple[str, str, int]]:
+    # Book 저장 전에 호출: DB 값(_loaded)과 현재 값 비교
+    loaded = getattr(book, "_loaded", None)
+    deltas = []
+    for facet in BOOK_FACETS:
+        if update_fields is not None and facet not in update_fields:
+            continue
+        new = getattr(book, facet)
+        if book._state.adding or loaded is None:
+            deltas.append((facet, new, 1))
+        elif facet in loaded and loaded[facet] != new:
+            deltas += [(facet, loaded[facet], -1), (facet, new, 1)]
+    return deltas
+
+
+def _sorted(counts: Dict[str, List[Tuple[str, int]]]) -> Dict[str, list]:
+    return {
+        facet: [
+            {"value": value, "count": n}
+            for value, n in sorted(counts.get(facet, []), key=lambda r: (-r[1], r[0]))[:FACET_LIMIT]
+        ]
+        for facet in FACETS
+    }
+
+
+def unfiltered_counts() -> Dict[str, list]:
+    from .models import FacetCount
+
+    counts: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for facet, value, n in FacetCount.objects.filter(count__gt=0).values_list("facet", "value", "count"):
+        counts[facet].append((value, n))
+    return _sorted(counts)
+
+
+def facet_queryset(queryset):
+    # 패싯별 GROUP BY를 UNION ALL로 묶은 단일 쿼리
+    from .models import Book
+
+    base = Book.objects.filter(pk__in=queryset.order_by().values("pk"))
+    parts = [
+        base.order_by()
+        .annotate(facet_name=Value(facet, output_field=CharField()), facet_value=F(path))
+        .values("facet_name", "facet_value")
+        .annotate(n=Count("pk"))
+        .values_list("facet_name", "facet_value", "n")
+        for facet, path in FACETS.items()
+    ]
+    return parts[0].union(*parts[1:], all=True)
+
+
+def filtered_counts(queryset) -> Dict[str, list]:
+    counts: Dict[str, List[Tuple[str, int]]] = defaultdict(list)
+    for facet, value, n in facet_queryset(queryset):
+        if value:
+            counts[facet].append((value, n))
+    return _sorted(counts)
+
+
+def rebuild_counts():
+    # FacetCount 전체 재계산
+    from .models import Book, FacetCount
+
+    rows = []
+    for facet, path in FACETS.items():
+        for value, n in Book.objects.order_by().values_list(path).annotate(n=Count("pk")):
+            if value:
+                rows.append(FacetCount(facet=facet, value=value, count=n))
+    with transaction.atomic():
+        FacetCount.objects.all().delete()
+        FacetCount.objects.bulk_create(rows, batch_size=1000)
@@ -1,6 +1,17 @@
-from rest_framework.filters import SearchFilter
+import operator
+from functools import reduce
+
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.constants import LOOKUP_SEP
+from rest_framework.filters import BaseFilterBackend, SearchFilter
 from rest_framework.exceptions import ValidationError
 
+from .querylog import MAX_CACHED_IDS, hot_cache, normalize_query
+from .search import (
+    CHOSUNG_FIELDS, INDEXED_FIELDS, bm25_annotation, candidate_query, chosung, fuzzy_ids, is_chosung_query,
+    ranking_pairs,
+)
+
 class MinLengthSearchFilter(SearchFilter):
     # min_length = 2 # 최소 글자 수
 
@@ -23,4 +34,130 @@ class MinLengthSearchFilter(SearchFilter):
         #     })
 
         # 2글자 이상
-        return super().filter_queryset(request, queryset, view)
\ No newline at end of file
+        return self.search_queryset(request, queryset, view)
+
+    def search_queryset(self, request, queryset, view):
+        return super().filter_queryset(request, queryset, view)
+
+# n-gram 색인 검색
+class NgramSearchFilter(MinLengthSearchFilter):
+    # 색인(BookNgram)으로 후보 id를 먼저 좁히고, 기존 lookup은 후보 안에서만 확인
+    # '=' 필드(isbn, issn, book_code)는 인덱스 컬럼 일치 검색으로 후보에 합친다
+    # 초성만 입력한 검색어("ㅁㅎㅈㅂ")는 초성 컬럼(title_chosung, author_chosung)에서 찾는다
+    # 결과가 없으면 오타 허용 검색(fuzzy_ids) 결과로 대체하고 view.search_fallback을 남긴다
+    # 결과가 비었는지는 따로 세지 않고, view가 첫 페이지를 읽은 뒤 view.fuzzy_fallback()을 부른다
+    # 자주 들어오는 검색어는 일치한 id 목록을 hot_cache에 두고 다음 요청부터 색인 조회를 건너뛴다
+
+    def search_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+
+        lookups = [self.construct_search(str(f), queryset) for f in search_fields]
+        exact_lookups = [lk for lk in lookups if lk.endswith(LOOKUP_SEP + "iexact")]
+        indexed_fields = [
+            lk.split(LOOKUP_SEP)[0] for lk in lookups
+            if lk not in exact_lookups and lk.split(LOOKUP_SEP)[0] in INDEXED_FIELDS
+        ]
+        # 색인으로 대신할 수 없는 필드가 있으면 기존 방식
+        if len(exact_lookups) + len(indexed_fields) != len(lookups):
+            return super().search_queryset(request, queryset, view)
+
+        key = normalize_query(search_terms)
+        cached = hot_cache.get(key)
+        if cached is not None:
+            view.search_cache_hit = True
+            cached_ids, fallback = cached
+            if fallback:
+                view.search_fallback = fallback
+                return self.ordered(queryset, cached_ids)
+            return queryset.filter(pk__in=cached_ids)
+
+        conditions = []
+        candidates = [] # 검색어별 색인 후보 (n-gram 서브쿼리, id 목록을 파이썬으로 가져오지 않음)
+        for term in search_terms:
+            if is_chosung_query(term):
+                cond, term_candidates = self.chosung_condition(term, indexed_fields)
+                conditions.append(cond)
+                if term_candidates is not None:
+                    candidates.append(Q(pk__in=term_candidates))
+                continue
+
+            conditions.append(reduce(operator.or_, (Q(**{lk: term}) for lk in lookups)))
+
+            term_candidates = candidate_query(term, indexed_fields)
+            if term_candidates is None:
+                # 1글자 검색어는 색인으로 좁힐 수 없음
+                continue
+            candidate = Q(pk__in=term_candidates)
+            if exact_lookups:
+                candidate |= reduce(operator.or_, (Q(**{lk: term}) for lk in exact_lookups))
+            candidates.append(candidate)
+
+        condition = reduce(operator.and_, candidates + conditions)
+        # 인기 검색어: 전체 도서 기준 일치 id를 캐시 (색인으로 좁힌 경우만)
+        # MAX_CACHED_IDS건까지만 읽어 보고, 그보다 많으면 캐시하지 않고 아래 일반 경로로
+        if candidates and hot_cache.is_hot(key):
+            matched = list(queryset.model.objects.filter(condition).order_by("pk")
+                           .values_list("pk", flat=True)[:MAX_CACHED_IDS + 1])
+            if not matched:
+                fuzzy = fuzzy_ids(search_terms)
+                hot_cache.put(key, fuzzy, "fuzzy" if fuzzy else None)
+                fallback = self.fuzzy_queryset(view, queryset, fuzzy)
+                return queryset.none() if fallback is None else fallback
+            if len(matched) <= MAX_CACHED_IDS:
+                hot_cache.put(key, matched)
+                return queryset.filter(pk__in=matched)
+
+        # 정확 검색 결과가 없으면 오타 허용 검색으로 대체 (view가 빈 첫 페이지를 보고 호출)
+        if candidates:
+            base = queryset
+            view.fuzzy_fallback = lambda: self.fuzzy_queryset(view, base, fuzzy_ids(search_terms))
+        return queryset.filter(condition)
+
+    def fuzzy_queryset(self, view, queryset, ids):
+        # 오타 허용 결과 (없으면 None)
+        if not ids:
+            return None
+        view.search_fallback = "fuzzy"
+        return self.ordered(queryset, ids)
+
+    @staticmethod
+    def ordered(queryset, ids):
+        # ids 순서대로
+        order = Case(*[When(pk=pk, then=Value(i)) for i, pk in enumerate(ids)])
+        return queryset.filter(pk__in=ids).order_by(order)
+
+    def chosung_condition(self, term, indexed_fields):
+        # 초성 검색: 2글자 이상은 n-gram 색인(중간 일치), 1글자는 초성 컬럼 인덱스로 앞부분 일치
+        term = chosung(term)
+        fields = [CHOSUNG_FIELDS[f] for f in indexed_fields if f in CHOSUNG_FIELDS]
+        if not fields:
+            return Q(pk__in=[]), None
+
+        if len(term) == 1:
+            cond = reduce(operator.or_, (Q(**{f"{f}__startswith": term}) for f in fields))
+            return cond, None
+
+        cond = reduce(operator.or_, (Q(**{f"{f}__contains": term}) for f in fields))
+        return cond, candidate_query(term, fields)
+
+
+# BM25 랭킹
+class BM25RankingFilter(BaseFilterBackend):
+    # 검색 결과를 BM25 점수순으로 정렬 (검색 필터 뒤에 둔다)
+    # 점수는 DB에서 계산하고, 페이지네이션이 상위 k건만 가져간다
+
+    def filter_queryset(self, request, queryset, view):
+        search = SearchFilter()
+        if not request.query_params.get(search.search_param, "").strip():
+            return queryset
+        # 오타 허용 결과는 자체 순위 유지
+        if getattr(view, "search_fallback", None):
+            return queryset
+
+        score = bm25_annotation(ranking_pairs(search.get_search_terms(request)))
+        if score is None:
+            return queryset
+        return queryset.annotate(relevance=score).order_by(F("relevance").desc(nulls_last=True), "pk")
@@ -0,0 +1,176 @@
+# MARC 표목 색인 (주제명, 총서, 부출 표목)
+# Marc 저장 시 600/610/650/653/655, 490, 700/710을 파싱해 각 표목 테이블과 도서 연결을 동기화한다.
+# 표목 목록(/books/subjects/ 등)의 권수는 표목 행의 book_count에 두고, 연결이 바뀐 표목만 다시 센다.
+# (도서 삭제 CASCADE는 books/signals.py, 전체 재계산은 rebuild_marc_indexes --counts-only)
+
+import re
+from typing import Dict, Iterable, Set, Tuple
+
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .marc import SUBJECT_TAGS, parse_headings, parse_names, parse_series
+from .search import normalize_text
+
+
+def normalize_heading(name: str) -> str:
+    return " ".join(normalize_text(name).split()).strip(" ,;:/.")[:255]
+
+
+def heading_links():
+    # (표목 모델, 연결 모델, 연결의 표목 FK)
+    from .models import BookContributor, BookSeries, BookSubject, Contributor, Series, Subject
+
+    return (
+        (Subject, BookSubject, "subject_id"),
+        (Series, BookSeries, "series_id"),
+        (Contributor, BookContributor, "contributor_id"),
+    )
+
+
+def recount_books(heading_model, link_model, fk: str, ids: Iterable[int] | None = None):
+    # 표목별 연결 도서 수 다시 계산 (ids가 없으면 전체)
+    if ids is not None:
+        ids = list(ids)
+        if not ids:
+            return
+    counts = (link_model.objects.filter(**{fk: OuterRef("pk")}).order_by()
+              .values(fk).annotate(n=Count("pk")).values("n"))
+    headings = heading_model.objects.all() if ids is None else heading_model.objects.filter(pk__in=ids)
+    headings.update(book_count=Coalesce(Subquery(counts), 0))
+
+
+def recount_all():
+    for heading_model, link_model, fk in heading_links():
+        recount_books(heading_model, link_model, fk)
+
+
+def marc_subjects(marc) -> Dict[Tuple[str, str], str]:
+    # (태그, 정규화 표목) -> 표시용 표목
+    found: Dict[Tuple[str, str], str] = {}
+    for tag in SUBJECT_TAGS:
+        for name in parse_headings(getattr(marc, f"field_{tag}", None)):
+            key = normalize_heading(name)
+            if key:
+                found.setdefault((tag, key), name[:255])
+    return found
+
+
+def sync_subjects(marc):
+    from .models import BookSubject, Subject
+
+    found = marc_subjects(marc)
+    with transaction.atomic():
+        wanted: Set[int] = set()
+        if found:
+            Subject.objects.bulk_create(
+                [Subject(tag=tag, normalized=key, name=name) for (tag, key), name in found.items()],
+                ignore_conflicts=True,
+            )
+            keys = set(found)
+            for pk, tag, key in Subject.objects.filter(
+                normalized__in={key for _, key in keys}
+            ).values_list("pk", "tag", "normalized"):
+                if (tag, key) in keys:
+                    wanted.add(pk)
+
+        current = set(BookSubject.objects.filter(book_id=marc.book_id).values_list("subject_id", flat=True))
+        if current - wanted:
+            BookSubject.objects.filter(book_id=marc.book_id, subject_id__in=current - wanted).delete()
+        if wanted - current:
+            BookSubject.objects.bulk_create(
+                [BookSubject(book_id=marc.book_id, subject_id=pk) for pk in wanted - current],
+                ignore_conflicts=True,
+            )
+        recount_books(Subject, BookSubject, "subject_id", current ^ wanted)
+
+
+def _sync_links(link_model, book_id: int, fk: str, wanted: Dict[int, dict]) -> Set[int]:
+    # 도서의 연결을 wanted({표목 id: 부가 값})와 같게 맞추고, 연결이 생기거나 없어진 표목 id 반환
+    current = {
+        row[fk]: row for row in link_model.objects.filter(book_id=book_id).values(fk, *_extra_fields(wanted))
+    }
+    stale = set(current) - set(wanted)
+    if stale:
+        link_model.objects.filter(book_id=book_id, **{f"{fk}__in": stale}).delete()
+    added = set(wanted) - set(current)
+    if added:
+        link_model.objects.bulk_create(
+            [link_model(book_id=book_id, **{fk: pk}, **wanted[pk]) for pk in added], ignore_conflicts=True
+        )
+    for pk in set(wanted) & set(current):
+        extra = wanted[pk]
+        if any(current[pk][k] != v for k, v in extra.items()):
+            link_model.objects.filter(book_id=book_id, **{fk: pk}).update(**extra)
+    return stale | added
+
+
+def _extra_fields(wanted: Dict[int, dict]) -> Set[str]:
+    return {k for extra in wanted.values() for k in extra}
+
+
+def _volume_no(volume: str | None) -> int | None:
+    m = re.search(r"\d+", volume or "")
+    return int(m.group()) if m else None
+
+
+def marc_series(marc) -> Dict[str, Tuple[str, str | None]]:
+    # 정규화 총서명 -> (표시용 총서명, 권차)
+    found: Dict[str, Tuple[str, str | None]] = {}
+    for name, volume in parse_series(marc.field_490):
+        key = normalize_heading(name)
+        if key:
+            found.setdefault(key, (name[:255], volume[:50] if volume else None))
+    return found
+
+
+def sync_series(marc):
+    from .models import BookSeries, Series
+
+    found = marc_series(marc)
+    with transaction.atomic():
+        wanted: Dict[int, dict] = {}
+        if found:
+            Series.objects.bulk_create(
+                [Series(normalized=key, name=name) for key, (name, _) in found.items()], ignore_conflicts=True
+            )
+            for pk, key in Series.objects.filter(normalized__in=found).values_list("pk", "normalized"):
+                volume = found[key][1]
+                wanted[pk] = {"volume": volume, "volume_no": _volume_no(volume)}
+        changed = _sync_links(BookSeries, marc.book_id, "series_id", wanted)
+        recount_books(Series, BookSeries, "series_id", changed)
+
+
+CONTRIBUTOR_TAGS = ("700", "710")
+
+
+def marc_contributors(marc) -> Dict[Tuple[str, str], Tuple[str, str | None]]:
+    # (태그, 정규화 이름) -> (표시용 이름, 역할어)
+    found: Dict[Tuple[str, str], Tuple[str, str | None]] = {}
+    for tag in CONTRIBUTOR_TAGS:
+        for name, role in parse_names(getattr(marc, f"field_{tag}", None)):
+            key = normalize_heading(name)
+            if key:
+                found.setdefault((tag, key), (name[:255], role[:50] if role else None))
+    return found
+
+
+def sync_contributors(marc):
+    from .models import BookContributor, Contributor
+
+    found = marc_contributors(marc)
+    with transaction.atomic():
+        wanted: Dict[int, dict] = {}
+        if found:
+            Contributor.objects.bulk_create(
+                [Contributor(tag=tag, normalized=key, name=name) for (tag, key), (name, _) in found.items()],
+                ignore_conflicts=True,
+            )
+            for pk, tag, key in Contributor.objects.filter(
+                normalized__in={key for _, key in found}
+            ).values_list("pk", "tag", "normalized"):
+                if (tag, key) in found:
+                    wanted[pk] = {"role": found[(tag, key)][1]}
+        changed = _sync_links(BookContributor, marc.book_id, "contributor_id", wanted)
+        recount_books(Contributor, BookContributor, "contributor_id", changed)
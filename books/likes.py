@@ -0,0 +1,51 @@
+# 좋아요 수 (Book.like_count)
+# 토글은 좋아요 행 DELETE (없으면 INSERT, 중복은 무시) + 카운터 UPDATE를 한 트랜잭션에서 처리한다. (문장 2~3개)
+# 카운터는 증감이 아니라 그 도서의 좋아요 행 수로 다시 채우므로 동시 요청이 겹쳐도 어긋나지 않는다.
+# 사용자 삭제로 좋아요 행이 CASCADE로 지워지면 books/signals.py에서 해당 도서를 다시 센다.
+# like_count는 목록 행에 나가므로 바뀐 도서를 변경 피드(books/changes.py)에도 남긴다.
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import changes
+
+
+def _like_count():
+    # 도서별 좋아요 행 수 (UPDATE ... SET like_count = (SELECT COUNT(*) ...))
+    from .models import Book
+
+    Like = Book.liked_users.through
+    counts = (Like.objects.filter(book_id=OuterRef("pk")).order_by()
+              .values("book_id").annotate(n=Count("pk")).values("n"))
+    return Coalesce(Subquery(counts), 0)
+
+
+def toggle_like(book_id: int, user_id: int) -> bool | None:
+    # True: 좋아요 등록, False: 취소, None: 도서 없음
+    from .models import Book
+
+    Like = Book.liked_users.through
+    with transaction.atomic():
+        deleted, _ = Like.objects.filter(book_id=book_id, user_id=user_id).delete()
+        if not deleted:
+            # 동시에 들어온 같은 요청이 먼저 등록했으면 무시
+            Like.objects.bulk_create([Like(book_id=book_id, user_id=user_id)], ignore_conflicts=True)
+        if not Book.objects.filter(pk=book_id).update(like_count=_like_count()):
+            # 도서 없음: 넣은 행까지 되돌린다
+            transaction.set_rollback(True)
+            return None
+        changes.record([book_id])
+    return not deleted
+
+
+def recount_likes(book_ids=None) -> int:
+    # 좋아요 행 기준으로 like_count 다시 계산 (book_ids가 없으면 전체), 값이 달랐던 도서 수
+    from .models import Book
+
+    books = Book.objects.all() if book_ids is None else Book.objects.filter(pk__in=book_ids)
+    stale = list(books.annotate(actual=_like_count()).exclude(like_count=F("actual")).values_list("pk", flat=True))
+    if stale:
+        Book.objects.filter(pk__in=stale).update(like_count=_like_count())
+        changes.record(stale)
+    return len(stale)
@@ -0,0 +1,35 @@
+# 장서번호/ISBN/ISSN 일괄 조회
+# 입력 코드를 정규화해 컬럼별 IN 쿼리로 한 번에 찾고, 결과는 입력 코드 기준으로 돌려준다.
+
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List
+
+from .marc import clean_isbn, clean_issn
+
+LOOKUP_BATCH = 500 # IN 목록 최대 길이
+MAX_CODES = 1000 # 종류별 최대 입력 수
+
+# 입력 종류 -> 정규화 함수 (import_books와 같은 방식)
+NORMALIZERS: Dict[str, Callable[[str], str | None]] = {
+    "book_code": lambda code: code.strip() or None,
+    "isbn": clean_isbn,
+    "issn": clean_issn,
+}
+
+
+def _chunks(values: List[str], size: int = LOOKUP_BATCH) -> Iterable[List[str]]:
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def lookup_books(queryset, field: str, codes: Iterable[str]) -> Dict[str, list]:
+    # {입력 코드: [Book, ...]} (찾지 못한 코드는 빈 목록)
+    normalize = NORMALIZERS[field]
+    normalized = {code: normalize(code) for code in codes}
+    wanted = sorted({v for v in normalized.values() if v})
+
+    found: Dict[str, list] = defaultdict(list)
+    for chunk in _chunks(wanted):
+        for book in queryset.filter(**{f"{field}__in": chunk}).order_by("pk"):
+            found[getattr(book, field)].append(book)
+    return {code: found.get(value, []) if value else [] for code, value in normalized.items()}
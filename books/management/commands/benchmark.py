@@ -0,0 +1,349 @@
+# 성능 비교용 벤치마크 (임시 데이터를 만들고 끝나면 전체 롤백)
+# python manage.py benchmark search --books 100000
+
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.migrations.loader import MigrationLoader
+from django.db.models import Count
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from books.availability import fetch_rows, pack
+from books.facets import FACETS, facet_queryset, rebuild_counts, unfiltered_counts
+from books.filters import MinLengthSearchFilter, NgramSearchFilter
+from books.marc import MARC_COLUMNS, parse_physical
+from books.models import Book, BookStatus, Marc, Target, TargetName
+from books.rows import RowMapper
+from books.serializers import BookDetailSerializer, BookSerializer
+from books.search import rebuild_index
+from books.views import BookViewSet
+from config.renderers import ORJSONRenderer
+from rentals.models import Rental
+from rentals.serializers import RentalStatusListSerializer
+from reservations.models import Reservation
+from reservations.serializers import ReservationSerializer
+
+WORDS = [
+    "문헌정보학", "도서관", "정보", "검색", "역사", "철학", "데이터", "분석", "서지", "목록",
+    "분류", "기록", "관리", "사회", "과학", "입문", "개론", "연구", "이론", "실제",
+    "한국", "세계", "문학", "읽기", "독서", "교육", "디지털", "아카이브", "메타데이터", "이용자",
+    "python", "data", "library", "science", "history", "introduction",
+]
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임"]
+SYLLABLES = ["민", "서", "준", "지", "현", "우", "영", "수", "은", "호", "진", "희"]
+PUBLISHERS = ["한울", "민음사", "창비", "문학동네", "한국도서관협회", "조은글터", "Springer", "O'Reilly"]
+LOCATIONS = ["1층 자료실", "2층 자료실", "3층 자료실", "보존서고", "참고자료실"]
+TARGETS = ["일반", "청소년", "아동", "학술"]
+QUERIES = ["문헌정보", "도서관", "역사", "김민준", "데이터 분석", "창비", "library", "메타데이터 관리"]
+
+
+def _seed_books(n: int, seed: int = 42) -> None:
+    rnd = random.Random(seed)
+    batch = []
+    for i in range(n):
+        title = " ".join(rnd.sample(WORDS, rnd.randint(2, 5)))
+        author = rnd.choice(SURNAMES) + "".join(rnd.sample(SYLLABLES, 2))
+        batch.append(Book(
+            book_code=f"BENCH{i:08d}",
+            title=title,
+            author=author,
+            publisher=rnd.choice(PUBLISHERS),
+            book_status=rnd.choice(BookStatus.values),
+            location=rnd.choice(LOCATIONS),
+        ))
+        if len(batch) >= 5000:
+            Book.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Book.objects.bulk_create(batch)
+
+
+def _timeit(fn, repeat: int) -> float:
+    # 중앙값(ms)
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append((time.perf_counter() - start) * 1000)
+    return statistics.median(runs)
+
+
+def _search_ids(backend, query: str):
+    request = Request(APIRequestFactory().get("/books/", {"search": query}))
+    view = BookViewSet()
+    qs = backend.filter_queryset(request, Book.objects.filter(book_code__startswith="BENCH"), view)
+    return list(qs.values_list("pk", flat=True))
+
+
+def bench_search(cmd, opts):
+    like, ngram = MinLengthSearchFilter(), NgramSearchFilter()
+    cmd.stdout.write(f"{'query':<20}{'rows':>8}{'LIKE(ms)':>12}{'n-gram(ms)':>12}")
+    for q in QUERIES:
+        rows = len(_search_ids(like, q))
+        if rows != len(_search_ids(ngram, q)):
+            raise CommandError(f"결과 불일치: {q}")
+        t_like = _timeit(lambda: _search_ids(like, q), opts["repeat"])
+        t_ngram = _timeit(lambda: _search_ids(ngram, q), opts["repeat"])
+        cmd.stdout.write(f"{q:<20}{rows:>8}{t_like:>12.2f}{t_ngram:>12.2f}")
+
+
+def bench_facets(cmd, opts):
+    names = [TargetName.objects.get_or_create(name=f"BENCH {t}")[0] for t in TARGETS]
+    books = Book.objects.filter(book_code__startswith="BENCH")
+    Target.objects.bulk_create(
+        [Target(book_id=pk, target=names[pk % len(names)]) for pk in books.values_list("pk", flat=True)],
+        batch_size=5000,
+    )
+    rebuild_counts()
+
+    def separate(qs):
+        for path in FACETS.values():
+            list(Book.objects.filter(pk__in=qs.order_by().values("pk")).order_by().values(path).annotate(n=Count("pk")))
+
+    searched = Book.objects.filter(pk__in=_search_ids(NgramSearchFilter(), "도서관"))
+    cmd.stdout.write(f"{'case':<24}{'GROUP BY x4(ms)':>16}{'UNION ALL(ms)':>16}{'count table(ms)':>18}")
+    t_sep = _timeit(lambda: separate(books), opts["repeat"])
+    t_union = _timeit(lambda: list(facet_queryset(books)), opts["repeat"])
+    t_table = _timeit(unfiltered_counts, opts["repeat"])
+    cmd.stdout.write(f"{'unfiltered':<24}{t_sep:>16.2f}{t_union:>16.2f}{t_table:>18.2f}")
+    t_sep = _timeit(lambda: separate(searched), opts["repeat"])
+    t_union = _timeit(lambda: list(facet_queryset(searched)), opts["repeat"])
+    cmd.stdout.write(f"{'search=도서관':<24}{t_sep:>16.2f}{t_union:>16.2f}{'-':>18}")
+
+
+PHYSICAL_300 = ["$a320 p. :$b삽화 ;$c23 cm", "$axii, 415 p. ;$c24 cm", "$a1책 :$b천연색삽화 ;$c30 cm",
+                "$a250–260 p. ;$c21 cm", "$a185 p."]
+
+
+def bench_physical(cmd, opts):
+    # 상세 조회 형태사항: 요청마다 300 파싱 vs Marc 저장 시 계산한 컬럼
+    books = list(Book.objects.filter(book_code__startswith="BENCH").order_by("pk")[:1000])
+    for i, book in enumerate(books):
+        Marc.objects.create(book=book, field_300=PHYSICAL_300[i % len(PHYSICAL_300)])
+    marcs = list(Marc.objects.filter(book__in=books).select_related("book"))
+    for marc in marcs:
+        if parse_physical(marc.field_300) != (marc.physical_pages, marc.physical_size):
+            raise CommandError(f"결과 불일치: {marc.field_300}")
+
+    serializer = BookDetailSerializer()
+
+    def parsed():
+        # 이전 get_physical: 요청마다 obj.marc.field_300 파싱
+        for marc in marcs:
+            parse_physical(marc.book.marc.field_300 or "")
+
+    def stored():
+        for marc in marcs:
+            serializer.get_physical(marc.book)
+
+    t_parsed = _timeit(parsed, opts["repeat"])
+    t_stored = _timeit(stored, opts["repeat"])
+    cmd.stdout.write(f"{'rows':<10}{'parse(ms)':>12}{'stored(ms)':>12}")
+    cmd.stdout.write(f"{len(marcs):<10}{t_parsed:>12.3f}{t_stored:>12.3f}")
+
+
+def bench_serialize(cmd, opts):
+    # 목록 직렬화: ModelSerializer vs values() 행 매퍼 (같은 출력인지 먼저 확인)
+    user = get_user_model().objects.create_user(username="bench", password="bench", name="bench")
+    books = Book.objects.filter(book_code__startswith="BENCH").order_by("pk")
+    ids = list(books.values_list("pk", flat=True)[:5000])
+    today = timezone.localdate()
+    Rental.objects.bulk_create(
+        [Rental(user=user, book_id=pk, due_date=today + timedelta(days=pk % 21 - 7)) for pk in ids], batch_size=5000
+    )
+    Reservation.objects.bulk_create(
+        [Reservation(user=user, book_id=pk, due_date=today + timedelta(days=3)) for pk in ids], batch_size=5000
+    )
+    cases = [
+        ("books", BookSerializer, books, {"liked_ids": set()}),
+        ("rentals/current", RentalStatusListSerializer,
+         Rental.objects.filter(user=user, is_returned=False).select_related("book").order_by("pk"), {}),
+        ("reservations", ReservationSerializer, Reservation.objects.filter(user=user).select_related("book"), {}),
+    ]
+
+    cmd.stdout.write(f"{'case':<20}{'rows':>8}{'serializer(ms)':>16}{'values(ms)':>12}")
+    for name, serializer_class, qs, context in cases:
+        for n in (100, 1000, 5000):
+            # 조회 + 직렬화 (매번 새 쿼리)
+            slow = lambda: serializer_class(qs[:n], many=True, context=dict(context)).data
+            fast = lambda: (lambda mapper: mapper(mapper.values(qs[:n])))(RowMapper(serializer_class, dict(context)))
+            if slow() != fast():
+                raise CommandError(f"결과 불일치: {name}")
+            t_slow = _timeit(slow, opts["repeat"])
+            t_fast = _timeit(fast, opts["repeat"])
+            cmd.stdout.write(f"{name:<20}{n:>8}{t_slow:>16.2f}{t_fast:>12.2f}")
+
+
+MARC_FIELDS = {
+    "field_020": "$a9788937460449 :$c15000원", "field_056": "$a020.9$25", "field_090": "$a020.9$b김292ㄷ",
+    "field_245": "$a도서관 역사 :$b기록과 정보의 문화사 /$d김민준 지음 ;$e이서준 옮김",
+    "field_260": "$a서울 :$b한울,$c2024", "field_300": "$a320 p. :$b삽화 ;$c23 cm",
+    "field_490": "$a문헌정보학 총서 ;$v12", "field_500": "$a색인 수록", "field_504": "$a참고문헌: p. 301-315",
+    "field_650": "$a도서관$x역사;$a문헌정보학$x연구", "field_700": "$a이서준,$d1970-$e옮김",
+}
+
+
+def bench_render(cmd, opts):
+    # 응답 JSON 렌더링: DRF JSONRenderer(표준 json) vs orjson
+    user = get_user_model().objects.create_user(username="bench", password="bench", name="bench")
+    books = list(Book.objects.filter(book_code__startswith="BENCH").order_by("pk")[:1000])
+    for book in books[:100]:
+        Marc.objects.create(book=book, **MARC_FIELDS)
+    today = timezone.localdate()
+    Rental.objects.bulk_create([Rental(user=user, book=book, due_date=today) for book in books[:500]])
+
+    detail = Book.objects.filter(pk__in=[b.pk for b in books[:100]]).select_related("marc")
+    rentals = Rental.objects.filter(user=user).select_related("book")
+    payloads = [
+        ("book list x20", BookSerializer(books[:20], many=True, context={"liked_ids": set()}).data),
+        ("book list x1000", BookSerializer(books, many=True, context={"liked_ids": set()}).data),
+        ("book detail x100", [BookDetailSerializer(b).data for b in detail]),
+        ("rentals x500", RentalStatusListSerializer(rentals, many=True).data),
+    ]
+
+    stdlib, fast = JSONRenderer(), ORJSONRenderer()
+    cmd.stdout.write(f"{'payload':<20}{'bytes':>10}{'json(ms)':>12}{'orjson(ms)':>12}")
+    for name, data in payloads:
+        body = fast.render(data)
+        if json.loads(body) != json.loads(stdlib.render(data)):
+            raise CommandError(f"결과 불일치: {name}")
+        t_json = _timeit(lambda: stdlib.render(data), opts["repeat"])
+        t_fast = _timeit(lambda: fast.render(data), opts["repeat"])
+        cmd.stdout.write(f"{name:<20}{len(body):>10}{t_json:>12.2f}{t_fast:>12.2f}")
+
+
+def _table_bytes(table: str):
+    # 테이블 크기 (SQLite dbstat, MySQL information_schema)
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = %s", [table])
+        elif connection.vendor == "mysql":
+            cursor.execute("ANALYZE TABLE " + connection.ops.quote_name(table))
+            cursor.fetchall()
+            cursor.execute("SELECT data_length + index_length FROM information_schema.tables "
+                           "WHERE table_schema = DATABASE() AND table_name = %s", [table])
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+
+COLUMN_MARC_TABLE = "bench_marc_0029"
+
+
+def _column_marc_model():
+    # 0029까지의 Marc: 태그마다 TextField 컬럼 + 같은 값을 담은 data (서브필드 없음), 비교용 테이블 이름으로
+    state = MigrationLoader(connection, ignore_no_migrations=True).project_state(("books", "0029_book_version"))
+    model = state.apps.get_model("books", "Marc")
+    model._meta.db_table = COLUMN_MARC_TABLE
+    return model
+
+
+@contextmanager
+def _column_marc_table(enabled: bool):
+    # 비교용 테이블은 벤치마크 트랜잭션 밖에서 만들고 지운다 (MySQL은 CREATE/DROP TABLE이 바로 커밋됨)
+    if not enabled:
+        yield None
+        return
+    model = _column_marc_model()
+    with connection.schema_editor() as editor:
+        editor.create_model(model)
+    try:
+        yield model
+    finally:
+        with connection.schema_editor() as editor:
+            editor.delete_model(model)
+
+
+def bench_marc(cmd, opts):
+    # MARC 저장 크기와 조회/재저장 비용: 0029까지의 태그별 컬럼 구조 vs data 단일 저장(0030, 0031)
+    ColumnMarc = opts["column_marc"]
+    books = list(Book.objects.filter(book_code__startswith="BENCH").order_by("pk")[:10000])
+    Marc.objects.bulk_create([Marc(book=book, **MARC_FIELDS) for book in books], batch_size=2000)
+    old_data = {}
+    for name, (tag, key) in MARC_COLUMNS.items():
+        if MARC_FIELDS.get(name):
+            old_data.setdefault(tag, {})[key] = MARC_FIELDS[name]
+    pages, physical_size = parse_physical(MARC_FIELDS["field_300"])
+    ColumnMarc.objects.bulk_create([
+        ColumnMarc(book_id=book.pk, data=old_data, physical_pages=pages, physical_size=physical_size, **MARC_FIELDS)
+        for book in books
+    ], batch_size=2000)
+    ids = [b.pk for b in books[:1000]]
+
+    marc = Marc.objects.get(book=books[0])
+    layouts = [
+        ("0029 columns", ColumnMarc, None),
+        ("0031 data", Marc, lambda: [marc.save() for _ in range(100)]),
+    ]
+    cmd.stdout.write(f"{'layout':<14}{'rows':>8}{'table(KB)':>12}{'fetch all(ms)':>16}{'by book x1000(ms)':>19}"
+                     f"{'resave x100(ms)':>18}")
+    for name, model, resave in layouts:
+        size = _table_bytes(model._meta.db_table)
+        t_fetch = _timeit(lambda: list(model.objects.all()), opts["repeat"])
+        t_detail = _timeit(lambda: list(model.objects.filter(book_id__in=ids)), opts["repeat"])
+        t_resave = f"{_timeit(resave, opts['repeat']):.2f}" if resave else "-"
+        size = f"{size / 1024:.0f}" if size else "-"
+        cmd.stdout.write(f"{name:<14}{len(books):>8}{size:>12}{t_fetch:>16.2f}{t_detail:>19.2f}{t_resave:>18}")
+
+
+def bench_availability(cmd, opts):
+    # 키오스크 상태 조회: BookSerializer 목록 vs (id, 상태, 반납예정일, 대기 수) 한 번의 쿼리
+    user = get_user_model().objects.create_user(username="bench", password="bench", name="bench")
+    books = Book.objects.filter(book_code__startswith="BENCH").order_by("pk")
+    ids = list(books.values_list("pk", flat=True)[:500])
+    today = timezone.localdate()
+    Rental.objects.bulk_create([Rental(user=user, book_id=pk, due_date=today) for pk in ids[::3]])
+    Reservation.objects.bulk_create([Reservation(user=user, book_id=pk) for pk in ids[::3]])
+
+    renderer = ORJSONRenderer()
+    cmd.stdout.write(f"{'ids':<8}{'serializer(ms)':>16}{'bytes':>10}{'compact(ms)':>14}{'bytes':>10}{'packed bytes':>14}")
+    for n in (50, 200, 500):
+        page = books.filter(pk__in=ids[:n])
+        slow = lambda: renderer.render(BookSerializer(page, many=True, context={"liked_ids": set()}).data)
+        fast = lambda: renderer.render({"results": fetch_rows(ids[:n], None)})
+        packed = renderer.render(pack(fetch_rows(ids[:n], None)))
+        t_slow, t_fast = _timeit(slow, opts["repeat"]), _timeit(fast, opts["repeat"])
+        cmd.stdout.write(f"{n:<8}{t_slow:>16.2f}{len(slow()):>10}{t_fast:>14.2f}{len(fast()):>10}{len(packed):>14}")
+
+
+CASES = {
+    "search": bench_search,
+    "facets": bench_facets,
+    "physical": bench_physical,
+    "serialize": bench_serialize,
+    "render": bench_render,
+    "marc": bench_marc,
+    "availability": bench_availability,
+}
+
+
+class Command(BaseCommand):
+    help = "Run a benchmark case against a generated catalog. All generated rows are rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("case", choices=sorted(CASES))
+        parser.add_argument("--books", type=int, default=100000, help="Generated catalog size")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median)")
+
+    def handle(self, *args, **opts):
+        with _column_marc_table(opts["case"] == "marc") as column_marc, transaction.atomic():
+            opts["column_marc"] = column_marc
+            start = time.perf_counter()
+            _seed_books(opts["books"])
+            rebuild_index(Book.objects.filter(book_code__startswith="BENCH"))
+            self.stdout.write(f"도서 {opts['books']}건 생성/색인: {time.perf_counter() - start:.1f}s")
+
+            CASES[opts["case"]](self, opts)
+
+            # 생성한 데이터는 남기지 않음
+            transaction.set_rollback(True)
@@ -4,78 +4,14 @@
 # python run_with_tunnel.py import_books --file book.csv
 
 import csv
-import re
-from typing import Dict, List, Tuple
 
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.db.utils import IntegrityError
 
+from books.marc import clean_isbn, clean_issn, marc_json, split_multi, subfield
 from books.models import Book, Marc, TargetName, Target, Curation
 
-# 구분자: 쉼표, 세미콜론, 줄바꿈 모두 지원
-SPLIT_SEP = [",", ";", "\n"]
-
-
-def split_multi(val: str) -> List[str]:
-    if not val:
-        return []
-    s = str(val)
-    for sep in SPLIT_SEP:
-        s = s.replace(sep, "|")
-    parts = [p.strip() for p in s.split("|")]
-    return [p for p in parts if p]
-
-
-# MARC 파싱
-_SUBFIELD_RE = re.compile(r"\$([0-9a-zA-Z])")  # $a, $b, $d 등
-
-def _parse_marc_subfields(raw: str) -> Dict[str, List[str]]:
-    if not raw:
-        return {}
-
-    s = str(raw)
-    results: Dict[str, List[str]] = {}
-
-    matches: List[Tuple[str, int]] = [(m.group(1), m.start()) for m in _SUBFIELD_RE.finditer(s)]
-    if not matches:
-        return {}
-
-    for i, (code, start_idx) in enumerate(matches):
-        value_start = start_idx + 2
-        value_end = matches[i + 1][1] if i + 1 < len(matches) else len(s)
-        value = s[value_start:value_end]
-
-        cleaned = value.strip().strip(" ,;:/")
-        if cleaned:
-            results.setdefault(code.lower(), []).append(cleaned)
-
-    return results
-
-
-def _first_subfield(raw: str, code: str) -> str | None:
-    mp = _parse_marc_subfields(raw)
-    vals = mp.get(code.lower())
-    return vals[0] if vals else None
-
-
-def _clean_isbn(isbn: str | None) -> str | None:
-    if not isbn:
-        return None
-    isbn = re.split(r"[\s\(\)]", isbn)[0]
-    cleaned = re.sub(r"[^0-9Xx]", "", isbn)
-    return cleaned or None
-
-
-def _clean_issn(issn: str | None) -> str | None:
-    if not issn:
-        return None
-    m = re.search(r'(\d{4})[- ]?(\d{3}[\dXx])', issn)
-    if not m:
-        return None
-    return f"{m.group(1)}-{m.group(2).upper()}"
-
-
 class Command(BaseCommand):
     help = "Import/Upsert Books+Marc(+Target/Curation) from a CSV exported from Google Sheets."
 
@@ -129,51 +65,6 @@ class Command(BaseCommand):
                         f245 = val(row, "245") # 서명/저자
                         f260 = val(row, "260") # 출판사
 
-                        # ISBN
-                        isbn_raw = _first_subfield(f020, "a") # 020 $a
-                        if not isbn_raw and f020_set:
-                            isbn_raw = _first_subfield(f020_set, "a") or f020_set
-                        isbn = _clean_isbn(isbn_raw)
-                        # ISSN
-                        issn_raw = _first_subfield(f022, "a") if f022 else None
-                        issn = None
-                        if issn_raw:
-                            issn = _clean_issn(issn_raw)
-                        elif f022:
-                            for piece in split_multi(f022):
-                                cand = _first_subfield(piece, "a") or piece
-                                issn = _clean_issn(cand)
-                                if issn:
-                                    break
-                        # 서명
-                        title = val(row, "서명") or _first_subfield(f245, "a") or f245 # 245 $a
-                        # 저자
-                        author = _first_subfield(f245, "d") # 245 $d
-                        # 출판사
-                        publisher = _first_subfield(f260, "b") # 260 $b
-
-
-                        book_defaults = {
-                            "title": title or None,
-                            "image_url": val(row, "책표지이미지") or None,
-                            "callnumber": val(row, "090(분류번호)") or None,
-                            "author": author or None,
-                            "publisher": publisher or None,
-                            "isbn": isbn or None,
-                            "issn": issn or None,
-                            "location": "문헌정보학과 과실",
-                        }
-
-                        try:
-                            book, b_created = Book.objects.update_or_create(
-                                book_code=book_code, defaults=book_defaults
-                            )
-                        except IntegrityError as e:
-                            raise CommandError(f"[line {idx}] Book upsert failed: {e}")
-
-                        created_books += int(b_created)
-                        updated_books += int(not b_created)
-
                         marc_map = {
                             "field_020":        f020 or None,
                             "field_020_set":    f020_set or None,
@@ -212,8 +103,50 @@ class Command(BaseCommand):
                             "field_856":        val(row, "856") or None,
                         }
 
+                        # 서브필드는 여기서 한 번만 파싱해 data에 저장 (Book 필드도 이 구조에서 읽음)
+                        marc_data = marc_json(marc_map)
+
+                        # ISBN (020 $a, 없으면 세트 ISBN)
+                        isbn = clean_isbn(subfield(marc_data, "020", "a"))
+                        # ISSN
+                        issn_raw = subfield(marc_data, "022", "a")
+                        issn = clean_issn(issn_raw) if issn_raw else None
+                        if not issn and f022:
+                            for piece in split_multi(f022):
+                                issn = clean_issn(piece)
+                                if issn:
+                                    break
+                        # 서명
+                        title = val(row, "서명") or subfield(marc_data, "245", "a") or f245 # 245 $a
+                        # 저자
+                        author = subfield(marc_data, "245", "d") # 245 $d
+                        # 출판사
+                        publisher = subfield(marc_data, "260", "b") # 260 $b
+
+
+                        book_defaults = {
+                            "title": title or None,
+                            "image_url": val(row, "책표지이미지") or None,
+                            "callnumber": val(row, "090(분류번호)") or None,
+                            "author": author or None,
+                            "publisher": publisher or None,
+                            "isbn": isbn or None,
+                            "issn": issn or None,
+                            "location": "문헌정보학과 과실",
+                        }
+
+                        try:
+                            book, b_created = Book.objects.update_or_create(
+                                book_code=book_code, defaults=book_defaults
+                            )
+                        except IntegrityError as e:
+                            raise CommandError(f"[line {idx}] Book upsert failed: {e}")
+
+                        created_books += int(b_created)
+                        updated_books += int(not b_created)
+
                         marc, m_created = Marc.objects.update_or_create(
-                            book=book, defaults=marc_map
+                            book=book, defaults={"data": marc_data}
                         )
                         created_marc += int(m_created)
                         updated_marc += int(not m_created)
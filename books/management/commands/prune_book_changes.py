@@ -0,0 +1,22 @@
+# 변경 피드(BookChange) 오래된 행 정리
+# python run_with_tunnel.py prune_book_changes [--days 30]
+# 도서마다 마지막 행만 남기고, 오래된 삭제 기록은 지운 뒤 floor를 남긴다 (books/changes.py). 주기적으로(cron) 실행
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.changes import prune
+
+
+class Command(BaseCommand):
+    help = "Compact the /books/changes/ feed: drop superseded rows and old deletions past the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=None,
+                            help="Retention in days (default settings.BOOK_CHANGES_RETENTION_DAYS or 30)")
+
+    def handle(self, *args, **opts):
+        removed, floor = prune(opts["days"])
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 변경 기록 {removed}건 정리 (floor seq {floor})"
+        ))
@@ -0,0 +1,18 @@
+# 패싯 집계(FacetCount) 재계산
+# python run_with_tunnel.py rebuild_facet_counts
+# 저장/삭제 시 증감으로 맞추지만 queryset.update() 등 신호 없이 바뀐 값은 반영되지 않으므로 주기적으로(cron) 실행
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.facets import rebuild_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the precomputed facet counts used by /books/?facets=true."
+
+    def handle(self, *args, **opts):
+        rebuild_counts()
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 패싯 집계 재계산 완료"
+        ))
@@ -0,0 +1,38 @@
+# MARC에서 추출하는 색인 재구축 (기존 데이터 백필)
+# python run_with_tunnel.py rebuild_marc_indexes
+# python run_with_tunnel.py rebuild_marc_indexes --counts-only  (표목별 권수만 다시 계산, 주기 실행용)
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.headings import recount_all, sync_contributors, sync_series, sync_subjects
+from books.models import Marc
+
+
+class Command(BaseCommand):
+    help = "Rebuild indexes derived from MARC fields (subjects, series, contributors) for existing rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--book-code", action="append", default=[], help="Only this book_code (repeatable)")
+        parser.add_argument("--counts-only", action="store_true", help="Only recompute book counts of headings")
+
+    def handle(self, *args, **opts):
+        if opts["counts_only"]:
+            recount_all()
+            self.stdout.write(self.style.SUCCESS(f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 표목 권수 재계산"))
+            return
+
+        qs = Marc.objects.all().order_by("pk")
+        if opts["book_code"]:
+            qs = qs.filter(book__book_code__in=opts["book_code"])
+
+        done = 0
+        for marc in qs.iterator(chunk_size=500):
+            sync_subjects(marc)
+            sync_series(marc)
+            sync_contributors(marc)
+            done += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now():%Y-%m-%d %H:%M:%S}] MARC 색인 재구축: {done}건"
+        ))
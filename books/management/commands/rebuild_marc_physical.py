@@ -0,0 +1,43 @@
+# 형태사항(300) 파싱 컬럼 백필
+# python run_with_tunnel.py rebuild_marc_physical
+# python run_with_tunnel.py rebuild_marc_physical --book-code 0001234
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.marc import parse_physical
+from books.models import Book, Marc
+
+
+class Command(BaseCommand):
+    help = "Fill Marc.physical_pages/physical_size from field_300 for existing rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--book-code", action="append", default=[], help="Only this book_code (repeatable)")
+        parser.add_argument("--batch-size", type=int, default=2000, help="Rows per bulk update")
+
+    def handle(self, *args, **opts):
+        qs = Marc.objects.only("id", "book_id", "data", "physical_pages", "physical_size").order_by("pk")
+        if opts["book_code"]:
+            qs = qs.filter(book__book_code__in=opts["book_code"])
+
+        done, batch = 0, []
+        for marc in qs.iterator(chunk_size=opts["batch_size"]):
+            parsed = parse_physical(marc.field_300)
+            if parsed == (marc.physical_pages, marc.physical_size):
+                continue
+            marc.physical_pages, marc.physical_size = parsed
+            batch.append(marc)
+            if len(batch) >= opts["batch_size"]:
+                Marc.objects.bulk_update(batch, ["physical_pages", "physical_size"])
+                Book.touch_many(m.book_id for m in batch)
+                done += len(batch)
+                batch = []
+        if batch:
+            Marc.objects.bulk_update(batch, ["physical_pages", "physical_size"])
+            Book.touch_many(m.book_id for m in batch)
+            done += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 형태사항 백필: {done}건"
+        ))
@@ -0,0 +1,34 @@
+# 검색 색인 재구축
+# python run_with_tunnel.py rebuild_search_index
+# python run_with_tunnel.py rebuild_search_index --book-code 0001234
+# python run_with_tunnel.py rebuild_search_index --stats-only  (색인은 두고 df/필드 길이 통계만 다시 계산, 주기 실행용)
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from books.models import Book
+from books.search import rebuild_index, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild the n-gram search index (BookNgram) and BM25 term statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--book-code", action="append", default=[], help="Only reindex this book_code (repeatable)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Books per batch")
+        parser.add_argument("--stats-only", action="store_true", help="Only recompute BM25 statistics from BookNgram")
+
+    def handle(self, *args, **opts):
+        if opts["stats_only"]:
+            rebuild_stats()
+            self.stdout.write(self.style.SUCCESS(f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 검색 통계 재계산"))
+            return
+
+        qs = Book.objects.all()
+        if opts["book_code"]:
+            qs = qs.filter(book_code__in=opts["book_code"])
+
+        done = rebuild_index(qs, batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"[{timezone.now():%Y-%m-%d %H:%M:%S}] 색인 재구축: {done}건"
+        ))
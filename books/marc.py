@@ -0,0 +1,243 @@
+# MARC 문자열 파싱 (import_books, 모델 save, 색인에서 공통 사용)
+
+import re
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+# 구분자: 쉼표, 세미콜론, 줄바꿈 모두 지원
+SPLIT_SEP = [",", ";", "\n"]
+
+
+def split_multi(val: str) -> List[str]:
+    if not val:
+        return []
+    s = str(val)
+    for sep in SPLIT_SEP:
+        s = s.replace(sep, "|")
+    parts = [p.strip() for p in s.split("|")]
+    return [p for p in parts if p]
+
+
+# MARC 파싱
+_SUBFIELD_RE = re.compile(r"\$([0-9a-zA-Z])")  # $a, $b, $d 등
+
+
+def iter_subfields(raw: str) -> List[Tuple[str, str]]:
+    # 나온 순서대로 (서브필드 기호, 값)
+    if not raw:
+        return []
+
+    s = str(raw)
+    matches: List[Tuple[str, int]] = [(m.group(1), m.start()) for m in _SUBFIELD_RE.finditer(s)]
+    results: List[Tuple[str, str]] = []
+    for i, (code, start_idx) in enumerate(matches):
+        value_start = start_idx + 2
+        value_end = matches[i + 1][1] if i + 1 < len(matches) else len(s)
+        value = s[value_start:value_end]
+
+        cleaned = value.strip().strip(" ,;:/")
+        if cleaned:
+            results.append((code.lower(), cleaned))
+    return results
+
+
+def parse_subfields(raw: str) -> Dict[str, List[str]]:
+    results: Dict[str, List[str]] = {}
+    for code, value in iter_subfields(raw):
+        results.setdefault(code, []).append(value)
+    return results
+
+
+def first_subfield(raw: str, code: str) -> str | None:
+    mp = parse_subfields(raw)
+    vals = mp.get(code.lower())
+    return vals[0] if vals else None
+
+
+def clean_isbn(isbn: str | None) -> str | None:
+    if not isbn:
+        return None
+    isbn = re.split(r"[\s\(\)]", isbn)[0]
+    cleaned = re.sub(r"[^0-9Xx]", "", isbn)
+    return cleaned or None
+
+
+def clean_issn(issn: str | None) -> str | None:
+    if not issn:
+        return None
+    m = re.search(r'(\d{4})[- ]?(\d{3}[\dXx])', issn)
+    if not m:
+        return None
+    return f"{m.group(1)}-{m.group(2).upper()}"
+
+
+# 주제명 (600/610/650/653/655)
+SUBJECT_TAGS = ("600", "610", "650", "653", "655")
+# 주제 세목: $v 형식, $x 일반, $y 시대, $z 지리
+_SUBDIVISION_CODES = {"v", "x", "y", "z"}
+
+
+def parse_headings(raw: str | None) -> List[str]:
+    # "$a한국$x역사$y조선시대" -> ["한국 -- 역사 -- 조선시대"]
+    # $a마다 새 표목으로 보고, 서브필드 기호가 없으면 세미콜론/줄바꿈으로 나눈다
+    if not raw:
+        return []
+
+    subfields = iter_subfields(raw)
+    if not subfields:
+        parts = re.split(r"[;\n]", str(raw))
+        return [p.strip(" ,;:/.") for p in parts if p.strip(" ,;:/.")]
+
+    headings: List[List[str]] = []
+    for code, value in subfields:
+        if code == "a" or not headings:
+            headings.append([value])
+        elif code in _SUBDIVISION_CODES:
+            headings[-1].append(value)
+        else:
+            # $b, $c, $d 등은 표목 본체에 붙인다
+            headings[-1][0] = f"{headings[-1][0]} {value}"
+    return [" -- ".join(parts) for parts in headings]
+
+
+# 총서 (490): $a 총서명, $v 권차
+def parse_series(raw: str | None) -> List[Tuple[str, str | None]]:
+    # "$a문학동네 세계문학전집 ;$v12" -> [("문학동네 세계문학전집", "12")]
+    if not raw:
+        return []
+
+    subfields = iter_subfields(raw)
+    if not subfields:
+        parts = re.split(r"[\n]", str(raw))
+        return [(p.strip(" ,;:/."), None) for p in parts if p.strip(" ,;:/.")]
+
+    series: List[List] = []
+    for code, value in subfields:
+        if code == "a" or not series:
+            series.append([value, None])
+        elif code == "v" and series[-1][1] is None:
+            series[-1][1] = value
+    return [(name, volume) for name, volume in series]
+
+
+# 부출 표목 (700 개인명, 710 단체명): $a 이름, $b/$c/$d 부가 요소, $e 역할어
+_NAME_PART_CODES = {"b", "c", "d"}
+
+
+def parse_names(raw: str | None) -> List[Tuple[str, str | None]]:
+    # "$a김민준,$d1970-$e옮김" -> [("김민준 1970-", "옮김")]
+    if not raw:
+        return []
+
+    subfields = iter_subfields(raw)
+    if not subfields:
+        parts = re.split(r"[;\n]", str(raw))
+        return [(p.strip(" ,;:/."), None) for p in parts if p.strip(" ,;:/.")]
+
+    names: List[List] = []
+    for code, value in subfields:
+        if code == "a" or not names:
+            names.append([value, None])
+        elif code in _NAME_PART_CODES:
+            names[-1][0] = f"{names[-1][0]} {value}"
+        elif code in ("e", "4") and names[-1][1] is None:
+            names[-1][1] = value
+    return [(name, role) for name, role in names]
+
+
+# 형태사항 (300): $a 페이지, $c 크기
+_PHYSICAL_PAGES_RE = re.compile(r"\$a\s*([0-9IVXLCDMivxlcdm.,\s\-–—]+)\s*p", re.IGNORECASE)
+_PHYSICAL_SIZE_RE = re.compile(r"\$c\s*([\d.,\s]+)\s*cm", re.IGNORECASE)
+
+
+def parse_physical(raw: str | None) -> Tuple[str | None, str | None]:
+    # "$a320 p. :$b삽화 ;$c23 cm" -> ("320p", "23cm")
+    if not raw:
+        return None, None
+
+    pages, size = None, None
+    m_page = _PHYSICAL_PAGES_RE.search(raw)
+    if m_page:
+        num = (m_page.group(1).replace(" ", "")
+                .replace(",", "")
+                .replace("–", "-")
+                .replace("—", "-")
+                .rstrip("."))
+        if num:
+            pages = f"{num}p"
+
+    m_size = _PHYSICAL_SIZE_RE.search(raw)
+    if m_size:
+        num = m_size.group(1).replace(" ", "").replace(",", "")
+        if num:
+            size = f"{num}cm"
+    return pages, size
+
+
+# Marc 속성 이름 -> data JSON 위치 (태그, 키)
+# 각 태그는 data 한 곳에만 저장하고 Marc.field_xxx는 이 위치를 읽고 쓰는 속성이다.
+MARC_COLUMNS: Dict[str, Tuple[str, str]] = {
+    "field_020": ("020", "a"),
+    "field_020_set": ("020", "set"),
+    **{f"field_{tag}": (tag, "a") for tag in (
+        "022", "052", "056", "090", "245", "250", "260", "300", "310", "362", "490",
+        "500", "502", "504", "541", "546", "586", "590",
+        "600", "610", "647", "650", "653", "655", "700", "710", "720", "730", "856",
+    )},
+    "field_246_same": ("246", "parallel_title"),
+    "field_246_origin": ("246", "original_title"),
+}
+
+
+# 태그별 서브필드: data[태그]["subfields"] = {기호: [값]} (저장 시 한 번 파싱)
+SUBFIELDS = "subfields"
+
+
+@lru_cache(maxsize=4096)
+def _raw_pairs(raw: str) -> Tuple[Tuple[str, str], ...]:
+    # 원문 하나의 (서브필드 기호, 값) 목록, 최근 원문은 다시 파싱하지 않는다 (marc_json 뒤 Marc.save 등)
+    if _SUBFIELD_RE.search(raw):
+        return tuple(iter_subfields(raw))
+    return (("a", raw.strip().strip(" ,;:/")),)
+
+
+def tag_subfields(entry: Dict[str, str]) -> Dict[str, List[str]]:
+    # 태그의 원문 값들을 순서대로 파싱 (서브필드 기호가 없는 값은 $a 하나로 본다)
+    results: Dict[str, List[str]] = {}
+    for key, raw in entry.items():
+        if key == SUBFIELDS or not isinstance(raw, str):
+            continue
+        for code, value in _raw_pairs(raw):
+            if value:
+                results.setdefault(code, []).append(value)
+    return results
+
+
+def with_subfields(data: Dict[str, dict]) -> Dict[str, dict]:
+    # 모든 태그의 subfields를 원문 값에서 다시 계산한 새 dict (들고 온 subfields는 믿지 않음)
+    results: Dict[str, dict] = {}
+    for tag, entry in (data or {}).items():
+        if isinstance(entry, dict):
+            entry = {k: v for k, v in entry.items() if k != SUBFIELDS}
+            subfields = tag_subfields(entry)
+            if subfields:
+                entry[SUBFIELDS] = subfields
+        results[tag] = entry
+    return results
+
+
+def subfield(data: Dict[str, dict] | None, tag: str, code: str) -> str | None:
+    # 저장된 구조에서 첫 번째 값 (문자열 파싱 없음)
+    entry = (data or {}).get(tag)
+    values = entry.get(SUBFIELDS, {}).get(code) if isinstance(entry, dict) else None
+    return values[0] if values else None
+
+
+def marc_json(columns: Dict[str, str | None]) -> Dict[str, dict]:
+    # {"field_245": "$a..."} -> {"245": {"a": "$a...", "subfields": {"a": [...]}}} (빈 값은 넣지 않음)
+    data: Dict[str, dict] = {}
+    for name, (tag, key) in MARC_COLUMNS.items():
+        value = columns.get(name)
+        if value:
+            data.setdefault(tag, {})[key] = value
+    return with_subfields(data)
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:37
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# books/search.py 색인 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+INDEXED_FIELDS = ('title', 'author', 'publisher')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    if not text:
+        return []
+    s = unicodedata.normalize('NFKD', str(text))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(unicodedata.normalize('NFC', s).casefold())
+
+
+def _ngrams(text):
+    # 단어마다 2-gram + 3-gram
+    return {tok[i:i + n] for tok in _tokenize(text) for n in (2, 3) for i in range(len(tok) - n + 1)}
+
+
+def fill_ngrams(apps, schema_editor):
+    # 기존 도서 색인 채우기 (배포 직후부터 검색이 되도록)
+    Book = apps.get_model('books', 'Book')
+    BookNgram = apps.get_model('books', 'BookNgram')
+    batch = []
+    for book in Book.objects.only('id', *INDEXED_FIELDS).order_by('pk').iterator(chunk_size=2000):
+        for field in INDEXED_FIELDS:
+            batch += [BookNgram(book_id=book.pk, field=field, gram=gram) for gram in _ngrams(getattr(book, field))]
+        if len(batch) >= 5000:
+            BookNgram.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        BookNgram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0017_book_issn_alter_targetname_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='issn',
+            field=models.CharField(blank=True, db_index=True, max_length=20, null=True),
+        ),
+        migrations.CreateModel(
+            name='BookNgram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(choices=[('title', '표제'), ('author', '저자'), ('publisher', '출판사')], max_length=20)),
+                ('gram', models.CharField(max_length=3)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ngrams', to='books.book')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['field', 'gram', 'book'], name='idx_ngram_field_gram')],
+                'constraints': [models.UniqueConstraint(fields=('book', 'field', 'gram'), name='uq_ngram_book_field_gram')],
+            },
+        ),
+        migrations.RunPython(fill_ngrams, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:38
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# books/search.py 초성/색인 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+_CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+_CHOSUNG_SET = set(_CHOSUNG)
+_CONJOINING_TO_COMPAT = {chr(0x1100 + i): ch for i, ch in enumerate(_CHOSUNG)}
+_TOKEN_RE = re.compile(r'\w+')
+CHOSUNG_FIELDS = {'title': 'title_chosung', 'author': 'author_chosung'}
+
+
+def chosung(text):
+    if not text:
+        return ''
+    out = []
+    for ch in str(text):
+        code = ord(ch)
+        if 0xAC00 <= code <= 0xD7A3:
+            out.append(_CHOSUNG[(code - 0xAC00) // 588])
+        elif ch in _CHOSUNG_SET:
+            out.append(ch)
+        elif ch in _CONJOINING_TO_COMPAT:
+            out.append(_CONJOINING_TO_COMPAT[ch])
+    return ''.join(out)
+
+
+def _ngrams(text):
+    # 단어마다 2-gram + 3-gram (정규화 후)
+    if not text:
+        return set()
+    s = unicodedata.normalize('NFKD', str(text))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    tokens = _TOKEN_RE.findall(unicodedata.normalize('NFC', s).casefold())
+    return {tok[i:i + n] for tok in tokens for n in (2, 3) for i in range(len(tok) - n + 1)}
+
+
+def fill_chosung(apps, schema_editor):
+    # 기존 도서 초성 컬럼 + 초성 n-gram 색인 채우기
+    Book = apps.get_model('books', 'Book')
+    BookNgram = apps.get_model('books', 'BookNgram')
+    batch, grams = [], []
+    for book in Book.objects.only('id', 'title', 'author').order_by('pk').iterator(chunk_size=2000):
+        for src, field in CHOSUNG_FIELDS.items():
+            value = chosung(getattr(book, src))
+            setattr(book, field, value or None)
+            grams += [BookNgram(book_id=book.pk, field=field, gram=gram) for gram in _ngrams(value)]
+        batch.append(book)
+        if len(batch) >= 2000:
+            Book.objects.bulk_update(batch, list(CHOSUNG_FIELDS.values()))
+            BookNgram.objects.bulk_create(grams, batch_size=5000)
+            batch, grams = [], []
+    if batch:
+        Book.objects.bulk_update(batch, list(CHOSUNG_FIELDS.values()))
+        BookNgram.objects.bulk_create(grams, batch_size=5000)
+
+
+def remove_chosung_ngrams(apps, schema_editor):
+    BookNgram = apps.get_model('books', 'BookNgram')
+    BookNgram.objects.filter(field__in=list(CHOSUNG_FIELDS.values())).delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0018_bookngram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='author_chosung',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.AddField(
+            model_name='book',
+            name='title_chosung',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=200, null=True),
+        ),
+        migrations.AlterField(
+            model_name='bookngram',
+            name='field',
+            field=models.CharField(choices=[('title', '표제'), ('author', '저자'), ('publisher', '출판사'), ('title_chosung', '표제(초성)'), ('author_chosung', '저자(초성)')], max_length=20),
+        ),
+        migrations.RunPython(fill_chosung, remove_chosung_ngrams),
+    ]
@@ -0,0 +1,127 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:40
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+# books/search.py 색인/통계 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+INDEXED_FIELDS = ('title', 'author', 'publisher')
+CHOSUNG_FIELDS = ('title_chosung', 'author_chosung')
+MARC_FIELD = 'marc'
+MARC_INDEXED_FIELDS = ('field_245', 'field_246_same', 'field_246_origin')
+_TOKEN_RE = re.compile(r'\w+')
+_SUBFIELD_CODE_RE = re.compile(r'\$[0-9a-zA-Z]')
+
+
+def _ngram_counts(text):
+    # 단어마다 2-gram + 3-gram (출현 횟수 포함)
+    grams = Counter()
+    if not text:
+        return grams
+    s = unicodedata.normalize('NFKD', str(text))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    for tok in _TOKEN_RE.findall(unicodedata.normalize('NFC', s).casefold()):
+        for n in (2, 3):
+            for i in range(len(tok) - n + 1):
+                grams[tok[i:i + n]] += 1
+    return grams
+
+
+def fill_search_stats(apps, schema_editor):
+    # 기존 색인을 tf/field_len과 함께 다시 만들고 df/필드 통계 계산 (배포 직후부터 BM25 순위가 맞도록)
+    # 초성 컬럼은 0019에서 채워 둔 값을 쓴다
+    Book = apps.get_model('books', 'Book')
+    Marc = apps.get_model('books', 'Marc')
+    BookNgram = apps.get_model('books', 'BookNgram')
+    SearchTermStat = apps.get_model('books', 'SearchTermStat')
+    SearchFieldStat = apps.get_model('books', 'SearchFieldStat')
+
+    last_pk = 0
+    while True:
+        books = list(Book.objects.filter(pk__gt=last_pk).order_by('pk')
+                     .only('id', *INDEXED_FIELDS, *CHOSUNG_FIELDS)[:1000])
+        if not books:
+            break
+        ids = [b.pk for b in books]
+        marcs = {m.book_id: m for m in Marc.objects.filter(book_id__in=ids).only('book_id', *MARC_INDEXED_FIELDS)}
+        rows = []
+        for book in books:
+            grams_by_field = {f: _ngram_counts(getattr(book, f)) for f in INDEXED_FIELDS + CHOSUNG_FIELDS}
+            marc = marcs.get(book.pk)
+            if marc is not None:
+                raw = ' '.join(getattr(marc, f) or '' for f in MARC_INDEXED_FIELDS)
+                grams_by_field[MARC_FIELD] = _ngram_counts(_SUBFIELD_CODE_RE.sub(' ', raw))
+            for field, counts in grams_by_field.items():
+                length = sum(counts.values())
+                rows += [BookNgram(book_id=book.pk, field=field, gram=g, tf=tf, field_len=length)
+                         for g, tf in counts.items()]
+        BookNgram.objects.filter(book_id__in=ids).delete()
+        BookNgram.objects.bulk_create(rows, batch_size=5000)
+        last_pk = ids[-1]
+
+    batch = []
+    for row in BookNgram.objects.values('field', 'gram').annotate(df=Count('book_id')).order_by().iterator():
+        batch.append(SearchTermStat(**row))
+        if len(batch) >= 5000:
+            SearchTermStat.objects.bulk_create(batch)
+            batch = []
+    SearchTermStat.objects.bulk_create(batch)
+
+    totals = defaultdict(lambda: [0, 0])
+    per_doc = BookNgram.objects.values('field', 'book_id').annotate(length=Max('field_len')).order_by()
+    for row in per_doc.iterator():
+        totals[row['field']][0] += 1
+        totals[row['field']][1] += row['length']
+    SearchFieldStat.objects.bulk_create([
+        SearchFieldStat(field=field, doc_count=n, total_length=length) for field, (n, length) in totals.items()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0019_book_chosung'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchFieldStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20, unique=True)),
+                ('doc_count', models.IntegerField(default=0)),
+                ('total_length', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='bookngram',
+            name='field_len',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='bookngram',
+            name='tf',
+            field=models.PositiveSmallIntegerField(default=1),
+        ),
+        migrations.AlterField(
+            model_name='bookngram',
+            name='field',
+            field=models.CharField(choices=[('title', '표제'), ('author', '저자'), ('publisher', '출판사'), ('title_chosung', '표제(초성)'), ('author_chosung', '저자(초성)'), ('marc', 'MARC 245/246')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='SearchTermStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=20)),
+                ('gram', models.CharField(max_length=3)),
+                ('df', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('field', 'gram'), name='uq_termstat_field_gram')],
+            },
+        ),
+        migrations.RunPython(fill_search_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0020_search_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Subject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(max_length=3)),
+                ('name', models.CharField(max_length=255)),
+                ('normalized', models.CharField(db_index=True, max_length=255)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tag', 'normalized'), name='uq_subject_tag_normalized')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookSubject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subject_links', to='books.book')),
+                ('subject', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_links', to='books.subject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('subject', 'book'), name='uq_booksubject_subject_book')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:44
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_counts(apps, schema_editor):
+    Book = apps.get_model('books', 'Book')
+    FacetCount = apps.get_model('books', 'FacetCount')
+    paths = {
+        'book_status': 'book_status',
+        'location': 'location',
+        'target': 'targets__target__name',
+        'publisher': 'publisher',
+    }
+    rows = []
+    for facet, path in paths.items():
+        for value, n in Book.objects.order_by().values_list(path).annotate(n=Count('pk')):
+            if value:
+                rows.append(FacetCount(facet=facet, value=value, count=n))
+    FacetCount.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0021_subjects'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FacetCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=200)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='uq_facetcount_facet_value')],
+            },
+        ),
+        migrations.RunPython(fill_counts, migrations.RunPython.noop),
+    ]
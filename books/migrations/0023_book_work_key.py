@@ -0,0 +1,70 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:46
+
+import hashlib
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# books/works.py work_key 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    if not text:
+        return []
+    s = unicodedata.normalize('NFKD', str(text))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    return _TOKEN_RE.findall(unicodedata.normalize('NFC', s).casefold())
+
+
+def _isbn13(isbn):
+    if not isbn:
+        return None
+    isbn = re.sub(r'[^0-9Xx]', '', re.split(r'[\s\(\)]', isbn)[0]).upper()
+    if len(isbn) == 10:
+        body = '978' + isbn[:9]
+        check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body)) % 10) % 10
+        return f'{body}{check}'
+    return isbn if len(isbn) == 13 and isbn.isdigit() else None
+
+
+def work_key(isbn, title, author):
+    normalized = _isbn13(isbn)
+    if normalized:
+        return f'isbn:{normalized}'
+    title = ' '.join(_tokenize(title))
+    if not title:
+        return None
+    author = ' '.join(_tokenize(author))
+    return 'ta:' + hashlib.sha1(f'{title}\x1f{author}'.encode('utf-8')).hexdigest()
+
+
+def fill_work_key(apps, schema_editor):
+    # 기존 도서 복본 묶음 키 채우기
+    Book = apps.get_model('books', 'Book')
+    batch = []
+    for book in Book.objects.only('id', 'isbn', 'title', 'author').iterator(chunk_size=2000):
+        book.work_key = work_key(book.isbn, book.title, book.author)
+        batch.append(book)
+        if len(batch) >= 2000:
+            Book.objects.bulk_update(batch, ['work_key'])
+            batch = []
+    if batch:
+        Book.objects.bulk_update(batch, ['work_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0022_facetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='work_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.RunPython(fill_work_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,91 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:47
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+# books/shelf.py callnumber_key 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+_SUBFIELD_RE = re.compile(r'\$([0-9a-zA-Z])')
+_CLASS_RE = re.compile(r'^(\d{1,3})(?:\.(\d+))?$')
+_PART_RE = re.compile(r'^(v|c|vol|no|pt|t)\.?(\d+)$|^(\d+)(권|책|호)$')
+
+
+def _subfield_values(raw):
+    s = str(raw)
+    matches = list(_SUBFIELD_RE.finditer(s))
+    values = []
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(s)
+        value = s[m.start() + 2:end].strip().strip(' ,;:/')
+        if value:
+            values.append(value)
+    return values
+
+
+def _normalize(text):
+    s = unicodedata.normalize('NFKD', str(text))
+    s = ''.join(ch for ch in s if not unicodedata.combining(ch))
+    return unicodedata.normalize('NFC', s).casefold()
+
+
+def callnumber_key(callnumber):
+    if not callnumber:
+        return None
+    values = _subfield_values(callnumber)
+    text = ' '.join(values) if values else str(callnumber)
+
+    parts = []
+    seen_class = False
+    for token in _normalize(text).replace('-', ' ').split():
+        token = token.strip(',;:/()')
+        if not token:
+            continue
+        if not seen_class:
+            m = _CLASS_RE.match(token)
+            if m:
+                whole, frac = m.groups()
+                parts.append(whole.zfill(3) + (f'.{frac}' if frac else ''))
+                seen_class = True
+                continue
+        m = _PART_RE.match(token)
+        if m and m.group(1):
+            token = f'{m.group(1)}.{m.group(2).zfill(6)}'
+        elif m:
+            token = f'{m.group(3).zfill(6)}{m.group(4)}'
+        parts.append(token)
+    return ' '.join(parts)[:255] or None
+
+
+def fill_callnumber_key(apps, schema_editor):
+    # 기존 도서 서가 정렬 키 채우기
+    Book = apps.get_model('books', 'Book')
+    batch = []
+    for book in Book.objects.only('id', 'callnumber').iterator(chunk_size=2000):
+        book.callnumber_key = callnumber_key(book.callnumber)
+        batch.append(book)
+        if len(batch) >= 2000:
+            Book.objects.bulk_update(batch, ['callnumber_key'])
+            batch = []
+    if batch:
+        Book.objects.bulk_update(batch, ['callnumber_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0023_book_work_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='callnumber_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['callnumber_key', 'id'], name='idx_book_shelf'),
+        ),
+        migrations.RunPython(fill_callnumber_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0024_book_callnumber_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Series',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized', models.CharField(max_length=255, unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Contributor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag', models.CharField(choices=[('700', '개인명'), ('710', '단체명')], max_length=3)),
+                ('name', models.CharField(max_length=255)),
+                ('normalized', models.CharField(db_index=True, max_length=255)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('tag', 'normalized'), name='uq_contributor_tag_normalized')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookContributor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, max_length=50, null=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributor_links', to='books.book')),
+                ('contributor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_links', to='books.contributor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('contributor', 'book'), name='uq_bookcontributor_contributor_book')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BookSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('volume', models.CharField(blank=True, max_length=50, null=True)),
+                ('volume_no', models.IntegerField(blank=True, null=True)),
+                ('book', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series_links', to='books.book')),
+                ('series', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='book_links', to='books.series')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('series', 'book'), name='uq_bookseries_series_book')],
+            },
+        ),
+    ]
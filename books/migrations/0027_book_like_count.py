@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:53
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_like_count(apps, schema_editor):
+    # 기존 좋아요 수 채우기
+    Book = apps.get_model('books', 'Book')
+    Like = Book.liked_users.through
+    counts = (Like.objects.filter(book_id=OuterRef('pk')).order_by()
+              .values('book_id').annotate(n=Count('pk')).values('n'))
+    Book.objects.update(like_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0026_searchquerylog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(fields=['-like_count', 'id'], name='idx_book_popular'),
+        ),
+        migrations.RunPython(fill_like_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 05:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0027_book_like_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marc',
+            name='physical_pages',
+            field=models.CharField(blank=True, editable=False, max_length=50, null=True, verbose_name='페이지'),
+        ),
+        migrations.AddField(
+            model_name='marc',
+            name='physical_size',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='크기'),
+        ),
+    ]
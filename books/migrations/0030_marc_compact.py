@@ -0,0 +1,202 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:13
+
+from django.db import migrations
+
+# books/marc.py의 태그 컬럼 -> data 위치를 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+MARC_COLUMNS = {
+    'field_020': ('020', 'a'),
+    'field_020_set': ('020', 'set'),
+    **{f'field_{tag}': (tag, 'a') for tag in (
+        '022', '052', '056', '090', '245', '250', '260', '300', '310', '362', '490',
+        '500', '502', '504', '541', '546', '586', '590',
+        '600', '610', '647', '650', '653', '655', '700', '710', '720', '730', '856',
+    )},
+    'field_246_same': ('246', 'parallel_title'),
+    'field_246_origin': ('246', 'original_title'),
+}
+
+
+def marc_json(columns):
+    # {'field_245': '$a...'} -> {'245': {'a': '$a...'}} (빈 값은 넣지 않음, 서브필드는 0031에서)
+    data = {}
+    for name, (tag, key) in MARC_COLUMNS.items():
+        value = columns.get(name)
+        if value:
+            data.setdefault(tag, {})[key] = value
+    return data
+
+
+def columns_to_data(apps, schema_editor):
+    # 태그 컬럼 값으로 data 다시 만들기 (컬럼 삭제 전, data가 오래된 행 대비)
+    Marc = apps.get_model('books', 'Marc')
+    batch = []
+    for marc in Marc.objects.order_by('pk').iterator(chunk_size=2000):
+        data = marc_json({name: getattr(marc, name) for name in MARC_COLUMNS})
+        if data != marc.data:
+            marc.data = data
+            batch.append(marc)
+        if len(batch) >= 2000:
+            Marc.objects.bulk_update(batch, ['data'])
+            batch = []
+    if batch:
+        Marc.objects.bulk_update(batch, ['data'])
+
+
+def data_to_columns(apps, schema_editor):
+    # 되돌리기: data에서 태그 컬럼 채우기
+    Marc = apps.get_model('books', 'Marc')
+    batch = []
+    for marc in Marc.objects.order_by('pk').iterator(chunk_size=2000):
+        data = marc.data if isinstance(marc.data, dict) else {}
+        for name, (tag, key) in MARC_COLUMNS.items():
+            entry = data.get(tag)
+            setattr(marc, name, entry.get(key) if isinstance(entry, dict) else None)
+        batch.append(marc)
+        if len(batch) >= 2000:
+            Marc.objects.bulk_update(batch, list(MARC_COLUMNS))
+            batch = []
+    if batch:
+        Marc.objects.bulk_update(batch, list(MARC_COLUMNS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0029_book_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(columns_to_data, data_to_columns),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_020',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_020_set',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_022',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_052',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_056',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_090',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_245',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_246_origin',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_246_same',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_250',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_260',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_300',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_310',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_362',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_490',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_500',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_502',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_504',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_541',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_546',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_586',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_590',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_600',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_610',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_647',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_650',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_653',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_655',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_700',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_710',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_720',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_730',
+        ),
+        migrations.RemoveField(
+            model_name='marc',
+            name='field_856',
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:16
+
+import re
+
+from django.db import migrations
+
+# books/marc.py 서브필드 파싱 규칙을 이 시점 그대로 복사 (앱 코드가 바뀌어도 마이그레이션 결과는 같아야 함)
+SUBFIELDS = 'subfields'
+_SUBFIELD_RE = re.compile(r'\$([0-9a-zA-Z])')
+
+
+def _iter_subfields(raw):
+    s = str(raw)
+    matches = list(_SUBFIELD_RE.finditer(s))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(s)
+        value = s[m.start() + 2:end].strip().strip(' ,;:/')
+        if value:
+            yield m.group(1).lower(), value
+
+
+def _tag_subfields(entry):
+    results = {}
+    for key, raw in entry.items():
+        if key == SUBFIELDS or not isinstance(raw, str):
+            continue
+        if _SUBFIELD_RE.search(raw):
+            pairs = _iter_subfields(raw)
+        else:
+            pairs = [('a', raw.strip().strip(' ,;:/'))]
+        for code, value in pairs:
+            if value:
+                results.setdefault(code, []).append(value)
+    return results
+
+
+def with_subfields(data):
+    # subfields가 없는 태그만 파싱해 채운 새 dict
+    results = {}
+    for tag, entry in (data or {}).items():
+        if isinstance(entry, dict) and SUBFIELDS not in entry:
+            subfields = _tag_subfields(entry)
+            if subfields:
+                entry = {**entry, SUBFIELDS: subfields}
+        results[tag] = entry
+    return results
+
+
+def _rewrite(apps, convert):
+    Marc = apps.get_model('books', 'Marc')
+    batch = []
+    for marc in Marc.objects.only('id', 'data').order_by('pk').iterator(chunk_size=2000):
+        data = convert(marc.data if isinstance(marc.data, dict) else {})
+        if data != marc.data:
+            marc.data = data
+            batch.append(marc)
+        if len(batch) >= 2000:
+            Marc.objects.bulk_update(batch, ['data'])
+            batch = []
+    if batch:
+        Marc.objects.bulk_update(batch, ['data'])
+
+
+def add_subfields(apps, schema_editor):
+    # 기존 행에 태그별 서브필드 채우기
+    _rewrite(apps, with_subfields)
+
+
+def remove_subfields(apps, schema_editor):
+    _rewrite(apps, lambda data: {
+        tag: {k: v for k, v in entry.items() if k != SUBFIELDS} if isinstance(entry, dict) else entry
+        for tag, entry in data.items()
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0030_marc_compact'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_subfields, remove_subfields),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+def seed_changes(apps, schema_editor):
+    # 기존 도서마다 변경 한 건 (since=0이면 전체 목록을 받도록)
+    Book = apps.get_model('books', 'Book')
+    BookChange = apps.get_model('books', 'BookChange')
+    batch = []
+    for book_id in Book.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=5000):
+        batch.append(BookChange(book_id=book_id))
+        if len(batch) >= 5000:
+            BookChange.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        BookChange.objects.bulk_create(batch)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0031_marc_subfields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('book_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(seed_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:52
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_book_count(apps, schema_editor):
+    # 기존 표목별 연결 도서 수 채우기
+    for heading, link, fk in (('Subject', 'BookSubject', 'subject_id'),
+                              ('Series', 'BookSeries', 'series_id'),
+                              ('Contributor', 'BookContributor', 'contributor_id')):
+        Link = apps.get_model('books', link)
+        counts = (Link.objects.filter(**{fk: OuterRef('pk')}).order_by()
+                  .values(fk).annotate(n=Count('pk')).values('n'))
+        apps.get_model('books', heading).objects.update(book_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0032_book_changes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contributor',
+            name='book_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='series',
+            name='book_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subject',
+            name='book_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='contributor',
+            index=models.Index(fields=['-book_count', 'name'], name='idx_contributor_browse'),
+        ),
+        migrations.AddIndex(
+            model_name='series',
+            index=models.Index(fields=['-book_count', 'name'], name='idx_series_browse'),
+        ),
+        migrations.AddIndex(
+            model_name='subject',
+            index=models.Index(fields=['-book_count', 'name'], name='idx_subject_browse'),
+        ),
+        migrations.RunPython(fill_book_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 07:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0033_heading_book_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookChangeFloor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.BigIntegerField()),
+                ('pruned_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='bookchange',
+            index=models.Index(fields=['book_id'], name='idx_bookchange_book'),
+        ),
+    ]
@@ -3,9 +3,15 @@
 # 실제 반영
 ## python run_with_tunnel.py import_books --file ./book.csv
 
+import copy
+
 from django.db import models
 from django.core.serializers.json import DjangoJSONEncoder
 from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .marc import MARC_COLUMNS, SUBFIELDS, subfield, tag_subfields, with_subfields
 
 # Create your models here.
 class BookStatus(models.TextChoices):
@@ -26,8 +32,8 @@ class Book(models.Model):
     title = models.CharField(max_length=200, null=True, blank=True) # 표제
     author = models.CharField(max_length=200, null=True, blank=True) # 저자사항
     publisher = models.CharField(max_length=200, blank=True, null=True) # 출판사
-    isbn = models.CharField(max_length=20, null=True, blank=True) # ISBN
-    issn = models.CharField(max_length=20, null=True, blank=True) # ISSN
+    isbn = models.CharField(max_length=20, null=True, blank=True, db_index=True) # ISBN
+    issn = models.CharField(max_length=20, null=True, blank=True, db_index=True) # ISSN
     callnumber = models.CharField(max_length=200, null=True, blank=True) # 청구기호
     location = models.CharField(max_length=20, blank=True, null=True) # 위치
     edition = models.CharField(max_length=100, null=True, blank=True) # 판사항
@@ -36,124 +42,417 @@ class Book(models.Model):
     # image = models.ImageField(upload_to='book_images/', null=True, blank=True)  # 표지 이미지
     image_url = models.URLField(null=True, blank=True)
 
+    # 초성 검색용 (save 시 자동 계산)
+    title_chosung = models.CharField(max_length=200, null=True, blank=True, editable=False, db_index=True)
+    author_chosung = models.CharField(max_length=200, null=True, blank=True, editable=False, db_index=True)
+    # 같은 책(복본) 묶음 키: ISBN 또는 표제/저자 (save 시 자동 계산, books/works.py)
+    work_key = models.CharField(max_length=64, null=True, blank=True, editable=False, db_index=True)
+    # 서가 순서 정렬 키 (save 시 자동 계산, books/shelf.py)
+    callnumber_key = models.CharField(max_length=255, null=True, blank=True, editable=False)
+
     liked_users = models.ManyToManyField( # 좋아요
         settings.AUTH_USER_MODEL,
         related_name='liked_books',
         blank=True
     )
+    like_count = models.PositiveIntegerField(default=0, editable=False) # 좋아요 수 (books/likes.py)
+
+    # 조건부 GET(ETag/Last-Modified)용: 도서, Marc, 이용자대상, 큐레이션이 바뀔 때마다 갱신
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    # 변경 감지 대상 필드
+    TRACKED_FIELDS = (
+        "title", "author", "publisher", "book_status", "location", "isbn", "issn", "book_code", "callnumber",
+    )
+
+    class Meta:
+        indexes = [
+            # 서가 순서 키셋 페이지네이션 (callnumber_key, id)
+            models.Index(fields=["callnumber_key", "id"], name="idx_book_shelf"),
+            # 인기 도서 (/books/popular/)
+            models.Index(fields=["-like_count", "id"], name="idx_book_popular"),
+        ]
 
     def __str__(self):
         return f"{self.title} ({self.book_code})"
 
-class Marc(models.Model):
-    book = models.OneToOneField(Book, on_delete=models.CASCADE, related_name='marc')
-    data = models.JSONField("MARC JSON", default=dict, blank=True, encoder=DjangoJSONEncoder)
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot()
+        return instance
+
+    def _snapshot(self):
+        # DB에 저장된 값 기억 (지연 로딩 필드는 제외)
+        self._loaded = {f: self.__dict__[f] for f in self.TRACKED_FIELDS if f in self.__dict__}
+
+    def has_changed(self, fields, update_fields=None) -> bool:
+        if update_fields is not None and not set(fields) & set(update_fields):
+            return False
+        loaded = getattr(self, "_loaded", None)
+        if self._state.adding or loaded is None:
+            return True
+        return any(f not in loaded or loaded[f] != getattr(self, f) for f in fields)
+
+    @classmethod
+    def touch(cls, book_id):
+        # 관련 행(Marc, Target, Curation) 변경: 버전/수정 시각 갱신 + 상세 캐시 무효화 + 변경 피드 기록
+        if book_id is not None:
+            cls.touch_many([book_id])
+
+    @classmethod
+    def touch_many(cls, book_ids):
+        from . import cache as detail_cache, changes
+
+        book_ids = list(book_ids)
+        if not book_ids:
+            return
+        cls.objects.filter(pk__in=book_ids).update(updated_at=timezone.now(), version=F("version") + 1)
+        detail_cache.invalidate_many(book_ids)
+        changes.record(book_ids)
+
+    def save(self, *args, **kwargs):
+        from . import cache as detail_cache, changes
+        from .facets import book_deltas, bump
+        from .querylog import SEARCHABLE_FIELDS, invalidate_book
+        from .search import CHOSUNG_FIELDS, INDEXED_FIELDS, chosung, index_book
+        from .suggest import mark_stale
+        from .shelf import callnumber_key
+        from .works import WORK_KEY_FIELDS, work_key
+
+        update_fields = kwargs.get("update_fields")
+        reindex = self.has_changed(INDEXED_FIELDS, update_fields)
+        names_changed = self.has_changed(tuple(CHOSUNG_FIELDS), update_fields)
+        work_changed = self.has_changed(WORK_KEY_FIELDS, update_fields)
+        shelf_changed = self.has_changed(("callnumber",), update_fields)
+        search_changed = self.has_changed(SEARCHABLE_FIELDS, update_fields)
+        facet_deltas = book_deltas(self, update_fields)
+
+        # 초성 컬럼 동기화
+        if names_changed:
+            for src, field in CHOSUNG_FIELDS.items():
+                setattr(self, field, chosung(getattr(self, src)) or None)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], *CHOSUNG_FIELDS.values()}
+        # 복본 묶음 키
+        if work_changed:
+            self.work_key = work_key(self.isbn, self.title, self.author)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "work_key"}
+        # 서가 정렬 키
+        if shelf_changed:
+            self.callnumber_key = callnumber_key(self.callnumber)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "callnumber_key"}
+        # 조건부 GET 버전: 수정은 touch처럼 DB 값에서 올린다 (읽어 온 뒤 touch된 버전을 다시 쓰지 않도록)
+        adding = self._state.adding
+        self.version = (self.version or 0) + 1 if adding else F("version") + 1
+        if update_fields is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "updated_at", "version"}
+
+        super().save(*args, **kwargs)
+        if not adding:
+            self.refresh_from_db(fields=["version"])
+        # 검색 색인 갱신
+        if reindex:
+            index_book(self)
+        # 자동완성 재구성
+        if names_changed:
+            mark_stale()
+        # 인기 검색어 캐시에서 영향받는 항목 삭제
+        if search_changed:
+            invalidate_book(self)
+        # 상세 응답 캐시
+        detail_cache.invalidate(self.pk)
+        # 변경 피드
+        changes.record([self.pk])
+        # 패싯 집계
+        bump(facet_deltas)
+        self._snapshot()
+
+class BookNgram(models.Model):
+    # 검색 색인 (books/search.py)
+    FIELD_CHOICES = [
+        ("title", "표제"),
+        ("author", "저자"),
+        ("publisher", "출판사"),
+        ("title_chosung", "표제(초성)"),
+        ("author_chosung", "저자(초성)"),
+        ("marc", "MARC 245/246"),
+    ]
+
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="ngrams")
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    gram = models.CharField(max_length=3)
+    tf = models.PositiveSmallIntegerField(default=1) # 필드 안 출현 횟수
+    field_len = models.PositiveIntegerField(default=0) # 필드 전체 n-gram 수
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["book", "field", "gram"], name="uq_ngram_book_field_gram")
+        ]
+        indexes = [
+            models.Index(fields=["field", "gram", "book"], name="idx_ngram_field_gram"),
+        ]
+
+    def __str__(self):
+        return f"{self.gram} ({self.field}) -> {self.book_id}"
+
+class SearchTermStat(models.Model):
+    # BM25 문서 빈도 (필드별 n-gram을 가진 도서 수)
+    field = models.CharField(max_length=20)
+    gram = models.CharField(max_length=3)
+    df = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["field", "gram"], name="uq_termstat_field_gram")
+        ]
 
+    def __str__(self):
+        return f"{self.gram} ({self.field}): {self.df}"
 
-    field_020        = models.TextField("020", null=True, blank=True)
-    field_020_set    = models.TextField("020(세트)", null=True, blank=True)
-    field_022        = models.TextField("022", null=True, blank=True)
-    field_052        = models.TextField("052", null=True, blank=True)
-    field_056        = models.TextField("056", null=True, blank=True)
-    field_090        = models.TextField("090", null=True, blank=True)
+class SearchFieldStat(models.Model):
+    # BM25 필드 통계 (평균 길이 = total_length / doc_count)
+    field = models.CharField(max_length=20, unique=True)
+    doc_count = models.IntegerField(default=0)
+    total_length = models.BigIntegerField(default=0)
 
-    field_245        = models.TextField("245", null=True, blank=True)
-    field_246_same   = models.TextField("246(대등표제)", null=True, blank=True)
-    field_246_origin = models.TextField("246(원표제)", null=True, blank=True)
-    field_250        = models.TextField("250", null=True, blank=True)
+    def __str__(self):
+        return f"{self.field}: {self.doc_count} docs"
 
-    field_260        = models.TextField("260", null=True, blank=True)
-    field_300        = models.TextField("300", null=True, blank=True)
-    field_310        = models.TextField("310", null=True, blank=True)
-    field_362        = models.TextField("362", null=True, blank=True)
+class SearchQueryLog(models.Model):
+    # 검색어별 요청 수/응답 시간 (books/querylog.py에서 모아서 기록)
+    query = models.CharField(max_length=200, unique=True) # 정규화한 검색어
+    hits = models.BigIntegerField(default=0)
+    cache_hits = models.BigIntegerField(default=0)
+    total_ms = models.FloatField(default=0) # 평균 = total_ms / hits
+    max_ms = models.FloatField(default=0)
+    last_seen = models.DateTimeField()
 
-    field_490        = models.TextField("490", null=True, blank=True)
+    def __str__(self):
+        return f"{self.query}: {self.hits}"
 
-    field_500        = models.TextField("500", null=True, blank=True)
-    field_502        = models.TextField("502", null=True, blank=True)
-    field_504        = models.TextField("504", null=True, blank=True)
-    field_541        = models.TextField("541", null=True, blank=True)
-    field_546        = models.TextField("546", null=True, blank=True)
-    field_586        = models.TextField("586", null=True, blank=True)
-    field_590        = models.TextField("590", null=True, blank=True)
+class BookChange(models.Model):
+    # 변경 피드 (books/changes.py): id가 변경 순번, 도서가 삭제돼도 남아야 하므로 FK가 아님
+    book_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(auto_now_add=True)
 
-    field_600        = models.TextField("600", null=True, blank=True)
-    field_610        = models.TextField("610", null=True, blank=True)
-    field_647        = models.TextField("647", null=True, blank=True)
-    field_650        = models.TextField("650", null=True, blank=True)
-    field_653        = models.TextField("653", null=True, blank=True)
-    field_655        = models.TextField("655", null=True, blank=True)
+    class Meta:
+        indexes = [models.Index(fields=["book_id"], name="idx_bookchange_book")] # 정리 시 도서별 최신 행 확인
 
-    field_700        = models.TextField("700", null=True, blank=True)
-    field_710        = models.TextField("710", null=True, blank=True)
-    field_720        = models.TextField("720", null=True, blank=True)
-    field_730        = models.TextField("730", null=True, blank=True)
+    def __str__(self):
+        return f"{self.pk}: {self.book_id}{' (삭제)' if self.deleted else ''}"
 
-    field_856        = models.TextField("856", null=True, blank=True)
+class BookChangeFloor(models.Model):
+    # 변경 피드 정리 기록 (books/changes.py prune): seq 이하의 삭제 기록을 지웠음
+    # 이보다 작은 since로는 삭제를 놓칠 수 있어 전체 재동기화가 필요하다
+    seq = models.BigIntegerField()
+    pruned_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.seq} ({self.pruned_at:%Y-%m-%d})"
+
+class MarcColumn(property):
+    # Marc.field_xxx: data[태그][키]를 읽고 쓰는 속성 (books.marc.MARC_COLUMNS)
+    # 쓰기는 data를 새 dict로 바꿔 넣는다 (읽어 온 dict는 건드리지 않음)
+    def __init__(self, tag: str, key: str):
+        self.tag, self.key = tag, key
+        super().__init__(self._get, self._set)
+
+    def _get(self, marc):
+        entry = (marc.data or {}).get(self.tag)
+        return entry.get(self.key) if isinstance(entry, dict) else None
+
+    def _set(self, marc, value):
+        data = dict(marc.data or {})
+        entry = {k: v for k, v in (data.get(self.tag) or {}).items() if k != SUBFIELDS}
+        if value:
+            entry[self.key] = value
+        else:
+            entry.pop(self.key, None)
+        if entry:
+            # 서브필드는 값이 바뀔 때 한 번만 파싱해 함께 저장
+            subfields = tag_subfields(entry)
+            data[self.tag] = {**entry, SUBFIELDS: subfields} if subfields else entry
+        else:
+            data.pop(self.tag, None)
+        marc.data = data
+
+class Marc(models.Model):
+    book = models.OneToOneField(Book, on_delete=models.CASCADE, related_name='marc')
+    # 태그별 값은 data에만 저장: {"245": {"a": "$a...$d...", "subfields": {"a": [...], "d": [...]}}}
+    # field_020, field_245 등은 data를 읽고 쓰는 속성 (books.marc.MARC_COLUMNS)
+    data = models.JSONField("MARC JSON", default=dict, blank=True, encoder=DjangoJSONEncoder)
+
+    # 300 형태사항 파싱 결과 (save 시 자동 계산, books.marc.parse_physical)
+    physical_pages   = models.CharField("페이지", max_length=50, null=True, blank=True, editable=False)
+    physical_size    = models.CharField("크기", max_length=20, null=True, blank=True, editable=False)
 
     def __str__(self):
         return f"{self.book.title} ({self.book.book_code})"
-    
-    def build_json(self):
-        j = {}
-
-        def put(tag, key, val):
-            if not val:
-                return
-            j.setdefault(tag, {})
-            j[tag][key] = val
-
-        # 020
-        put("020", "a", self.field_020)
-        put("020", "set", self.field_020_set)
-
-        # 단일 텍스트/문자열 계열
-        simple_map = {
-            "022": self.field_022,
-            "052": self.field_052,
-            "056": self.field_056,
-            "090": self.field_090,
-            "245": self.field_245,
-            "250": self.field_250,
-            "260": self.field_260,
-            "300": self.field_300,
-            "310": self.field_310,
-            "362": self.field_362,
-            "490": self.field_490,
-            "500": self.field_500,
-            "502": self.field_502,
-            "504": self.field_504,
-            "541": self.field_541,
-            "546": self.field_546,
-            "586": self.field_586,
-            "590": self.field_590,
-            "600": self.field_600,
-            "610": self.field_610,
-            "647": self.field_647,
-            "650": self.field_650,
-            "653": self.field_653,
-            "655": self.field_655,
-            "700": self.field_700,
-            "710": self.field_710,
-            "720": self.field_720,
-            "730": self.field_730,
-            "856": self.field_856,
-        }
-        for tag, val in simple_map.items():
-            put(tag, "a", val)
-
-        # 246
-        if self.field_246_same:
-            put("246", "parallel_title", self.field_246_same)
-        if self.field_246_origin:
-            put("246", "original_title", self.field_246_origin)
-
-        return j
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 제자리 수정(marc.data["300"]["a"] = ...)도 알아차리도록 읽은 값을 복사해 둔다
+        instance._loaded_data = copy.deepcopy(instance.__dict__.get("data"))
+        return instance
+
+    def subfield(self, tag: str, code: str) -> str | None:
+        # 저장해 둔 서브필드의 첫 값: marc.subfield("245", "d")
+        return subfield(self.data, tag, code)
+
+    def data_changed(self) -> bool:
+        # 읽어 온 뒤 data가 바뀌었는지 (값 비교)
+        loaded = getattr(self, "_loaded_data", None)
+        if self._state.adding or loaded is None:
+            return True
+        return self.__dict__.get("data", loaded) != loaded
 
     def save(self, *args, **kwargs):
-        # save 시 JSON 동기화
-        self.data = self.build_json()
+        from .headings import sync_contributors, sync_series, sync_subjects
+        from .marc import parse_physical
+        from .search import index_marc
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # field_xxx는 data 컬럼에 들어 있다
+            update_fields = {"data" if f in MARC_COLUMNS else f for f in update_fields}
+            kwargs["update_fields"] = update_fields
+
+        # data가 그대로면 형태사항/색인/도서 버전 갱신을 건너뛴다
+        changed = self.data_changed()
+        if changed:
+            # 서브필드는 원문 값에서 다시 계산 (data를 통째로 넣은 경우 들고 온 subfields가 낡았을 수 있음)
+            self.data = with_subfields(self.data)
+            self.physical_pages, self.physical_size = parse_physical(self.field_300)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "data", "physical_pages", "physical_size"}
         super().save(*args, **kwargs)
+        self._loaded_data = copy.deepcopy(self.data)
+        if not changed:
+            return
+        # 245/246 랭킹 색인
+        index_marc(self)
+        # 주제명/총서/부출 표목 색인
+        sync_subjects(self)
+        sync_series(self)
+        sync_contributors(self)
+        # 도서 버전 갱신, 상세 캐시 무효화
+        Book.touch(self.book_id)
+
+    def delete(self, *args, **kwargs):
+        Book.touch(self.book_id)
+        return super().delete(*args, **kwargs)
+
+# field_xxx 속성 (import_books, 색인, 시리얼라이저에서 예전 컬럼처럼 사용)
+for _name, (_tag, _key) in MARC_COLUMNS.items():
+    setattr(Marc, _name, MarcColumn(_tag, _key))
+
+class Subject(models.Model):
+    # 주제명 표목 (MARC 600/610/650/653/655에서 추출)
+    tag = models.CharField(max_length=3)
+    name = models.CharField(max_length=255)
+    normalized = models.CharField(max_length=255, db_index=True) # 검색/중복 제거용
+    book_count = models.IntegerField(default=0, editable=False) # 연결된 도서 수 (books/headings.py에서 갱신)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "normalized"], name="uq_subject_tag_normalized")
+        ]
+        indexes = [models.Index(fields=["-book_count", "name"], name="idx_subject_browse")]
+
+    def __str__(self):
+        return f"{self.name} ({self.tag})"
+
+class BookSubject(models.Model):
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="subject_links")
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name="book_links")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["subject", "book"], name="uq_booksubject_subject_book")
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} - {self.subject}"
+
+class Series(models.Model):
+    # 총서 (MARC 490에서 추출)
+    name = models.CharField(max_length=255)
+    normalized = models.CharField(max_length=255, unique=True) # 검색/중복 제거용
+    book_count = models.IntegerField(default=0, editable=False) # 연결된 도서 수 (books/headings.py에서 갱신)
+
+    class Meta:
+        indexes = [models.Index(fields=["-book_count", "name"], name="idx_series_browse")]
+
+    def __str__(self):
+        return self.name
+
+class BookSeries(models.Model):
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="series_links")
+    series = models.ForeignKey(Series, on_delete=models.CASCADE, related_name="book_links")
+    volume = models.CharField(max_length=50, null=True, blank=True) # 490 $v
+    volume_no = models.IntegerField(null=True, blank=True) # 권차 정렬용
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["series", "book"], name="uq_bookseries_series_book")
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} - {self.series} {self.volume or ''}".strip()
+
+class Contributor(models.Model):
+    # 부출 표목 (MARC 700 개인명, 710 단체명에서 추출)
+    KIND_CHOICES = [
+        ("700", "개인명"),
+        ("710", "단체명"),
+    ]
+
+    tag = models.CharField(max_length=3, choices=KIND_CHOICES)
+    name = models.CharField(max_length=255)
+    normalized = models.CharField(max_length=255, db_index=True) # 검색/중복 제거용
+    book_count = models.IntegerField(default=0, editable=False) # 연결된 도서 수 (books/headings.py에서 갱신)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tag", "normalized"], name="uq_contributor_tag_normalized")
+        ]
+        indexes = [models.Index(fields=["-book_count", "name"], name="idx_contributor_browse")]
+
+    def __str__(self):
+        return f"{self.name} ({self.tag})"
+
+class BookContributor(models.Model):
+    book = models.ForeignKey(Book, on_delete=models.CASCADE, related_name="contributor_links")
+    contributor = models.ForeignKey(Contributor, on_delete=models.CASCADE, related_name="book_links")
+    role = models.CharField(max_length=50, null=True, blank=True) # $e 역할어
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["contributor", "book"], name="uq_bookcontributor_contributor_book")
+        ]
+
+    def __str__(self):
+        return f"{self.book_id} - {self.contributor}"
+
+class FacetCount(models.Model):
+    # 전체 목록 패싯 집계 (books/facets.py)
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=200)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["facet", "value"], name="uq_facetcount_facet_value")
+        ]
+
+    def __str__(self):
+        return f"{self.facet}={self.value}: {self.count}"
 
 class TargetName(models.Model):
     name = models.CharField("이용자대상",  max_length=200, unique=True)
@@ -161,6 +460,22 @@ class TargetName(models.Model):
     class Meta:
         verbose_name = "TargetName"
 
+    def save(self, *args, **kwargs):
+        from .facets import bump
+
+        old = None
+        if not self._state.adding:
+            old = TargetName.objects.filter(pk=self.pk).values_list("name", flat=True).first()
+        super().save(*args, **kwargs)
+        if old is None or old == self.name:
+            return
+        # 이름이 바뀌면 연결된 도서의 field_521, 패싯 집계 값도 옮긴다
+        links = Target.objects.filter(target=self)
+        book_ids = list(links.exclude(book=None).values_list("book_id", flat=True))
+        links.update(field_521=self.name)
+        bump([("target", old, -len(book_ids)), ("target", self.name, len(book_ids))])
+        Book.touch_many(book_ids)
+
     def __str__(self):
         return self.name
 
@@ -179,9 +494,30 @@ class Target(models.Model):
         ]
 
     def save(self, *args, **kwargs):
+        from .facets import bump
+
+        # 저장 전 DB 값 (도서, 전거 이름): 연결이 바뀌면 이전 값을 빼고 새 값을 더한다
+        old = None
+        if not self._state.adding:
+            old = Target.objects.filter(pk=self.pk).values_list("book_id", "target__name").first()
         # 전거가 바뀌면 field_521 텍스트를 동기화
         self.field_521 = self.target.name
         super().save(*args, **kwargs)
+        # 패싯 집계
+        deltas = []
+        if old is not None and old[0]:
+            deltas.append(("target", old[1], -1))
+        if self.book_id:
+            deltas.append(("target", self.target.name, 1))
+        bump(deltas)
+        if old is not None and old[0] != self.book_id:
+            Book.touch(old[0])
+        Book.touch(self.book_id)
+
+    def delete(self, *args, **kwargs):
+        # 패싯 집계는 books/signals.py의 pre_delete에서
+        Book.touch(self.book_id)
+        return super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"{self.book.title}"
@@ -195,4 +531,12 @@ class Curation(models.Model):
         # verbose_name_plural = "Curation"
 
     def __str__(self):
-        return f"Curation[{self.book.title}]"
\ No newline at end of file
+        return f"Curation[{self.book.title}]"
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Book.touch(self.book_id)
+
+    def delete(self, *args, **kwargs):
+        Book.touch(self.book_id)
+        return super().delete(*args, **kwargs)
\ No newline at end of file
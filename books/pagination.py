@@ -0,0 +1,221 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from config.pagination import KeysetCursorPagination
+
+
+class BookCursorPagination(KeysetCursorPagination):
+    # 검색이 아닌 도서 목록: id 역순 keyset 커서
+    # ?collapse=true 행(표제 단위)은 대표 도서 id(book_id) 역순
+    def get_ordering(self, request, queryset, view):
+        if "book_id" in queryset.query.annotations:
+            return ("-book_id",)
+        return super().get_ordering(request, queryset, view)
+
+
+class RankedSearchPagination(BasePagination):
+    # 검색(?search=) 결과: BM25 점수 내림차순 + id 오름차순 (점수, id) keyset 커서 (OFFSET, COUNT(*) 없음)
+    # size+1건을 읽어 다음 페이지 여부만 판단, 깊은 페이지도 앞 페이지 행을 건너뛰며 읽지 않는다
+    # 점수가 없는 목록(검색이 아니거나 1글자 검색 등)은 BookCursorPagination
+    # 오타 허용 결과(fuzzy_ids, 최대 50건)는 자체 순위라 ?page= 번호로 나눈다
+    page_size = 20
+    cursor_query_param = "cursor"
+    page_query_param = "page"
+    page_size_query_param = "size"
+    max_page_size = 100
+    invalid_cursor_message = "잘못된 커서입니다."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.browse = None
+        self.page = None
+        self.size = min(self._positive_int(request.query_params.get(self.page_size_query_param), self.page_size),
+                        self.max_page_size)
+
+        if getattr(view, "search_fallback", None):
+            self.page = self._positive_int(request.query_params.get(self.page_query_param), 1)
+            offset = (self.page - 1) * self.size
+            rows = list(queryset[offset:offset + self.size + 1])
+            self.has_next, self.has_previous = len(rows) > self.size, self.page > 1
+            return rows[:self.size]
+
+        annotations = queryset.query.annotations
+        if "work_relevance" in annotations: # ?collapse=true
+            self.score, self.key = "work_relevance", "book_id"
+        elif "relevance" in annotations:
+            self.score, self.key = "relevance", "id"
+        else:
+            self.browse = BookCursorPagination()
+            return self.browse.paginate_queryset(queryset, request, view)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            score, key, self.reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.after(score, key, self.reverse))
+        else:
+            self.reverse = False
+
+        if self.reverse:
+            ordering = (F(self.score).asc(nulls_first=True), f"-{self.key}")
+        else:
+            ordering = (F(self.score).desc(nulls_last=True), self.key)
+        rows = list(queryset.order_by(*ordering)[:self.size + 1])
+        has_more = len(rows) > self.size
+        rows = rows[:self.size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            # 커서를 따라왔으면 앞 페이지가 있다
+            self.has_next, self.has_previous = has_more, bool(cursor)
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        return rows
+
+    def after(self, score, key, reverse: bool) -> Q:
+        # (점수 내림차순, 점수 없음은 맨 뒤, id 오름차순)에서 커서 다음(reverse면 앞) 행
+        s, k = self.score, self.key
+        if not reverse:
+            if score is None:
+                return Q(**{f"{s}__isnull": True, f"{k}__gt": key})
+            return Q(**{f"{s}__lt": score}) | Q(**{s: score, f"{k}__gt": key}) | Q(**{f"{s}__isnull": True})
+        if score is None:
+            return Q(**{f"{s}__isnull": False}) | Q(**{f"{s}__isnull": True, f"{k}__lt": key})
+        return Q(**{f"{s}__gt": score}) | Q(**{s: score, f"{k}__lt": key})
+
+    def get_paginated_response(self, data):
+        if self.browse is not None:
+            return self.browse.get_paginated_response(data)
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page is not None:
+            return replace_query_param(url, self.page_query_param, self.page + 1)
+        if self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page is not None:
+            if self.page == 2:
+                return remove_query_param(url, self.page_query_param)
+            return replace_query_param(url, self.page_query_param, self.page - 1)
+        if self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def encode_cursor(self, row, reverse: bool) -> str:
+        # 행은 모델 인스턴스 또는 values() dict
+        get = row.get if isinstance(row, dict) else lambda name: getattr(row, name)
+        raw = json.dumps([get(self.score), get(self.key), int(reverse)])
+        token = urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, token: str):
+        try:
+            score, key, reverse = json.loads(urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            return (None if score is None else float(score)), int(key), bool(reverse)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def _positive_int(value, default: int) -> int:
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+
+
+class ShelfPagination(BasePagination):
+    # 서가 순서(callnumber_key, id) 키셋 페이지네이션
+    # ?from=<청구기호>에서 시작하고, next/previous는 (키, id) 커서로 앞뒤로 이동 (OFFSET 없음)
+    page_size = 20
+    cursor_query_param = "cursor"
+    from_query_param = "from"
+    page_size_query_param = "size"
+    max_page_size = 100
+    invalid_cursor_message = "잘못된 커서입니다."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        from .shelf import callnumber_key
+
+        self.request = request
+        self.size = min(RankedSearchPagination._positive_int(
+            request.query_params.get(self.page_size_query_param), self.page_size), self.max_page_size)
+        queryset = queryset.filter(callnumber_key__isnull=False)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            key, pk, self.reverse = self.decode_cursor(cursor)
+            if self.reverse:
+                cond = Q(callnumber_key__lt=key) | Q(callnumber_key=key, pk__lt=pk)
+            else:
+                cond = Q(callnumber_key__gt=key) | Q(callnumber_key=key, pk__gt=pk)
+            # 커서를 따라왔으면 반대 방향에도 항목이 있다
+            has_other = True
+        else:
+            self.reverse = False
+            start = callnumber_key(request.query_params.get(self.from_query_param, ""))
+            cond = Q(callnumber_key__gte=start) if start else Q()
+            has_other = bool(start) and queryset.filter(callnumber_key__lt=start).exists()
+
+        if self.reverse:
+            ordering = ("-callnumber_key", "-pk")
+        else:
+            ordering = ("callnumber_key", "pk")
+        rows = list(queryset.filter(cond).order_by(*ordering)[:self.size + 1])
+        has_more = len(rows) > self.size
+        rows = rows[:self.size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = has_other, has_more
+        else:
+            self.has_next, self.has_previous = has_more, has_other
+        self.first, self.last = (rows[0], rows[-1]) if rows else (None, None)
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not (self.has_next and self.last):
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.first):
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def encode_cursor(self, book, reverse: bool) -> str:
+        raw = json.dumps([book.callnumber_key, book.pk, int(reverse)], ensure_ascii=False)
+        token = urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+        url = remove_query_param(self.request.build_absolute_uri(), self.from_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, token: str):
+        try:
+            key, pk, reverse = json.loads(urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+            return str(key), int(pk), bool(reverse)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
@@ -0,0 +1,177 @@
+# 검색어 기록 + 인기 검색어 결과 캐시
+# 정규화한 검색어별 요청 수/응답 시간을 프로세스 안에 모아 두었다가 주기적으로 SearchQueryLog에 더한다.
+# DB 기록은 응답을 보낸 뒤(request_finished, books/signals.py)에 하므로 검색 응답 시간에 들어가지 않는다.
+# 자주 들어오는 검색어는 일치한 도서 id 목록을 캐시에 두고 DB 검색을 건너뛴다.
+# 캐시는 공유 캐시(settings.BOOK_SEARCH_CACHE, 기본 "default")일 때만 사용: 키에 버전을 넣고,
+# 검색 대상 필드가 바뀌면 커밋 후 버전을 올려 모든 웹 워커와 관리 명령(import_books 등)의 이전 결과를 한 번에 버린다.
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .cache import shared_cache
+from .search import normalize_text
+
+FLUSH_INTERVAL = 10 # 초
+FLUSH_SIZE = 200 # 버퍼에 쌓인 검색어 수
+MAX_CACHED_IDS = 2000 # 결과가 이보다 많으면 캐시하지 않음
+QUERY_MAX_LENGTH = 200
+
+
+def _cache():
+    return shared_cache(getattr(settings, "BOOK_SEARCH_CACHE", "default"))
+
+
+def _cache_ttl() -> int:
+    return getattr(settings, "BOOK_SEARCH_CACHE_TTL", 60)  # 기본 1분
+
+
+def _hot_min_hits() -> int:
+    return getattr(settings, "BOOK_SEARCH_CACHE_MIN_HITS", 3)
+
+
+def normalize_query(terms) -> str:
+    return " ".join(normalize_text(t) for t in terms)[:QUERY_MAX_LENGTH]
+
+
+# 검색어 기록
+
+_log_lock = threading.Lock()
+_buffer: Dict[str, List[float]] = {} # 검색어 -> [요청 수, 캐시 적중 수, 누적 ms, 최대 ms]
+_flushed_at = time.monotonic()
+
+
+def record(query: str, elapsed_ms: float, cache_hit: bool = False):
+    if not query:
+        return
+    with _log_lock:
+        row = _buffer.setdefault(query, [0, 0, 0.0, 0.0])
+        row[0] += 1
+        row[1] += int(cache_hit)
+        row[2] += elapsed_ms
+        row[3] = max(row[3], elapsed_ms)
+
+
+def flush_if_due():
+    # 응답을 보낸 뒤 호출 (버퍼가 찼거나 FLUSH_INTERVAL이 지났으면 DB에 더한다)
+    global _flushed_at
+    with _log_lock:
+        due = len(_buffer) >= FLUSH_SIZE or time.monotonic() - _flushed_at >= FLUSH_INTERVAL
+        if not due or not _buffer:
+            return
+        pending = dict(_buffer)
+        _buffer.clear()
+        _flushed_at = time.monotonic()
+    flush(pending)
+
+
+def flush(pending: Dict[str, List[float]] | None = None):
+    # 버퍼 내용을 DB에 더한다 (pending이 없으면 현재 버퍼 전체)
+    from .models import SearchQueryLog
+
+    if pending is None:
+        with _log_lock:
+            pending = dict(_buffer)
+            _buffer.clear()
+    if not pending:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        SearchQueryLog.objects.bulk_create(
+            [SearchQueryLog(query=q, last_seen=now) for q in pending], ignore_conflicts=True
+        )
+        for query, (hits, cache_hits, total_ms, max_ms) in pending.items():
+            SearchQueryLog.objects.filter(query=query).update(
+                hits=F("hits") + int(hits),
+                cache_hits=F("cache_hits") + int(cache_hits),
+                total_ms=F("total_ms") + total_ms,
+                max_ms=Greatest("max_ms", max_ms),
+                last_seen=now,
+            )
+
+
+# 인기 검색어 결과 캐시
+
+VERSION_KEY = "book:search:version"
+
+
+class HotQueryCache:
+    # 항목 키: book:search:<버전>:<검색어 해시> -> (일치 id 목록, 대체 검색 종류)
+    # 요청 수: book:search:seen:<검색어 해시> (TTL 안에 MIN_HITS번 들어오면 캐시 대상)
+    # 공유 캐시가 없으면 모두 캐시 없이 동작 (get은 None, is_hot은 False)
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.md5(key.encode("utf-8")).hexdigest()
+
+    def version(self, cache) -> int:
+        # 버전 키가 없으면(만료/삭제) 이전 값과 겹치지 않도록 현재 시각으로 시작
+        value = cache.get(VERSION_KEY)
+        if value is None:
+            cache.add(VERSION_KEY, time.time_ns(), None)
+            value = cache.get(VERSION_KEY)
+        return value
+
+    def get(self, key: str) -> Tuple[List[int], str | None] | None:
+        cache = _cache()
+        if cache is None:
+            return None
+        return cache.get(f"book:search:{self.version(cache)}:{self._digest(key)}")
+
+    def is_hot(self, key: str) -> bool:
+        # 요청 수를 세고, 기준 이상이면 캐시 대상
+        cache = _cache()
+        if cache is None:
+            return False
+        seen = f"book:search:seen:{self._digest(key)}"
+        if cache.add(seen, 1, _cache_ttl()):
+            n = 1
+        else:
+            try:
+                n = cache.incr(seen)
+            except ValueError:
+                # add와 incr 사이에 만료된 경우
+                cache.set(seen, 1, _cache_ttl())
+                n = 1
+        return n >= _hot_min_hits()
+
+    def put(self, key: str, ids: List[int], fallback: str | None = None):
+        cache = _cache()
+        if cache is None or len(ids) > MAX_CACHED_IDS:
+            return
+        cache.set(f"book:search:{self.version(cache)}:{self._digest(key)}", (list(ids), fallback), _cache_ttl())
+
+    def _bump(self):
+        cache = _cache()
+        if cache is None:
+            return
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, time.time_ns(), None)
+
+    def invalidate(self):
+        # 트랜잭션 안이면 커밋 후 (롤백된 변경으로 버리지 않음, 커밋 전 결과가 다시 캐시되지 않도록)
+        transaction.on_commit(self._bump)
+
+    def clear(self):
+        self._bump()
+
+
+hot_cache = HotQueryCache()
+
+# 값이 바뀌면 검색 결과가 달라지는 필드 (BookViewSet.search_fields)
+SEARCHABLE_FIELDS = ("title", "author", "publisher", "isbn", "issn", "book_code")
+
+
+def invalidate_book(book):
+    # 도서 하나가 바뀌어도 어떤 검색어 결과에 들어가거나 빠질지 공유 캐시에서 골라낼 수 없어 전체를 버린다
+    hot_cache.invalidate()
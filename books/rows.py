@@ -0,0 +1,118 @@
+# values() 기반 목록 직렬화
+# 목록 API에서 행마다 모델 인스턴스를 만들고 필드별 to_representation을 거치는 대신,
+# 시리얼라이저의 필드 구성을 한 번 읽어 values() 행 -> dict 변환 함수를 미리 만들어 둔다.
+# 출력은 원래 시리얼라이저와 같아야 한다. (books/tests.py에서 비교)
+# settings.FAST_LIST_SERIALIZATION = True 일 때만 사용
+
+from operator import itemgetter
+from types import SimpleNamespace
+from typing import Callable, List, Tuple
+
+from django.conf import settings
+from rest_framework import serializers
+
+# 값을 그대로 내보내는 필드 (DB에서 읽은 값과 to_representation 결과가 같다)
+_PASS_THROUGH = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def enabled() -> bool:
+    return getattr(settings, "FAST_LIST_SERIALIZATION", False)
+
+
+def _converter(key: str, to_representation) -> Callable:
+    def convert(row):
+        value = row[key]
+        return None if value is None else to_representation(value)
+    return convert
+
+
+def _method(method, pk_key: str, keys: List[Tuple[str, str]]) -> Callable:
+    # SerializerMethodField: 필요한 컬럼만 채운 객체 하나를 재사용해 get_<field>() 호출
+    obj = SimpleNamespace()
+
+    def call(row):
+        obj.pk = row[pk_key]
+        for attr, key in keys:
+            setattr(obj, attr, row[key])
+        return method(obj)
+    return call
+
+
+def _nested(build, pk_key: str) -> Callable:
+    def nested(row):
+        return None if row[pk_key] is None else build(row)
+    return nested
+
+
+def _compile(serializer, prefix: str = "") -> Tuple[List[str], Callable]:
+    # (values()에 넘길 경로, 행 -> dict 함수)
+    opts = serializer.Meta.model._meta
+    concrete = {f.name for f in opts.concrete_fields}
+    pk_key = prefix + opts.pk.name
+    paths = [pk_key]
+    steps: List[Tuple[str, str | Callable]] = [] # (출력 이름, values() 키 또는 변환 함수)
+    columns = getattr(serializer, "sparse_columns", {})
+
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if isinstance(field, serializers.SerializerMethodField):
+            attrs = columns.get(name, [name])
+            unknown = set(attrs) - concrete
+            if unknown:
+                raise TypeError(f"{type(serializer).__name__}.{name}: sparse_columns에 컬럼을 지정해야 합니다.")
+            keys = [(attr, prefix + attr) for attr in attrs]
+            paths += [key for _, key in keys]
+            steps.append((name, _method(getattr(serializer, field.method_name), pk_key, keys)))
+        elif isinstance(field, serializers.ModelSerializer):
+            sub_paths, sub_build = _compile(field, f"{prefix}{field.source}__")
+            paths += sub_paths
+            steps.append((name, _nested(sub_build, sub_paths[0])))
+        elif len(field.source_attrs) == 1 and field.source in concrete:
+            key = prefix + field.source
+            paths.append(key)
+            steps.append((name, key if isinstance(field, _PASS_THROUGH) else _converter(key, field.to_representation)))
+        else:
+            raise TypeError(f"{type(serializer).__name__}.{name}: values() 직렬화를 지원하지 않는 필드입니다.")
+
+    return list(dict.fromkeys(paths)), _build(steps)
+
+
+def _build(steps: List[Tuple[str, str | Callable]]) -> Callable:
+    # 행 -> dict 함수 (필드 순서는 시리얼라이저와 같게)
+    # 그대로 내보내는 필드는 operator.itemgetter(key), 나머지는 변환 함수
+    names = [name for name, _ in steps]
+    getters = [itemgetter(step) if isinstance(step, str) else step for _, step in steps]
+
+    def build(row):
+        return dict(zip(names, [get(row) for get in getters]))
+    return build
+
+
+class RowMapper:
+    # mapper = RowMapper(BookSerializer, context)
+    # data = mapper(mapper.values(queryset))
+    def __init__(self, serializer_class, context=None):
+        # context는 시리얼라이저와 같은 dict를 공유 (liked_ids 등을 나중에 채울 수 있음)
+        self.serializer = serializer_class(context=context if context is not None else {})
+        self.paths, self._build = _compile(self.serializer)
+        self.pk_key = self.paths[0]
+
+    @property
+    def context(self) -> dict:
+        return self.serializer.context
+
+    def values(self, queryset, *extra):
+        # extra: 출력하지 않지만 행에 필요한 값 (페이지 커서의 relevance 등)
+        return queryset.values(*self.paths, *extra)
+
+    def __call__(self, rows) -> list:
+        build = self._build
+        return [build(row) for row in rows]
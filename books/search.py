@@ -0,0 +1,444 @@
+# 도서 검색 색인
+# title/author/publisher를 2-gram, 3-gram으로 쪼개 BookNgram 테이블에 저장하고
+# 검색어의 n-gram으로 후보 도서를 찾는다. (LIKE '%검색어%' 전체 스캔 회피)
+
+import math
+import re
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.db.models import Case, Count, F, FloatField, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast
+
+from .marc import SUBFIELDS
+
+# 색인 대상 필드
+INDEXED_FIELDS = ("title", "author", "publisher")
+# 초성 검색용 컬럼 (원본 필드 -> 초성 컬럼)
+CHOSUNG_FIELDS = {"title": "title_chosung", "author": "author_chosung"}
+
+# MARC 245/246 (랭킹 전용 색인 필드)
+MARC_FIELD = "marc"
+MARC_INDEXED_TAGS = ("245", "246")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# 초성 (호환용 자모)
+_CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSUNG_SET = set(_CHOSUNG)
+# 첫가끝 초성(U+1100~) -> 호환용 자모
+_CONJOINING_TO_COMPAT = {chr(0x1100 + i): ch for i, ch in enumerate(_CHOSUNG)}
+
+
+def normalize_text(text: str | None) -> str:
+    # 대소문자, 전각/반각, 악센트 차이를 없앤다 (한글 음절은 NFC로 다시 조합)
+    if not text:
+        return ""
+    s = unicodedata.normalize("NFKD", str(text))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    return unicodedata.normalize("NFC", s).casefold()
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def chosung(text: str | None) -> str:
+    # 한글 음절은 초성만, 초성 자모는 그대로 남기고 나머지(공백, 영문 등)는 버린다
+    # ex) "문헌정보학 개론" -> "ㅁㅎㅈㅂㅎㄱㄹ"
+    if not text:
+        return ""
+    out = []
+    for ch in str(text):
+        code = ord(ch)
+        if 0xAC00 <= code <= 0xD7A3:
+            out.append(_CHOSUNG[(code - 0xAC00) // 588])
+        elif ch in _CHOSUNG_SET:
+            out.append(ch)
+        elif ch in _CONJOINING_TO_COMPAT:
+            out.append(_CONJOINING_TO_COMPAT[ch])
+    return "".join(out)
+
+
+def is_chosung_query(term: str | None) -> bool:
+    # 초성만으로 이루어진 검색어인지 ("ㅁㅎㅈㅂ")
+    chars = [ch for ch in (term or "") if not ch.isspace()]
+    return bool(chars) and all(ch in _CHOSUNG_SET or ch in _CONJOINING_TO_COMPAT for ch in chars)
+
+
+def text_ngram_counts(text: str | None) -> Counter:
+    # 색인용: 단어마다 2-gram + 3-gram (출현 횟수 포함)
+    grams: Counter = Counter()
+    for tok in tokenize(text):
+        for n in (2, 3):
+            for i in range(len(tok) - n + 1):
+                grams[tok[i:i + n]] += 1
+    return grams
+
+
+def text_ngrams(text: str | None) -> Set[str]:
+    return set(text_ngram_counts(text))
+
+
+def query_ngrams(term: str | None) -> Set[str]:
+    # 검색용: 3글자 이상 단어는 3-gram, 2글자 단어는 2-gram (1글자는 색인 불가)
+    grams: Set[str] = set()
+    for tok in tokenize(term):
+        n = 3 if len(tok) >= 3 else 2
+        for i in range(len(tok) - n + 1):
+            grams.add(tok[i:i + n])
+    return grams
+
+
+def book_ngrams(book) -> Dict[str, Counter]:
+    grams = {field: text_ngram_counts(getattr(book, field, None)) for field in INDEXED_FIELDS}
+    for src, field in CHOSUNG_FIELDS.items():
+        grams[field] = text_ngram_counts(chosung(getattr(book, src, None)))
+    return grams
+
+
+def marc_ngrams(marc) -> Dict[str, Counter]:
+    # MARC 245/246은 랭킹에만 사용 (저장해 둔 서브필드 값만 이어 붙임)
+    data = marc.data or {}
+    text = " ".join(
+        value
+        for tag in MARC_INDEXED_TAGS
+        for values in (data.get(tag) or {}).get(SUBFIELDS, {}).values()
+        for value in values
+    )
+    return {MARC_FIELD: text_ngram_counts(text)}
+
+
+def _update_stats(field: str, added: Set[str], removed: Set[str], old_len: int, new_len: int):
+    # 문서 빈도(df), 필드 길이 통계 증분 갱신
+    from .models import SearchFieldStat, SearchTermStat
+
+    if added:
+        SearchTermStat.objects.bulk_create(
+            [SearchTermStat(field=field, gram=g, df=0) for g in added], ignore_conflicts=True
+        )
+        SearchTermStat.objects.filter(field=field, gram__in=added).update(df=F("df") + 1)
+    if removed:
+        SearchTermStat.objects.filter(field=field, gram__in=removed).update(df=F("df") - 1)
+        SearchTermStat.objects.filter(field=field, gram__in=removed, df__lte=0).delete()
+    if old_len != new_len:
+        SearchFieldStat.objects.bulk_create([SearchFieldStat(field=field)], ignore_conflicts=True)
+        SearchFieldStat.objects.filter(field=field).update(
+            doc_count=F("doc_count") + int(new_len > 0) - int(old_len > 0),
+            total_length=F("total_length") + new_len - old_len,
+        )
+
+
+def _replace_index(book_id: int, grams_by_field: Dict[str, Counter]):
+    from .models import BookNgram
+
+    fields = list(grams_by_field)
+    with transaction.atomic():
+        old: Dict[str, Set[str]] = defaultdict(set)
+        old_len: Dict[str, int] = defaultdict(int)
+        for field, gram, tf in (
+            BookNgram.objects.filter(book_id=book_id, field__in=fields).values_list("field", "gram", "tf")
+        ):
+            old[field].add(gram)
+            old_len[field] += tf
+
+        BookNgram.objects.filter(book_id=book_id, field__in=fields).delete()
+        rows = []
+        for field, counts in grams_by_field.items():
+            length = sum(counts.values())
+            rows += [
+                BookNgram(book_id=book_id, field=field, gram=g, tf=tf, field_len=length)
+                for g, tf in counts.items()
+            ]
+        BookNgram.objects.bulk_create(rows, batch_size=1000)
+
+        for field, counts in grams_by_field.items():
+            new = set(counts)
+            _update_stats(field, new - old[field], old[field] - new, old_len[field], sum(counts.values()))
+
+
+def index_book(book):
+    # 도서 1권의 색인 재작성 (통계는 증분 갱신)
+    _replace_index(book.pk, book_ngrams(book))
+
+
+def index_marc(marc):
+    _replace_index(marc.book_id, marc_ngrams(marc))
+
+
+def unindex_book(book_id: int):
+    # 도서 삭제 전 호출 (통계에서 빼기, books/signals.py의 pre_delete)
+    fields = INDEXED_FIELDS + tuple(CHOSUNG_FIELDS.values()) + (MARC_FIELD,)
+    _replace_index(book_id, {field: Counter() for field in fields})
+
+
+def unindex_marc(book_id: int):
+    # MARC 레코드 삭제 전 호출
+    _replace_index(book_id, {MARC_FIELD: Counter()})
+
+
+def rebuild_index(queryset, batch_size: int = 1000) -> int:
+    # 도서 색인 일괄 재구축 후 통계 전체 재계산, 처리한 도서 수 반환
+    from .models import BookNgram
+
+    done = 0
+    qs = queryset.select_related("marc").only("id", *INDEXED_FIELDS, "marc__data").order_by("pk")
+    last_pk = 0
+    while True:
+        books = list(qs.filter(pk__gt=last_pk)[:batch_size])
+        if not books:
+            break
+        rows = []
+        for b in books:
+            grams_by_field = book_ngrams(b)
+            marc = getattr(b, "marc", None)
+            if marc is not None:
+                grams_by_field.update(marc_ngrams(marc))
+            for field, counts in grams_by_field.items():
+                length = sum(counts.values())
+                rows += [
+                    BookNgram(book_id=b.pk, field=field, gram=g, tf=tf, field_len=length)
+                    for g, tf in counts.items()
+                ]
+        with transaction.atomic():
+            BookNgram.objects.filter(book_id__in=[b.pk for b in books]).delete()
+            BookNgram.objects.bulk_create(rows, batch_size=5000)
+        done += len(books)
+        last_pk = books[-1].pk
+
+    rebuild_stats()
+    return done
+
+
+def rebuild_stats(batch_size: int = 5000):
+    # BookNgram에서 df/필드 통계를 다시 계산
+    from .models import BookNgram, SearchFieldStat, SearchTermStat
+
+    with transaction.atomic():
+        SearchTermStat.objects.all().delete()
+        batch = []
+        for row in BookNgram.objects.values("field", "gram").annotate(df=Count("book_id")).order_by().iterator():
+            batch.append(SearchTermStat(**row))
+            if len(batch) >= batch_size:
+                SearchTermStat.objects.bulk_create(batch)
+                batch = []
+        SearchTermStat.objects.bulk_create(batch)
+
+        SearchFieldStat.objects.all().delete()
+        totals: Dict[str, list] = defaultdict(lambda: [0, 0])
+        per_doc = BookNgram.objects.values("field", "book_id").annotate(length=Max("field_len")).order_by()
+        for row in per_doc.iterator():
+            totals[row["field"]][0] += 1
+            totals[row["field"]][1] += row["length"]
+        SearchFieldStat.objects.bulk_create([
+            SearchFieldStat(field=field, doc_count=n, total_length=length)
+            for field, (n, length) in totals.items()
+        ])
+
+
+def candidate_query(term: str, fields: Iterable[str]):
+    # term의 n-gram을 한 필드 안에 모두 포함하는 도서 id 서브쿼리 (pk__in=에 그대로 넘긴다)
+    # n-gram을 만들 수 없는 짧은 검색어면 None -> 호출 측에서 LIKE로 처리
+    from .models import BookNgram
+
+    grams = query_ngrams(term)
+    if not grams:
+        return None
+    return (
+        BookNgram.objects
+        .filter(field__in=list(fields), gram__in=grams)
+        .values("book_id", "field")
+        .annotate(n=Count("gram"))
+        .filter(n=len(grams))
+        .values("book_id")
+    )
+
+
+# BM25 랭킹
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 필드 가중치 (표제 > 저자 > MARC 245/246 > 출판사)
+FIELD_WEIGHTS = {
+    "title": 2.0,
+    "author": 1.5,
+    "publisher": 0.5,
+    MARC_FIELD: 1.0,
+    "title_chosung": 2.0,
+    "author_chosung": 1.5,
+}
+
+
+def bm25_annotation(pairs: List[Tuple[str, str]]):
+    # (필드, n-gram) 목록으로 도서별 BM25 점수 서브쿼리 생성
+    # idf와 평균 필드 길이는 미리 집계된 통계(SearchTermStat, SearchFieldStat)에서 가져온다
+    from .models import BookNgram, SearchFieldStat, SearchTermStat
+
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return None
+    fields = sorted({f for f, _ in pairs})
+    grams = sorted({g for _, g in pairs})
+
+    field_stats = {s.field: s for s in SearchFieldStat.objects.filter(field__in=fields)}
+    df = {
+        (f, g): n
+        for f, g, n in SearchTermStat.objects.filter(field__in=fields, gram__in=grams).values_list("field", "gram", "df")
+    }
+
+    weights = []
+    for f, g in pairs:
+        stat = field_stats.get(f)
+        docs = stat.doc_count if stat else 0
+        n = df.get((f, g), 0)
+        idf = math.log(1 + (docs - n + 0.5) / (n + 0.5))
+        weights.append(When(field=f, gram=g, then=Value(FIELD_WEIGHTS.get(f, 1.0) * idf)))
+
+    norms = []
+    for f in fields:
+        stat = field_stats.get(f)
+        avg = (stat.total_length / stat.doc_count) if stat and stat.doc_count else 1.0
+        norms.append(When(field=f, then=Value(BM25_K1 * (1 - BM25_B)) + Value(BM25_K1 * BM25_B / avg) * F("field_len")))
+
+    tf = Cast("tf", FloatField())
+    score = (
+        Case(*weights, default=Value(0.0), output_field=FloatField())
+        * tf * Value(BM25_K1 + 1)
+        / (tf + Case(*norms, default=Value(BM25_K1), output_field=FloatField()))
+    )
+    rows = (
+        BookNgram.objects
+        .filter(book=OuterRef("pk"), field__in=fields, gram__in=grams)
+        .values("book")
+        .annotate(score=Sum(score))
+        .values("score")
+    )
+    return Subquery(rows, output_field=FloatField())
+
+
+def ranking_pairs(terms: Iterable[str]) -> List[Tuple[str, str]]:
+    pairs = []
+    for term in terms:
+        if is_chosung_query(term):
+            fields, grams = CHOSUNG_FIELDS.values(), query_ngrams(chosung(term))
+        else:
+            fields, grams = INDEXED_FIELDS + (MARC_FIELD,), query_ngrams(term)
+        pairs += [(f, g) for f in fields for g in grams]
+    return pairs
+
+
+# 오타 허용 검색 (정확 검색 결과가 없을 때만)
+FUZZY_FIELDS = ("title", "author")
+FUZZY_CANDIDATES = 200 # n-gram 겹침 상위 후보 수
+FUZZY_MIN_OVERLAP = 0.3 # 검색어 2-gram 중 겹쳐야 하는 비율
+
+
+def _fuzzy_budget_ms() -> int:
+    return getattr(settings, "BOOK_FUZZY_BUDGET_MS", 50)  # 기본 50ms
+
+
+def _max_typos(term: str) -> int:
+    # 짧은 검색어일수록 허용 오타 수를 줄인다
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def substring_distance(pattern: str, text: str, max_dist: int) -> int | None:
+    # pattern과 text의 부분 문자열 사이 최소 편집 거리 (max_dist 초과면 None)
+    # Sellers 알고리즘: 첫 행을 0으로 두어 text 어디서든 시작 가능
+    if not pattern:
+        return 0
+    prev = list(range(len(pattern) + 1))
+    best = prev[-1]
+    for ch in text:
+        cur = [0]
+        for i, pc in enumerate(pattern, start=1):
+            cur.append(min(prev[i] + 1, cur[i - 1] + 1, prev[i - 1] + (pc != ch)))
+        best = min(best, cur[-1])
+        if best == 0:
+            break
+        prev = cur
+    return best if best <= max_dist else None
+
+
+def _fetch_within(queryset, deadline: float) -> List[Tuple] | None:
+    # 남은 시간 안에 끝나는 경우만 결과 반환, 넘기면 None
+    # MySQL은 MAX_EXECUTION_TIME 힌트, SQLite는 진행 콜백으로 쿼리를 중단 (그 외 DB는 끝까지 실행)
+    remaining_ms = int((deadline - time.monotonic()) * 1000)
+    if remaining_ms <= 0:
+        return None
+    connection = connections[queryset.db]
+    try:
+        if connection.vendor == "mysql":
+            sql, params = queryset.query.get_compiler(queryset.db).as_sql()
+            sql = sql.replace("SELECT", f"SELECT /*+ MAX_EXECUTION_TIME({remaining_ms}) */", 1)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        if connection.vendor == "sqlite":
+            connection.ensure_connection()
+            connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 1000)
+            try:
+                return list(queryset)
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        return list(queryset)
+    except OperationalError:
+        # 시간 초과로 중단됨
+        return None
+
+
+def fuzzy_ids(terms: Iterable[str], limit: int = 50) -> List[int]:
+    # 1) n-gram이 많이 겹치는 후보를 색인에서 고르고
+    # 2) 검색어마다 허용 오타 이내인지 편집 거리로 확인해 (오타 수, 겹침) 순으로 반환
+    # 시간 예산(BOOK_FUZZY_BUDGET_MS)은 후보 조회부터 센다: 후보 조회가 넘기면 빈 목록,
+    # 확인 중에 넘기면 그때까지 확인한 후보만 반환
+    from .models import Book, BookNgram
+
+    deadline = time.monotonic() + _fuzzy_budget_ms() / 1000
+    words = ["".join(tokenize(t)) for t in terms]
+    words = [w for w in words if w]
+    if not words or not any(_max_typos(w) for w in words):
+        return []
+
+    # 후보는 2-gram 겹침으로 (오타 한 글자가 깨뜨리는 n-gram 수가 적음)
+    grams = {w[i:i + 2] for w in words for i in range(len(w) - 1)}
+    if not grams:
+        return []
+    min_shared = max(1, math.ceil(len(grams) * FUZZY_MIN_OVERLAP))
+
+    shared = _fetch_within(
+        BookNgram.objects
+        .filter(field__in=FUZZY_FIELDS, gram__in=grams)
+        .values("book_id")
+        .annotate(shared=Count("gram", distinct=True))
+        .filter(shared__gte=min_shared)
+        .order_by("-shared", "book_id")
+        .values_list("book_id", "shared")[:FUZZY_CANDIDATES],
+        deadline,
+    )
+    if not shared:
+        return []
+    shared = dict(shared)
+
+    ranked = []
+    books = _fetch_within(Book.objects.filter(pk__in=list(shared)).values_list("pk", *FUZZY_FIELDS), deadline)
+    for book_id, *texts in books or ():
+        if time.monotonic() > deadline:
+            break
+        texts = ["".join(tokenize(t)) for t in texts if t]
+        total = 0
+        for w in words:
+            dists = [d for d in (substring_distance(w, t, _max_typos(w)) for t in texts) if d is not None]
+            if not dists:
+                break
+            total += min(dists)
+        else:
+            ranked.append((total, -shared[book_id], book_id))
+
+    ranked.sort()
+    return [book_id for _, _, book_id in ranked[:limit]]
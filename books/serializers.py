@@ -1,10 +1,58 @@
 from rest_framework import serializers
 from django.conf import settings
-from .models import Book
-import re
+from django.db import models
+from .models import Book, Contributor, Series, Subject
+from .lookup import MAX_CODES
 
-class BookSerializer(serializers.ModelSerializer):
-    # like_count = serializers.SerializerMethodField()
+def liked_book_ids(request, book_ids) -> set:
+    # 요청한 사용자가 좋아요한 도서 id (한 번의 쿼리)
+    if not (request and request.user.is_authenticated) or not book_ids:
+        return set()
+    return set(
+        Book.liked_users.through.objects
+        .filter(user_id=request.user.pk, book_id__in=book_ids)
+        .values_list("book_id", flat=True)
+    )
+
+# ?fields=, ?marc_tags= 파라미터 ("a,b,c" -> ["a", "b", "c"], 없으면 None)
+def parse_list_param(value: str | None) -> list | None:
+    items = [v.strip() for v in (value or "").split(",") if v.strip()]
+    return list(dict.fromkeys(items)) or None
+
+# 선택한 필드만 출력 (context["fields"])
+# sparse_columns: 필드 -> 읽어야 하는 컬럼 (없으면 필드 이름과 같은 컬럼)
+class SparseFieldsMixin:
+    sparse_columns: dict = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get("fields")
+        if selected:
+            for name in set(self.fields) - set(selected):
+                self.fields.pop(name)
+
+    @classmethod
+    def field_names(cls) -> list:
+        meta = getattr(cls, 'Meta', None)
+        return list(getattr(meta, 'fields', None) or cls._declared_fields)
+
+    @classmethod
+    def columns(cls, selected=None) -> list:
+        # only()에 넘길 컬럼 목록
+        cols = ["id"]
+        for name in selected or cls.field_names():
+            cols += cls.sparse_columns.get(name, [name])
+        return list(dict.fromkeys(cols))
+
+# 목록: 페이지의 좋아요 여부를 한 번에 조회해 context["liked_ids"]로 공유
+class BookListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        if "liked_ids" not in self.context:
+            self.context["liked_ids"] = liked_book_ids(self.context.get("request"), [b.pk for b in items])
+        return super().to_representation(items)
+
+class BookSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     is_liked = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
     # book_status = serializers.CharField(source='get_book_status_display', read_only=True)
@@ -20,19 +68,22 @@ class BookSerializer(serializers.ModelSerializer):
             'callnumber',
             'location',
             'image_url',
-            # 'liked_count', # 좋아요 개수
+            'like_count', # 좋아요 개수
             'is_liked', # 좋아요 여부
             'book_status'
         ]
+        list_serializer_class = BookListSerializer
+
+    sparse_columns = {'is_liked': []}
 
     def get_image_url(self, obj):
         # 기본 이미지 반환
         return obj.image_url or settings.DEFAULT_BOOK_IMAGE_URL
     
-    # def get_like_count(self, obj):
-    #     return obj.liked_users.count()
-    
     def get_is_liked(self, obj):
+        liked_ids = self.context.get('liked_ids')
+        if liked_ids is not None:
+            return obj.pk in liked_ids
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             # return request.user in obj.liked_users.all()
@@ -40,7 +91,7 @@ class BookSerializer(serializers.ModelSerializer):
         return False
 
 # 상세 조회
-class BookDetailSerializer(serializers.ModelSerializer):
+class BookDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     book_code = serializers.CharField(read_only=True) # 장서번호
     isbn = serializers.CharField(read_only=True) # isbn
     title = serializers.CharField(read_only=True) # 제목
@@ -56,7 +107,7 @@ class BookDetailSerializer(serializers.ModelSerializer):
     # physical = serializers.CharField(source='marc.field_300', read_only=True) # 형태사항
     # publication = serializers.SerializerMethodField() # 출판사
     physical = serializers.SerializerMethodField() # 페이지, 판형
-    marc = serializers.JSONField(source='marc.data', read_only=True) # 전체 MARC
+    marc = serializers.SerializerMethodField() # 전체 MARC (?marc_tags=245,260으로 일부만)
 
     class Meta:
         model = Book
@@ -64,29 +115,25 @@ class BookDetailSerializer(serializers.ModelSerializer):
             'id', 'book_code', 'isbn',
             'title', 'image_url', 'author', 'edition',
             'publisher', 'physical',
-            'callnumber', 'marc',
+            'callnumber', 'book_status', 'marc',
         ]
-    
+
+    sparse_columns = {
+        'physical': ['marc__physical_pages', 'marc__physical_size'],
+        'marc': ['marc__data'],
+    }
+
+    def get_marc(self, obj):
+        marc = getattr(obj, 'marc', None)
+        if not marc:
+            return None
+        return select_marc_tags(marc.data, self.context.get('marc_tags'))
+
     def get_image_url(self, obj):
         # 기본 이미지 반환
         return obj.image_url or settings.DEFAULT_BOOK_IMAGE_URL
 
     # _re_pub_b = re.compile(r"\$b\s*([^$:;,]+)")
-    # _re_phy_a = re.compile(r"\$a\s*([\d.,\s]+)\s*p", re.IGNORECASE)
-    _re_phy_a = re.compile(
-        r"\$a\s*([0-9IVXLCDMivxlcdm.,\s\-–—]+)\s*p",
-        re.IGNORECASE
-    )
-    _re_phy_c = re.compile(r"\$c\s*([\d.,\s]+)\s*cm", re.IGNORECASE)
-
-    def _get_marc_field(self, obj, name: str) -> str:
-        marc = getattr(obj, 'marc', None)
-        if not marc:
-            return ""
-        val = getattr(marc, name, "")
-        if isinstance(val, (list, tuple)):
-            val = " ".join(v for v in val if isinstance(v, str))
-        return val or ""
 
     # def get_publication(self, obj) -> str | None:
     #     raw = self._get_marc_field(obj, 'field_260')
@@ -98,29 +145,74 @@ class BookDetailSerializer(serializers.ModelSerializer):
     #     return m.group(1).strip(" ,;:/")
 
     def get_physical(self, obj) -> str | None:
-        raw = self._get_marc_field(obj, 'field_300')
-        if not raw:
+        # Marc 저장 시 계산해 둔 페이지/크기 (books.marc.parse_physical)
+        marc = getattr(obj, 'marc', None)
+        if not marc:
             return None
-
-        page, size = None, None
-        m_page = self._re_phy_a.search(raw)
-        if m_page:
-            # num = m_page.group(1).replace(" ", "").replace(",", "")
-            num = m_page.group(1)
-            num = (num.replace(" ", "")
-                    .replace(",", "")
-                    .replace("–", "-")
-                    .replace("—", "-")
-                    .rstrip("."))
-            if num:
-                page = f"{num}p"
-
-        m_size = self._re_phy_c.search(raw)
-        if m_size:
-            num = m_size.group(1).replace(" ", "").replace(",", "")
-            if num:
-                size = f"{num}cm"
-
+        page, size = marc.physical_pages, marc.physical_size
         if page and size:
             return f"{page}, {size}"
-        return page or size
\ No newline at end of file
+        return page or size
+
+def select_marc_tags(data, tags):
+    if not tags or not isinstance(data, dict):
+        return data
+    return {tag: value for tag, value in data.items() if tag in tags}
+
+# 캐시된 상세 응답에서 선택한 필드/MARC 태그만
+def sparse_detail(data: dict, fields=None, marc_tags=None) -> dict:
+    if fields:
+        data = {k: v for k, v in data.items() if k in fields}
+    if marc_tags and data.get('marc') is not None:
+        data = {**data, 'marc': select_marc_tags(data['marc'], marc_tags)}
+    return data
+
+# 주제명 목록
+class SubjectSerializer(serializers.ModelSerializer):
+    book_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Subject
+        fields = ['id', 'tag', 'name', 'book_count']
+
+# 총서 목록
+class SeriesSerializer(serializers.ModelSerializer):
+    book_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Series
+        fields = ['id', 'name', 'book_count']
+
+# 부출 표목(개인명/단체명) 목록
+class ContributorSerializer(serializers.ModelSerializer):
+    book_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Contributor
+        fields = ['id', 'tag', 'name', 'book_count']
+
+# 표제 단위 목록 (?collapse=true, books/works.py collapse_works 결과)
+class WorkSerializer(SparseFieldsMixin, serializers.Serializer):
+    id = serializers.IntegerField(source='book_id', read_only=True) # 대표 도서
+    title = serializers.CharField(source='work_title', read_only=True)
+    author = serializers.CharField(source='work_author', read_only=True)
+    publisher = serializers.CharField(source='work_publisher', read_only=True)
+    isbn = serializers.CharField(source='work_isbn', read_only=True)
+    image_url = serializers.SerializerMethodField()
+    copy_count = serializers.IntegerField(read_only=True) # 복본 수
+    available_count = serializers.IntegerField(read_only=True) # 대출가능 복본 수
+
+    def get_image_url(self, obj):
+        return obj['work_image_url'] or settings.DEFAULT_BOOK_IMAGE_URL
+
+# 일괄 조회 요청 (POST /books/lookup/)
+class BookLookupSerializer(serializers.Serializer):
+    book_code = serializers.ListField(child=serializers.CharField(max_length=30), required=False,
+                                      max_length=MAX_CODES)
+    isbn = serializers.ListField(child=serializers.CharField(max_length=40), required=False, max_length=MAX_CODES)
+    issn = serializers.ListField(child=serializers.CharField(max_length=40), required=False, max_length=MAX_CODES)
+
+    def validate(self, attrs):
+        if not any(attrs.get(field) for field in ('book_code', 'isbn', 'issn')):
+            raise serializers.ValidationError({"message": "book_code, isbn, issn 중 하나 이상 입력하세요."})
+        return attrs
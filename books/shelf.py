@@ -0,0 +1,56 @@
+# 서가 순서 (청구기호 정렬 키)
+# 청구기호는 자유 텍스트라 문자열 정렬로는 서가 순서가 맞지 않는다 ("5.1" > "100", "v.10" < "v.2").
+# 별치기호 / 분류기호(KDC, DDC) / 도서기호 / 권차·복본으로 나눠 비교 가능한 문자열로 만든다.
+
+import re
+
+from .marc import iter_subfields
+from .search import normalize_text
+
+CALLNUMBER_KEY_LENGTH = 255
+_CLASS_RE = re.compile(r"^(\d{1,3})(?:\.(\d+))?$")
+# 권차/복본: v.2, c.3, vol.10, no.5, 2권
+_PART_RE = re.compile(r"^(v|c|vol|no|pt|t)\.?(\d+)$|^(\d+)(권|책|호)$")
+_NUM_WIDTH = 6
+
+
+def _class_token(token: str) -> str | None:
+    m = _CLASS_RE.match(token)
+    if not m:
+        return None
+    whole, frac = m.groups()
+    return whole.zfill(3) + (f".{frac}" if frac else "")
+
+
+def _part_token(token: str) -> str | None:
+    m = _PART_RE.match(token)
+    if not m:
+        return None
+    if m.group(1):
+        return f"{m.group(1)}.{m.group(2).zfill(_NUM_WIDTH)}"
+    return f"{m.group(3).zfill(_NUM_WIDTH)}{m.group(4)}"
+
+
+def callnumber_key(callnumber: str | None) -> str | None:
+    # "R 813.7 김가73ㅎ v.2 c.2" -> "r 813.7 김가73ㅎ v.000002 c.000002"
+    # "$a813.7$b김가73ㅎ$cv.2" 처럼 090 서브필드 형식도 받는다
+    if not callnumber:
+        return None
+    subfields = iter_subfields(callnumber)
+    text = " ".join(value for _, value in subfields) if subfields else str(callnumber)
+
+    tokens = normalize_text(text).replace("-", " ").split()
+    parts = []
+    seen_class = False
+    for token in tokens:
+        token = token.strip(",;:/()")
+        if not token:
+            continue
+        if not seen_class:
+            cls = _class_token(token)
+            if cls is not None:
+                parts.append(cls)
+                seen_class = True
+                continue
+        parts.append(_part_token(token) or token)
+    return " ".join(parts)[:CALLNUMBER_KEY_LENGTH] or None
@@ -0,0 +1,82 @@
+# 좋아요 행이 toggle_like 밖(관리자 화면, liked_users.add 등, 사용자 삭제 CASCADE)에서 바뀌면 like_count 다시 계산
+# 도서/MARC/이용자대상 삭제 시 검색 색인과 BM25 통계(df, 필드 길이), 패싯 집계에서 빼고 캐시/변경 피드 갱신
+# pre_delete는 Model.delete()뿐 아니라 queryset.delete(), CASCADE 삭제에서도 행마다 온다
+# 검색어 기록은 응답을 보낸 뒤(request_finished) DB에 더한다
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+
+from . import cache as detail_cache, changes, querylog
+from .facets import BOOK_FACETS, bump
+from .headings import heading_links, recount_books
+from .likes import recount_likes
+from .models import Book, Marc, Target
+from .search import unindex_book, unindex_marc
+from .suggest import mark_stale
+
+
+@receiver(m2m_changed, sender=Book.liked_users.through)
+def sync_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        recount_likes([instance.pk])
+    elif pk_set:
+        recount_likes(pk_set)
+    else:
+        # 사용자 쪽에서 clear(): 대상 도서를 알 수 없어 전체 재계산
+        recount_likes()
+
+
+# 사용자 삭제: 좋아요 행은 m2m_changed 없이 CASCADE로 지워지므로 삭제 전에 도서를 기억해 두었다가 삭제 후 다시 센다
+@receiver(pre_delete, sender=settings.AUTH_USER_MODEL)
+def remember_liked_books(sender, instance, **kwargs):
+    instance._liked_book_ids = list(Book.liked_users.through.objects.filter(user_id=instance.pk)
+                                    .values_list("book_id", flat=True))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def sync_deleted_user_likes(sender, instance, **kwargs):
+    book_ids = getattr(instance, "_liked_book_ids", None)
+    if book_ids:
+        recount_likes(book_ids)
+
+
+@receiver(pre_delete, sender=Book)
+def unindex_deleted_book(sender, instance, **kwargs):
+    # 이용자대상(Target)은 CASCADE로 함께 지워지며 아래 수신자에서 뺀다
+    unindex_book(instance.pk)
+    mark_stale()
+    querylog.invalidate_book(instance)
+    detail_cache.invalidate(instance.pk)
+    changes.record([instance.pk], deleted=True)
+    bump([(facet, getattr(instance, facet), -1) for facet in BOOK_FACETS])
+    # 표목 연결은 CASCADE로 지워지므로 삭제 후 다시 셀 표목을 기억
+    instance._heading_ids = [
+        list(link_model.objects.filter(book_id=instance.pk).values_list(fk, flat=True))
+        for _, link_model, fk in heading_links()
+    ]
+
+
+@receiver(post_delete, sender=Book)
+def recount_deleted_book_headings(sender, instance, **kwargs):
+    for (heading_model, link_model, fk), ids in zip(heading_links(), getattr(instance, "_heading_ids", ())):
+        recount_books(heading_model, link_model, fk, ids)
+
+
+@receiver(pre_delete, sender=Marc)
+def unindex_deleted_marc(sender, instance, **kwargs):
+    unindex_marc(instance.book_id)
+
+
+@receiver(request_finished)
+def flush_query_log(sender, **kwargs):
+    querylog.flush_if_due()
+
+
+@receiver(pre_delete, sender=Target)
+def uncount_deleted_target(sender, instance, **kwargs):
+    if instance.book_id:
+        bump([("target", instance.target.name, -1)])
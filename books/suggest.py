@@ -0,0 +1,181 @@
+# 검색어 자동완성
+# 도서 표제/저자(+초성)를 정렬된 배열로 메모리에 올려두고 bisect로 접두어 범위를 찾는다.
+# 도서가 바뀌면 mark_stale()로 커밋 후 버전을 올리고, 버전이 다르거나 TTL이 지나면 다시 만든다.
+# 버전은 공유 캐시(settings.BOOK_SUGGEST_CACHE, 기본 "default")에 두어 다른 웹 워커/import_books의 변경도 바로 반영한다.
+# (공유 캐시가 없으면 프로세스 안의 표시 + TTL)
+# 재구성은 백그라운드 스레드에서 하고, 끝날 때까지 요청은 이전 색인으로 응답한다. (처음 한 번만 요청 안에서 만든다)
+
+import heapq
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from .cache import shared_cache
+from .search import chosung, is_chosung_query, normalize_text
+
+# 1~2글자 접두어는 후보가 많으므로 상위 목록을 미리 계산
+PRECOMPUTED_PREFIX_LEN = 2
+MAX_LIMIT = 20
+# 그 외 접두어 결과는 조회 시 계산해 보관 (최대 개수)
+MEMO_SIZE = 10000
+VERSION_KEY = "book:suggest:version"
+BACKGROUND_REBUILD = True # False면 요청 안에서 재구성 (테스트)
+
+
+def _cache():
+    return shared_cache(getattr(settings, "BOOK_SUGGEST_CACHE", "default"))
+
+
+def _suggest_ttl() -> int:
+    return getattr(settings, "BOOK_SUGGEST_TTL", 300)  # 기본 5분
+
+
+def _key(text: str) -> str:
+    return " ".join(normalize_text(text).split())
+
+
+class SuggestIndex:
+    def __init__(self, counts: Counter):
+        # counts: (종류, 표시 문자열) -> 권수(가중치)
+        self.items: List[Tuple[str, str, int]] = [
+            (kind, text, weight) for (kind, text), weight in counts.items()
+        ]
+        entries = []
+        for i, (kind, text, _) in enumerate(self.items):
+            entries.append((_key(text), i))
+            cho = chosung(text)
+            if cho:
+                entries.append((cho, i))
+        entries.sort()
+        self.keys = [k for k, _ in entries]
+        self.refs = [i for _, i in entries]
+
+        self.top: Dict[str, List[int]] = {}
+        for n in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+            for prefix in {k[:n] for k in self.keys if len(k) >= n}:
+                self.top[prefix] = self._scan(prefix, MAX_LIMIT)
+        self._max_top = len(self.top) + MEMO_SIZE
+
+    def _scan(self, prefix: str, limit: int) -> List[int]:
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\U0010ffff")
+        refs = set(self.refs[lo:hi])
+        return heapq.nsmallest(limit, refs, key=lambda i: (-self.items[i][2], self.items[i][1]))
+
+    def lookup(self, query: str, limit: int = 10) -> List[Tuple[str, str]]:
+        prefix = chosung(query) if is_chosung_query(query) else _key(query)
+        if not prefix:
+            return []
+        refs = self.top.get(prefix)
+        if refs is None:
+            refs = self._scan(prefix, MAX_LIMIT)
+            if len(self.top) < self._max_top:
+                self.top[prefix] = refs
+        return [(self.items[i][0], self.items[i][1]) for i in refs[:limit]]
+
+
+_lock = threading.Lock()
+_index: SuggestIndex | None = None
+_built_at = 0.0
+_built_version = None # 색인을 만들기 시작할 때의 공유 버전
+_stale = True
+_rebuilding = False
+
+
+def build_index() -> SuggestIndex:
+    from .models import Book
+
+    counts: Counter = Counter()
+    for title, author in Book.objects.values_list("title", "author").iterator(chunk_size=5000):
+        if title:
+            counts[("title", title.strip())] += 1
+        if author:
+            counts[("author", author.strip())] += 1
+    return SuggestIndex(counts)
+
+
+def _version():
+    # 공유 버전, 공유 캐시가 없으면 None
+    cache = _cache()
+    if cache is None:
+        return None
+    value = cache.get(VERSION_KEY)
+    if value is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        value = cache.get(VERSION_KEY)
+    return value
+
+
+def _is_current(version) -> bool:
+    return (_index is not None and not _stale and version == _built_version
+            and time.monotonic() - _built_at < _suggest_ttl())
+
+
+def _rebuild(version):
+    global _index, _built_at, _built_version, _stale, _rebuilding
+    try:
+        index = build_index()
+        with _lock:
+            _index, _built_at, _built_version = index, time.monotonic(), version
+    except Exception:
+        # 다음 요청에서 다시 시도
+        _stale = True
+        raise
+    finally:
+        _rebuilding = False
+
+
+def _rebuild_in_background(version):
+    try:
+        _rebuild(version)
+    finally:
+        # 이 스레드의 DB 연결 정리
+        connections.close_all()
+
+
+def get_index() -> SuggestIndex:
+    global _index, _built_at, _built_version, _stale, _rebuilding
+    version = _version()
+    if _is_current(version):
+        return _index
+    with _lock:
+        if _index is None:
+            # 처음에는 응답할 색인이 없어 요청 안에서 만든다
+            _stale = False
+            _index, _built_at, _built_version = build_index(), time.monotonic(), version
+            return _index
+        if _rebuilding or _is_current(version):
+            return _index
+        # 재구성 중 다시 바뀌면 끝난 뒤 한 번 더
+        _stale, _rebuilding = False, True
+    if BACKGROUND_REBUILD:
+        threading.Thread(target=_rebuild_in_background, args=(version,), daemon=True).start()
+    else:
+        _rebuild(version)
+    return _index
+
+
+def _bump():
+    global _stale
+    _stale = True
+    cache = _cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def mark_stale():
+    # 도서 표제/저자 변경 시 호출 (커밋 후 버전 증가, 재구성이 커밋 전 데이터를 읽고 최신으로 표시되지 않도록)
+    transaction.on_commit(_bump)
+
+
+def suggest(query: str, limit: int = 10) -> List[Tuple[str, str]]:
+    return get_index().lookup(query, min(limit, MAX_LIMIT))
@@ -1,3 +1,1544 @@
-from django.test import TestCase
+import copy
+import csv
+import datetime
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from config.renderers import ORJSONRenderer
+from rest_framework.test import APITestCase, APIClient
+from rest_framework import status
+from . import availability, cache as detail_cache, changes, querylog, suggest as suggest_index
+from .marc import _raw_pairs, iter_subfields, parse_headings, parse_names, parse_physical, parse_series
+from .facets import rebuild_counts, unfiltered_counts
+from .models import (
+    Book, BookChange, BookContributor, BookNgram, BookSeries, BookSubject, Contributor, FacetCount, Marc,
+    SearchFieldStat, Curation, SearchQueryLog, SearchTermStat, Series, Subject, Target, TargetName,
+)
+from .likes import toggle_like
+from .rows import RowMapper
+from .search import fuzzy_ids, query_ngrams, substring_distance, text_ngrams
+from .shelf import callnumber_key
+from .works import work_key
+from rentals.models import Rental
+from reservations.models import Reservation, ReservationStatus
+from reviews.models import Review
+from .serializers import BookDetailSerializer
+
+
+class BookSearchIndexTest(TestCase):
+    """n-gram 색인 테스트"""
+
+    def test_ngrams(self):
+        """2-gram/3-gram 생성 테스트"""
+        self.assertEqual(text_ngrams("문헌정보"), {"문헌", "헌정", "정보", "문헌정", "헌정보"})
+        self.assertEqual(query_ngrams("문헌정보"), {"문헌정", "헌정보"})
+        self.assertEqual(query_ngrams("역사"), {"역사"})
+        self.assertEqual(query_ngrams("책"), set())
+        # 대소문자/악센트 무시
+        self.assertEqual(query_ngrams("CAFÉ"), query_ngrams("cafe"))
+
+    def test_index_updated_on_save(self):
+        """저장 시 색인 갱신 테스트"""
+        book = Book.objects.create(book_code="B001", title="문헌정보학 개론")
+        self.assertTrue(BookNgram.objects.filter(book=book, field="title", gram="정보학").exists())
+
+        book.title = "도서관 역사"
+        book.save()
+        self.assertFalse(BookNgram.objects.filter(book=book, gram="정보학").exists())
+        self.assertTrue(BookNgram.objects.filter(book=book, field="title", gram="도서관").exists())
+
+    def test_status_update_skips_reindex(self):
+        """검색 필드가 아닌 값만 바꾸면 색인 유지 테스트"""
+        book = Book.objects.create(book_code="B001", title="문헌정보학 개론")
+        ids = set(BookNgram.objects.filter(book=book).values_list("pk", flat=True))
+        book.book_status = "RENTED"
+        book.save(update_fields=["book_status"])
+        self.assertEqual(ids, set(BookNgram.objects.filter(book=book).values_list("pk", flat=True)))
+
+
+class BookSearchAPITest(APITestCase):
+    """도서 검색 API 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(
+            book_code="B001", title="문헌정보학 개론", author="김민준", publisher="한울", isbn="9788912345678"
+        )
+        self.book2 = Book.objects.create(
+            book_code="B002", title="도서관의 역사", author="이서연", publisher="창비"
+        )
+        self.book3 = Book.objects.create(
+            book_code="B003", title="정보 검색 입문", author="김지현", publisher="한울아카데미"
+        )
+
+    def search(self, term):
+        response = self.client.get("/books/", {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row["id"] for row in response.data["results"])
+
+    def test_search_title(self):
+        """표제 부분 일치 테스트"""
+        self.assertEqual(self.search("정보학"), [self.book1.id])
+        self.assertEqual(self.search("정보"), [self.book1.id, self.book3.id])
+
+    def test_search_multiple_terms(self):
+        """검색어 여러 개는 모두 일치해야 함 테스트"""
+        self.assertEqual(self.search("정보 김지현"), [self.book3.id])
+
+    def test_search_ngrams_not_contiguous(self):
+        """n-gram은 모두 있지만 연속되지 않으면 제외 테스트"""
+        Book.objects.create(book_code="B004", title="문헌정 헌정보")
+        self.assertEqual(self.search("문헌정보"), [self.book1.id])
+
+    def test_search_exact_fields(self):
+        """ISBN/등록번호 일치 테스트"""
+        self.assertEqual(self.search("9788912345678"), [self.book1.id])
+        self.assertEqual(self.search("B002"), [self.book2.id])
+
+    def test_search_publisher_prefix(self):
+        """출판사는 앞부분 일치 테스트"""
+        self.assertEqual(self.search("한울"), [self.book1.id, self.book3.id])
+        self.assertEqual(self.search("아카데미"), [])
+
+    def test_search_single_char(self):
+        """1글자 검색어는 LIKE 검색 테스트"""
+        self.assertEqual(self.search("사"), [self.book2.id])
+
+
+class BookChosungSearchTest(APITestCase):
+    """초성 검색 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(book_code="B001", title="문헌정보학 개론", author="김민준")
+        self.book2 = Book.objects.create(book_code="B002", title="도서관의 역사", author="이서연")
+
+    def search(self, term):
+        response = self.client.get("/books/", {"search": term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(row["id"] for row in response.data["results"])
+
+    def test_chosung_saved(self):
+        """저장 시 초성 컬럼 계산 테스트"""
+        self.assertEqual(self.book1.title_chosung, "ㅁㅎㅈㅂㅎㄱㄹ")
+        self.book1.author = "박서준"
+        self.book1.save(update_fields=["author"])
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.author_chosung, "ㅂㅅㅈ")
+
+    def test_chosung_infix(self):
+        """초성 중간 일치 테스트"""
+        self.assertEqual(self.search("ㅁㅎㅈㅂ"), [self.book1.id])
+        self.assertEqual(self.search("ㅈㅂㅎ"), [self.book1.id])
+        self.assertEqual(self.search("ㅇㅅㅇ"), [self.book2.id])
+
+    def test_chosung_prefix(self):
+        """초성 1글자는 앞부분 일치 테스트"""
+        self.assertEqual(self.search("ㄷ"), [self.book2.id])
+        self.assertEqual(self.search("ㄱ"), [self.book1.id])
+
+
+class BookRankingTest(APITestCase):
+    """BM25 정렬 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.long = Book.objects.create(book_code="B001", title="한국 근현대 사회 문화 연구 총서 역사 편")
+        self.short = Book.objects.create(book_code="B002", title="역사")
+        self.author = Book.objects.create(book_code="B003", title="인물 평전", author="역사연구회")
+
+    def search(self, params):
+        response = self.client.get("/books/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_term_stats_incremental(self):
+        """문서 빈도 증분 갱신 테스트"""
+        self.assertEqual(SearchTermStat.objects.get(field="title", gram="역사").df, 2)
+        self.short.title = "철학"
+        self.short.save()
+        self.assertEqual(SearchTermStat.objects.get(field="title", gram="역사").df, 1)
+        self.long.delete()
+        self.assertFalse(SearchTermStat.objects.filter(field="title", gram="역사").exists())
+        self.assertEqual(SearchFieldStat.objects.get(field="title").doc_count, 2)
+
+    def test_ranked_order(self):
+        """짧은 표제 일치가 먼저 오는지 테스트"""
+        ids = [row["id"] for row in self.search({"search": "역사"})["results"]]
+        self.assertEqual(ids, [self.short.id, self.long.id, self.author.id])
+
+    def test_marc_245_ranking(self):
+        """MARC 245/246도 점수에 반영 테스트"""
+        plain = Book.objects.create(book_code="B004", title="역사 이야기")
+        with_marc = Book.objects.create(book_code="B005", title="역사 이야기")
+        Marc.objects.create(book=with_marc, field_245="$a역사 이야기 $d역사연구회", field_246_same="$a역사")
+        ids = [row["id"] for row in self.search({"search": "역사 이야기"})["results"]]
+        self.assertEqual(ids, [with_marc.id, plain.id])
+
+    def test_top_k_page(self):
+        """상위 k건만 반환 테스트"""
+        data = self.search({"search": "역사", "size": 2})
+        self.assertEqual(len(data["results"]), 2)
+        self.assertIsNotNone(data["next"])
+        response = self.client.get(data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.author.id])
+        self.assertIsNone(response.data["next"])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.short.id, self.long.id])
+        self.assertIsNone(response.data["previous"])
+
+    def test_bulk_delete_stats(self):
+        """queryset.delete()/CASCADE 삭제 시 통계 갱신 테스트"""
+        Marc.objects.create(book=self.author, field_245="$a인물 평전 $d역사연구회")
+        Book.objects.filter(pk__in=[self.long.pk, self.short.pk]).delete()
+        self.assertFalse(SearchTermStat.objects.filter(field="title", gram="역사").exists())
+        self.assertEqual(SearchFieldStat.objects.get(field="title").doc_count, 1)
+        Marc.objects.filter(book=self.author).delete()
+        self.assertFalse(SearchTermStat.objects.filter(field="marc").exists())
+        self.assertFalse(BookNgram.objects.filter(field="marc").exists())
+
+    def test_list_without_search(self):
+        """검색이 아니면 id 역순 커서 목록 테스트"""
+        response = self.client.get("/books/")
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.author.id, self.short.id, self.long.id])
+        self.assertIsNone(response.data["next"])
+
+
+class BookSuggestTest(APITestCase):
+    """자동완성 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        # 테스트 트랜잭션 안의 데이터는 다른 스레드에서 보이지 않으므로 요청 안에서 재구성
+        patcher = mock.patch.object(suggest_index, "BACKGROUND_REBUILD", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(book_code="B001", title="문헌정보학 개론", author="김민준")
+            Book.objects.create(book_code="B002", title="문헌정보학 개론", author="김민준")
+            Book.objects.create(book_code="B003", title="문헌학 입문", author="문상훈")
+
+    def suggest(self, q, **params):
+        response = self.client.get("/books/suggest/", {"q": q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["type"], row["text"]) for row in response.data["results"]]
+
+    def test_prefix(self):
+        """접두어 자동완성 (권수 많은 순) 테스트"""
+        self.assertEqual(self.suggest("문헌"), [("title", "문헌정보학 개론"), ("title", "문헌학 입문")])
+        self.assertEqual(self.suggest("문헌정보"), [("title", "문헌정보학 개론")])
+        self.assertEqual(self.suggest("문"), [("title", "문헌정보학 개론"), ("author", "문상훈"), ("title", "문헌학 입문")])
+        self.assertEqual(self.suggest("문", limit=1), [("title", "문헌정보학 개론")])
+
+    def test_chosung(self):
+        """초성 자동완성 테스트"""
+        self.assertEqual(self.suggest("ㄱㅁ"), [("author", "김민준")])
+
+    def test_no_db_query(self):
+        """색인 구성 후에는 DB 조회 없음 테스트"""
+        self.suggest("문헌")
+        with self.assertNumQueries(0):
+            self.suggest("문헌정")
+
+    def test_refresh_on_save(self):
+        """도서 변경 시 커밋 후 재구성 테스트"""
+        self.suggest("문헌")
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(book_code="B004", title="도서관 경영론")
+        self.assertEqual(self.suggest("도서"), [("title", "도서관 경영론")])
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                       BOOK_CACHE_ALLOW_LOCAL=True)
+    def test_shared_version(self):
+        """다른 프로세스의 변경(공유 버전 증가) 반영 테스트"""
+        self.suggest("문헌")
+        with self.assertNumQueries(0):
+            self.suggest("문헌")
+        Book.objects.filter(book_code="B003").update(title="도서관 경영론")
+        # 다른 프로세스의 mark_stale(): 이 프로세스의 표시는 그대로, 공유 버전만 증가
+        cache = suggest_index._cache()
+        cache.set(suggest_index.VERSION_KEY, cache.get(suggest_index.VERSION_KEY) + 1, None)
+        self.assertEqual(self.suggest("도서"), [("title", "도서관 경영론")])
+
+    def test_background_rebuild(self):
+        """재구성 중에는 이전 색인으로 응답 후 교체 테스트"""
+        self.suggest("문헌")
+        started, release = mock.Mock(), threading.Event()
+
+        def build():
+            started()
+            release.wait(5)
+            return suggest_index.SuggestIndex(Counter({("title", "도서관 경영론"): 1}))
+
+        with mock.patch.object(suggest_index, "BACKGROUND_REBUILD", True), \
+                mock.patch.object(suggest_index, "build_index", side_effect=build), \
+                mock.patch.object(suggest_index.connections, "close_all"):
+            suggest_index._bump()
+            self.assertEqual(self.suggest("도서"), [])
+            self.assertEqual(self.suggest("도서"), [])
+            release.set()
+            for _ in range(100):
+                if not suggest_index._rebuilding:
+                    break
+                time.sleep(0.01)
+        started.assert_called_once()
+        self.assertEqual(self.suggest("도서"), [("title", "도서관 경영론")])
+
+
+class BookFuzzySearchTest(APITestCase):
+    """오타 허용 검색 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(book_code="B001", title="문헌정보학 개론", author="김민준")
+        self.book2 = Book.objects.create(book_code="B002", title="도서관의 역사", author="이서연")
+
+    def test_substring_distance(self):
+        """부분 문자열 편집 거리 테스트"""
+        self.assertEqual(substring_distance("김민즌", "김민준", 1), 1)
+        self.assertEqual(substring_distance("문헌졍보", "문헌정보학개론", 1), 1)
+        self.assertIsNone(substring_distance("도서관", "문헌정보학개론", 1))
+
+    def test_fallback_on_miss(self):
+        """정확 검색 결과가 없을 때만 오타 허용 테스트"""
+        response = self.client.get("/books/", {"search": "김민즌"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.book1.id])
+        self.assertEqual(response["X-Search-Fallback"], "fuzzy")
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/books/", {"search": "김민준"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.book1.id])
+        self.assertFalse(response.has_header("X-Search-Fallback"))
+        # 결과가 있으면 EXISTS 확인도, 후보 조회도 없음
+        self.assertFalse([q for q in ctx.captured_queries if 'SELECT 1 AS "a"' in q["sql"]])
+        self.assertFalse([q for q in ctx.captured_queries if "COUNT(DISTINCT" in q["sql"]])
+
+    @override_settings(BOOK_FUZZY_BUDGET_MS=0)
+    def test_budget_covers_candidates(self):
+        """후보 조회도 시간 예산에 포함 테스트"""
+        with self.assertNumQueries(0):
+            self.assertEqual(fuzzy_ids(["김민즌"]), [])
+
+    def test_fallback_ranked(self):
+        """오타 수가 적은 순 정렬 테스트"""
+        book3 = Book.objects.create(book_code="B003", title="도서관 역사 연구")
+        response = self.client.get("/books/", {"search": "도서괸의역사"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.book2.id, book3.id])
+
+    def test_no_fallback_for_short_term(self):
+        """2글자 이하 검색어는 오타 허용 안 함 테스트"""
+        response = self.client.get("/books/", {"search": "역샤"})
+        self.assertEqual(response.data["results"], [])
+
+
+class BookSubjectTest(APITestCase):
+    """주제명 색인 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(book_code="B001", title="조선의 도서관")
+        self.book2 = Book.objects.create(book_code="B002", title="도서관 경영")
+        Marc.objects.create(book=self.book1, field_650="$a도서관$x역사$z한국", field_653="$a도서관$a조선")
+        Marc.objects.create(book=self.book2, field_650="$a도서관$x역사$z한국")
+
+    def test_parse_headings(self):
+        """표목 파싱 테스트"""
+        self.assertEqual(parse_headings("$a도서관$x역사$z한국"), ["도서관 -- 역사 -- 한국"])
+        self.assertEqual(parse_headings("$a도서관$a조선"), ["도서관", "조선"])
+        self.assertEqual(parse_headings("$a세종,$d1397-1450$x전기"), ["세종 1397-1450 -- 전기"])
+        self.assertEqual(parse_headings("도서관; 정보학"), ["도서관", "정보학"])
+
+    def test_sync_on_save(self):
+        """Marc 저장 시 주제명 동기화 테스트"""
+        self.assertEqual(Subject.objects.count(), 3)
+        marc = self.book1.marc
+        marc.field_653 = "$a조선"
+        marc.save()
+        names = set(BookSubject.objects.filter(book=self.book1).values_list("subject__name", flat=True))
+        self.assertEqual(names, {"도서관 -- 역사 -- 한국", "조선"})
+
+    def test_subject_browse(self):
+        """주제명 목록(권수) 테스트"""
+        response = self.client.get("/books/subjects/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["name"], "도서관 -- 역사 -- 한국")
+        self.assertEqual(response.data[0]["book_count"], 2)
+
+        response = self.client.get("/books/subjects/", {"q": "조", "tag": "653"})
+        self.assertEqual([row["name"] for row in response.data], ["조선"])
+
+    def test_subject_filter(self):
+        """?subject= 필터 테스트"""
+        subject = Subject.objects.get(tag="653", normalized="조선")
+        response = self.client.get("/books/", {"subject": subject.id})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.book1.id])
+
+        response = self.client.get("/books/", {"subject": "도서관 -- 역사 -- 한국"})
+        self.assertEqual(sorted(row["id"] for row in response.data["results"]), [self.book1.id, self.book2.id])
+
+        # 상세 조회에는 적용하지 않음
+        response = self.client.get(f"/books/{self.book2.id}/", {"subject": subject.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_subject_counts(self):
+        """표목별 권수 저장값 갱신 테스트"""
+        subject = Subject.objects.get(tag="653", normalized="조선")
+        self.assertEqual(subject.book_count, 1)
+        with self.assertNumQueries(1):
+            self.client.get("/books/subjects/")
+
+        self.book1.delete()
+        subject.refresh_from_db()
+        self.assertEqual(subject.book_count, 0)
+        response = self.client.get("/books/subjects/")
+        self.assertEqual([(row["name"], row["book_count"]) for row in response.data], [("도서관 -- 역사 -- 한국", 1)])
+
+
+class BookFacetTest(APITestCase):
+    """패싯 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.book1 = Book.objects.create(book_code="B001", title="도서관 역사", publisher="한울", location="1층")
+        self.book2 = Book.objects.create(book_code="B002", title="도서관 경영", publisher="한울", location="2층")
+        self.book3 = Book.objects.create(book_code="B003", title="정보 검색", publisher="창비", location="1층")
+        Target.objects.create(book=self.book1, target=TargetName.objects.create(name="일반"))
+
+    def facet(self, data, name):
+        return {row["value"]: row["count"] for row in data["facets"][name]}
+
+    def test_counts_incremental(self):
+        """저장/삭제 시 패싯 집계 증감 테스트"""
+        counts = unfiltered_counts()
+        self.assertEqual({r["value"]: r["count"] for r in counts["location"]}, {"1층": 2, "2층": 1})
+        self.assertEqual(counts["target"], [{"value": "일반", "count": 1}])
+
+        self.book2.location = "1층"
+        self.book2.save()
+        self.book3.delete()
+        expected = {(f, v): n for f, v, n in FacetCount.objects.filter(count__gt=0).values_list("facet", "value", "count")}
+        rebuild_counts()
+        rebuilt = {(f, v): n for f, v, n in FacetCount.objects.values_list("facet", "value", "count")}
+        self.assertEqual(expected, rebuilt)
+        self.assertEqual(rebuilt[("location", "1층")], 2)
+
+    def assertCountsMatchRebuild(self):
+        current = {(f, v): n for f, v, n in FacetCount.objects.filter(count__gt=0).values_list("facet", "value", "count")}
+        rebuild_counts()
+        self.assertEqual(current, {(f, v): n for f, v, n in FacetCount.objects.values_list("facet", "value", "count")})
+
+    def test_target_changes(self):
+        """이용자대상 전거 변경/이름 변경/일괄 삭제 시 패싯 집계 테스트"""
+        link = Target.objects.get(book=self.book1)
+        link.target = TargetName.objects.create(name="아동")
+        link.save()
+        self.assertEqual(unfiltered_counts()["target"], [{"value": "아동", "count": 1}])
+        self.assertCountsMatchRebuild()
+
+        link.book = self.book2
+        link.save()
+        self.assertCountsMatchRebuild()
+
+        name = link.target
+        name.name = "어린이"
+        name.save()
+        self.assertEqual(unfiltered_counts()["target"], [{"value": "어린이", "count": 1}])
+        self.assertEqual(Target.objects.get(pk=link.pk).field_521, "어린이")
+        self.assertCountsMatchRebuild()
+
+        # queryset.delete()와 CASCADE로 지워지는 Target
+        Book.objects.filter(pk__in=[self.book2.pk, self.book3.pk]).delete()
+        self.assertEqual(unfiltered_counts()["target"], [])
+        self.assertEqual({r["value"]: r["count"] for r in unfiltered_counts()["publisher"]}, {"한울": 1})
+        self.assertCountsMatchRebuild()
+
+    def test_list_facets(self):
+        """?facets=true 전체 목록 테스트"""
+        response = self.client.get("/books/", {"facets": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertEqual(self.facet(response.data, "publisher"), {"한울": 2, "창비": 1})
+        self.assertEqual(self.facet(response.data, "book_status"), {"AVAILABLE": 3})
+
+    def test_search_facets(self):
+        """검색 결과 패싯 테스트"""
+        response = self.client.get("/books/", {"search": "도서관", "facets": "true"})
+        self.assertEqual(len(response.data["results"]), 2)
+        self.assertEqual(self.facet(response.data, "location"), {"1층": 1, "2층": 1})
+        self.assertEqual(self.facet(response.data, "publisher"), {"한울": 2})
+        self.assertEqual(self.facet(response.data, "target"), {"일반": 1})
+
+
+class BookWorkCollapseTest(APITestCase):
+    """복본 묶음 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.copy1 = Book.objects.create(book_code="B001", title="도서관 역사", author="김민준", isbn="8937460440")
+        self.copy2 = Book.objects.create(book_code="B002", title="도서관의 역사", author="김민준",
+                                         isbn="978-89-374-6044-9", book_status="RENTED")
+        self.copy3 = Book.objects.create(book_code="B003", title="도서관 역사", author="김민준", isbn="9788937460449 (세트)")
+        self.other = Book.objects.create(book_code="B004", title="도서관 경영", author="이서준")
+
+    def test_work_key(self):
+        """ISBN-10/13, 표제/저자 정규화 테스트"""
+        self.assertEqual(work_key("8937460440", None, None), "isbn:9788937460449")
+        self.assertEqual(work_key(None, "Library  History!", "Kim"), work_key(None, "library history", "KIM"))
+        self.assertIsNone(work_key(None, None, "김민준"))
+        self.assertEqual(len({b.work_key for b in (self.copy1, self.copy2, self.copy3)}), 1)
+
+        self.other.isbn = "9788937460449"
+        self.other.save(update_fields=["isbn"])
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.work_key, self.copy1.work_key)
+
+    def test_collapse_list(self):
+        """?collapse=true 목록 테스트"""
+        # ETag 변경 순번 + 묶음 집계 + 대표 도서 컬럼
+        with self.assertNumQueries(3):
+            response = self.client.get("/books/", {"collapse": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 대표 도서 id 역순
+        works = response.data["results"]
+        self.assertEqual(len(works), 2)
+        self.assertEqual(works[0]["copy_count"], 1)
+        self.assertEqual(works[1]["id"], self.copy1.id)
+        self.assertEqual(works[1]["copy_count"], 3)
+        self.assertEqual(works[1]["available_count"], 2)
+        # 서지 컬럼은 모두 대표 도서 한 권의 값 (복본마다 다른 값이 섞이지 않음)
+        self.assertEqual((works[1]["title"], works[1]["isbn"]), (self.copy1.title, self.copy1.isbn))
+
+    def test_collapse_search(self):
+        """검색 결과 묶음 테스트"""
+        response = self.client.get("/books/", {"search": "도서관", "collapse": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(sorted(row["copy_count"] for row in results), [1, 3])
+
+
+class BookShelfTest(APITestCase):
+    """서가 순서 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        callnumbers = ["5.1 P999p", "020 이54ㅎ", "100 김12ㄱ", "813.7 김가73ㅎ v.2",
+                       "813.7 김가73ㅎ v.10", "813.71 박12ㄴ", "$a813.8$b최11ㅅ"]
+        # 서가 순서와 다르게 저장
+        self.books = {}
+        for i, cn in enumerate(reversed(callnumbers)):
+            self.books[cn] = Book.objects.create(book_code=f"B{i:03d}", title=f"도서 {i}", callnumber=cn)
+        self.order = [self.books[cn].id for cn in callnumbers]
+        Book.objects.create(book_code="B999", title="청구기호 없음")
+
+    def test_callnumber_key(self):
+        """청구기호 정렬 키 테스트"""
+        self.assertEqual(callnumber_key("5.1 P999p"), "005.1 p999p")
+        self.assertLess(callnumber_key("813.7 김가73ㅎ v.2"), callnumber_key("813.7 김가73ㅎ v.10"))
+        self.assertLess(callnumber_key("813 김"), callnumber_key("813.1 김"))
+        self.assertEqual(callnumber_key("$a813.7$b김가73ㅎ$cv.2"), callnumber_key("813.7 김가73ㅎ v.2"))
+        self.assertIsNone(callnumber_key(""))
+
+    def test_shelf_pages(self):
+        """앞/뒤 페이지 이동 테스트"""
+        response = self.client.get("/books/shelf/", {"size": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[:3])
+        self.assertIsNone(response.data["previous"])
+
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[3:6])
+        response = self.client.get(response.data["next"])
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[6:])
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[3:6])
+
+    def test_shelf_from(self):
+        """?from= 시작 위치 테스트"""
+        response = self.client.get("/books/shelf/", {"from": "813.7", "size": 2})
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[3:5])
+        response = self.client.get(response.data["previous"])
+        self.assertEqual([row["id"] for row in response.data["results"]], self.order[1:3])
+
+        response = self.client.get("/books/shelf/", {"cursor": "broken"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BookLookupTest(APITestCase):
+    """일괄 조회 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="u1", password="pw1234!!", name="사용자")
+        self.client.force_authenticate(self.user)
+        self.book1 = Book.objects.create(book_code="B001", title="도서관 역사", isbn="9788937460449")
+        self.book2 = Book.objects.create(book_code="B002", title="도서관 역사", isbn="9788937460449")
+        self.book3 = Book.objects.create(book_code="B003", title="도서관 저널", issn="1234-567X")
+
+    def test_lookup(self):
+        """입력 코드별 결과 테스트"""
+        payload = {
+            "book_code": ["B001", "B404"],
+            "isbn": ["978-89-374-6044-9 (양장)", "0000000000"],
+            "issn": ["1234567x"],
+        }
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post("/books/lookup/", payload, format="json")
+        # 종류별 IN 쿼리 한 번씩
+        lookups = [q for q in ctx.captured_queries if q["sql"].startswith('SELECT "books_book"')]
+        self.assertEqual(len(lookups), 3)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["book_code"]["B001"]], [self.book1.id])
+        self.assertEqual(response.data["book_code"]["B404"], [])
+        self.assertEqual([row["id"] for row in response.data["isbn"]["978-89-374-6044-9 (양장)"]],
+                         [self.book1.id, self.book2.id])
+        self.assertEqual(response.data["isbn"]["0000000000"], [])
+        self.assertEqual([row["id"] for row in response.data["issn"]["1234567x"]], [self.book3.id])
+
+    def test_lookup_empty(self):
+        """빈 요청 테스트"""
+        response = self.client.post("/books/lookup/", {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookSeriesContributorTest(APITestCase):
+    """총서/부출 표목 색인 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.vol2 = Book.objects.create(book_code="B001", title="세계문학 2")
+        self.vol1 = Book.objects.create(book_code="B002", title="세계문학 1")
+        self.other = Book.objects.create(book_code="B003", title="번역 이야기")
+        self.none = Book.objects.create(book_code="B004", title="관계없는 책")
+        Marc.objects.create(book=self.vol2, field_490="$a세계문학전집 ;$v2", field_700="$a김민준,$d1970-$e옮김")
+        Marc.objects.create(book=self.vol1, field_490="$a세계문학전집 ;$v1")
+        Marc.objects.create(book=self.other, field_700="$a김민준,$d1970-", field_710="$a한국도서관협회")
+        Marc.objects.create(book=self.none, field_700="$a이서준")
+
+    def test_parse(self):
+        """490/700 파싱 테스트"""
+        self.assertEqual(parse_series("$a세계문학전집 ;$v12"), [("세계문학전집", "12")])
+        self.assertEqual(parse_names("$a김민준,$d1970-$e옮김"), [("김민준 1970-", "옮김")])
+        self.assertEqual(parse_names("Smith, John; 김민준"), [("Smith, John", None), ("김민준", None)])
+
+    def test_sync_on_save(self):
+        """Marc 저장 시 연결 동기화 테스트"""
+        self.assertEqual(Series.objects.count(), 1)
+        self.assertEqual(BookSeries.objects.get(book=self.vol2).volume_no, 2)
+        link = BookContributor.objects.get(book=self.vol2)
+        self.assertEqual((link.contributor.name, link.role), ("김민준 1970-", "옮김"))
+
+        marc = self.vol2.marc
+        marc.field_490 = "$a세계문학전집 ;$v3"
+        marc.field_700 = None
+        marc.save()
+        self.assertEqual(BookSeries.objects.get(book=self.vol2).volume, "3")
+        self.assertFalse(BookContributor.objects.filter(book=self.vol2).exists())
+        self.assertEqual(Contributor.objects.get(tag="700", normalized="김민준 1970-").book_count, 1)
+        self.assertEqual(Series.objects.get().book_count, 2)
+
+    def test_browse(self):
+        """총서/부출 표목 목록, 필터 테스트"""
+        response = self.client.get("/books/series/", {"q": "세계"})
+        self.assertEqual([(row["name"], row["book_count"]) for row in response.data], [("세계문학전집", 2)])
+        response = self.client.get("/books/contributors/", {"tag": "700"})
+        self.assertEqual(response.data[0]["name"], "김민준 1970-")
+        self.assertEqual(response.data[0]["book_count"], 2)
+
+        response = self.client.get("/books/", {"series": "세계문학전집"})
+        self.assertEqual(sorted(row["id"] for row in response.data["results"]), [self.vol2.id, self.vol1.id])
+        contributor = Contributor.objects.get(tag="710")
+        response = self.client.get("/books/", {"contributor": contributor.id})
+        self.assertEqual([row["id"] for row in response.data["results"]], [self.other.id])
+
+    def test_related(self):
+        """같은 총서/저자 도서 테스트"""
+        with self.assertNumQueries(3):
+            response = self.client.get(f"/books/{self.vol2.id}/related/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row["id"] for row in response.data["series"]], [self.vol1.id])
+        self.assertEqual([row["id"] for row in response.data["contributor"]], [self.other.id])
+
+        # limit은 구역마다 따로
+        response = self.client.get(f"/books/{self.vol2.id}/related/", {"limit": 1})
+        self.assertEqual([row["id"] for row in response.data["contributor"]], [self.other.id])
+        response = self.client.get("/books/999999/related/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   BOOK_CACHE_ALLOW_LOCAL=True, BOOK_SEARCH_CACHE_MIN_HITS=2)
+class BookSearchCacheTest(APITestCase):
+    """검색어 기록/인기 검색어 캐시 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        querylog.hot_cache.clear()
+        # 다른 테스트에서 쌓인 기록 비우기
+        querylog.flush()
+        SearchQueryLog.objects.all().delete()
+        self.book1 = Book.objects.create(book_code="B001", title="도서관 역사")
+        self.book2 = Book.objects.create(book_code="B002", title="정보 검색")
+
+    def ids(self, q):
+        return [row["id"] for row in self.client.get("/books/", {"search": q}).data["results"]]
+
+    def cached(self, q):
+        return querylog.hot_cache.get(q) is not None
+
+    def test_hot_query_cached(self):
+        """반복 검색 시 색인 조회 생략 테스트"""
+        self.assertEqual(self.ids("도서관"), [self.book1.id])
+        self.assertFalse(self.cached("도서관"))
+        self.assertEqual(self.ids("도서관"), [self.book1.id])
+        self.assertTrue(self.cached("도서관"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.ids("도서관"), [self.book1.id])
+        self.assertFalse([q for q in ctx.captured_queries if 'FROM "books_bookngram" WHERE' in q["sql"]
+                          and "GROUP BY" in q["sql"] and "HAVING" in q["sql"]])
+
+    def test_too_many_not_cached(self):
+        """일치 도서가 너무 많은 인기 검색어는 일반 검색 테스트"""
+        book3 = Book.objects.create(book_code="B003", title="도서관 경영")
+        with mock.patch("books.filters.MAX_CACHED_IDS", 1):
+            self.assertEqual(sorted(self.ids("도서관")), [self.book1.id, book3.id])
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(sorted(self.ids("도서관")), [self.book1.id, book3.id])
+        self.assertFalse(self.cached("도서관"))
+        # id 목록을 IN으로 보내지 않고, 최대 MAX_CACHED_IDS + 1건만 읽어 본다
+        self.assertFalse([q for q in ctx.captured_queries if f"IN ({self.book1.id}, {book3.id})" in q["sql"]])
+        self.assertTrue([q for q in ctx.captured_queries if "LIMIT 2" in q["sql"]])
+
+    def test_invalidate_on_save(self):
+        """검색 대상 필드 변경 시 커밋 후 캐시 무효화 테스트"""
+        self.ids("도서관")
+        self.ids("도서관")
+        with self.captureOnCommitCallbacks(execute=True):
+            book3 = Book.objects.create(book_code="B003", title="도서관 경영")
+            # 커밋 전에는 그대로
+            self.assertTrue(self.cached("도서관"))
+        self.assertFalse(self.cached("도서관"))
+        self.assertEqual(sorted(self.ids("도서관")), [self.book1.id, book3.id])
+
+        self.ids("도서관")
+        self.assertTrue(self.cached("도서관"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book2.location = "2층" # 검색과 무관한 변경
+            self.book2.save()
+        self.assertTrue(self.cached("도서관"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book1.title = "역사 이야기"
+            self.book1.save()
+        self.assertEqual(self.ids("도서관"), [book3.id])
+
+    def test_local_cache_disabled(self):
+        """프로세스별 메모리 캐시면 인기 검색어 캐시 사용 안 함 테스트"""
+        with override_settings(BOOK_CACHE_ALLOW_LOCAL=False):
+            self.ids("도서관")
+            self.ids("도서관")
+            self.assertFalse(self.cached("도서관"))
+            self.assertEqual(self.ids("도서관"), [self.book1.id])
+
+    def test_query_log(self):
+        """검색어별 요청 수 기록 테스트"""
+        self.ids("도서관  역사")
+        self.ids("도서관 역사")
+        querylog.flush()
+        log = SearchQueryLog.objects.get(query="도서관 역사")
+        self.assertEqual(log.hits, 2)
+        self.assertGreater(log.total_ms, 0)
+
+    def test_query_log_flushed_after_response(self):
+        """검색어 기록은 응답 뒤 request_finished에서 기록 테스트"""
+        with mock.patch.object(querylog, "FLUSH_INTERVAL", 0), \
+                mock.patch.object(querylog, "flush", wraps=querylog.flush) as flush:
+            self.ids("도서관")
+        flush.assert_called_once()
+        self.assertEqual(SearchQueryLog.objects.get(query="도서관").hits, 1)
+
+
+class BookLikedQueryCountTest(APITestCase):
+    """목록 좋아요 여부 쿼리 수 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(username="u1", password="pw1234!!", name="사용자")
+        self.client.force_authenticate(self.user)
+        self.books = [Book.objects.create(book_code=f"B{i:03d}", title=f"도서관 {i}") for i in range(3)]
+        self.books[1].liked_users.add(self.user)
+
+    def count_queries(self, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/books/", params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries), response
+
+    def test_constant_queries(self):
+        """페이지 크기와 무관한 쿼리 수 테스트"""
+        small, response = self.count_queries({"size": 50})
+        liked = {row["id"]: row["is_liked"] for row in response.data["results"]}
+        self.assertEqual(liked, {b.id: b == self.books[1] for b in self.books})
+
+        for i in range(3, 30):
+            Book.objects.create(book_code=f"B{i:03d}", title=f"도서관 {i}")
+        large, response = self.count_queries({"size": 50})
+        self.assertEqual(len(response.data["results"]), 30)
+        self.assertEqual(small, large)
+
+        # 인기 검색어 캐시, 주기적인 검색어 기록 flush가 끼어들지 않도록
+        querylog.hot_cache.clear()
+        with mock.patch.object(querylog, "FLUSH_INTERVAL", 3600):
+            small, _ = self.count_queries({"search": "도서관", "size": 5})
+            large, response = self.count_queries({"search": "도서관", "size": 25})
+        self.assertEqual(len(response.data["results"]), 25)
+        self.assertEqual(small, large)
+
+
+class BookLikeCountTest(APITestCase):
+    """좋아요 수 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="u1", password="pw1234!!", name="사용자1")
+        self.other = User.objects.create_user(username="u2", password="pw1234!!", name="사용자2")
+        self.book1 = Book.objects.create(book_code="B001", title="도서관 역사")
+        self.book2 = Book.objects.create(book_code="B002", title="정보 검색")
+        self.client.force_authenticate(self.user)
+
+    def test_toggle(self):
+        """좋아요 등록/취소 시 카운터 갱신 테스트"""
+        response = self.client.post(f"/books/{self.book1.id}/like/")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.like_count, 1)
+        self.assertTrue(self.book1.liked_users.filter(pk=self.user.pk).exists())
+
+        response = self.client.post(f"/books/{self.book1.id}/like/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.book1.refresh_from_db()
+        self.assertEqual(self.book1.like_count, 0)
+
+        response = self.client.post("/books/999999/like/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Book.liked_users.through.objects.filter(book_id=999999).exists())
+
+    def test_toggle_statements(self):
+        """토글은 좋아요 행 변경 + 카운터 UPDATE만 실행 테스트"""
+        for expected, liked in ((3, True), (2, False)):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(toggle_like(self.book1.id, self.user.id), liked)
+            sql = [q["sql"] for q in ctx.captured_queries if "SAVEPOINT" not in q["sql"]]
+            self.assertEqual(len(sql), expected, sql)
+
+    def test_user_delete(self):
+        """사용자 삭제(CASCADE) 시 카운터 재계산 테스트"""
+        self.client.post(f"/books/{self.book1.id}/like/")
+        self.book2.liked_users.add(self.user, self.other)
+        self.user.delete()
+        self.book1.refresh_from_db()
+        self.book2.refresh_from_db()
+        self.assertEqual((self.book1.like_count, self.book2.like_count), (0, 1))
+
+    def test_m2m_sync(self):
+        """liked_users 직접 변경 시 카운터 재계산 테스트"""
+        self.book2.liked_users.add(self.user, self.other)
+        self.book2.refresh_from_db()
+        self.assertEqual(self.book2.like_count, 2)
+        self.other.liked_books.remove(self.book2)
+        self.book2.refresh_from_db()
+        self.assertEqual(self.book2.like_count, 1)
+
+    def test_popular(self):
+        """인기 도서 목록 테스트"""
+        self.book2.liked_users.add(self.user, self.other)
+        self.client.post(f"/books/{self.book1.id}/like/")
+        response = self.client.get("/books/popular/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(row["id"], row["like_count"]) for row in response.data],
+                         [(self.book2.id, 2), (self.book1.id, 1)])
+        self.assertTrue(all(row["is_liked"] for row in response.data))
+
+
+class MarcPhysicalTest(APITestCase):
+    """형태사항 저장 테스트"""
+
+    def test_parse_physical(self):
+        """300 파싱 테스트"""
+        self.assertEqual(parse_physical("$a320 p. :$b삽화 ;$c23 cm"), ("320p", "23cm"))
+        self.assertEqual(parse_physical("$a250–260 p."), ("250-260p", None))
+        self.assertEqual(parse_physical("$a1책 ;$c30 cm"), (None, "30cm"))
+        self.assertEqual(parse_physical(None), (None, None))
+
+    def test_stored_on_save(self):
+        """Marc 저장 시 컬럼 계산, 상세 조회 테스트"""
+        book = Book.objects.create(book_code="B001", title="도서관 역사")
+        marc = Marc.objects.create(book=book, field_300="$axii, 415 p. ;$c24 cm")
+        self.assertEqual((marc.physical_pages, marc.physical_size), ("xii415p", "24cm"))
+
+        marc.field_300 = "$a200 p."
+        marc.save(update_fields=["field_300"])
+        marc.refresh_from_db()
+        self.assertEqual((marc.physical_pages, marc.physical_size), ("200p", None))
+
+        response = self.client.get(f"/books/{book.id}/")
+        self.assertEqual(response.data["physical"], "200p")
+
+
+class MarcStorageTest(APITestCase):
+    """MARC data 단일 저장 테스트"""
+
+    def setUp(self):
+        self.book = Book.objects.create(book_code="B001", title="도서관 역사")
+        self.marc = Marc.objects.create(book=self.book, field_245="$a도서관 역사", field_246_same="Library History",
+                                        field_650="$a도서관$x역사")
+
+    def test_fields_read_and_write_data(self):
+        """field_xxx 속성이 data를 읽고 쓰는지 테스트"""
+        self.assertNotIn("field_245", [f.name for f in Marc._meta.concrete_fields])
+        self.assertEqual(self.marc.data, {
+            "245": {"a": "$a도서관 역사", "subfields": {"a": ["도서관 역사"]}},
+            "650": {"a": "$a도서관$x역사", "subfields": {"a": ["도서관"], "x": ["역사"]}},
+            "246": {"parallel_title": "Library History", "subfields": {"a": ["Library History"]}},
+        })
+        marc = Marc.objects.get(pk=self.marc.pk)
+        self.assertEqual(marc.field_650, "$a도서관$x역사")
+        self.assertIsNone(marc.field_300)
+
+        marc.field_650 = None
+        marc.field_300 = "$a200 p."
+        marc.save(update_fields=["field_650", "field_300"])
+        marc = Marc.objects.get(pk=self.marc.pk)
+        self.assertNotIn("650", marc.data)
+        self.assertEqual((marc.field_300, marc.physical_pages), ("$a200 p.", "200p"))
+
+    def test_unchanged_save_skips_rebuild(self):
+        """값이 그대로면 색인/도서 버전 갱신 생략 테스트"""
+        marc = Marc.objects.get(pk=self.marc.pk)
+        version = Book.objects.get(pk=self.book.pk).version
+        marc.field_245 = "$a도서관 역사"
+        with self.assertNumQueries(1): # UPDATE만
+            marc.save()
+        self.assertEqual(Book.objects.get(pk=self.book.pk).version, version)
+
+        marc.field_245 = "$a도서관 경영"
+        marc.save()
+        self.assertEqual(Book.objects.get(pk=self.book.pk).version, version + 1)
+
+    def test_in_place_edit(self):
+        """data 제자리 수정도 변경으로 보는지 테스트"""
+        marc = Marc.objects.get(pk=self.marc.pk)
+        version = Book.objects.get(pk=self.book.pk).version
+        marc.data["300"] = {"a": "$a200 p."}
+        marc.save()
+        marc = Marc.objects.get(pk=self.marc.pk)
+        self.assertEqual(marc.physical_pages, "200p")
+        self.assertEqual(Book.objects.get(pk=self.book.pk).version, version + 1)
+
+
+class MarcSubfieldTest(APITestCase):
+    """MARC 서브필드 저장 테스트"""
+
+    def setUp(self):
+        # 앞 테스트에서 파싱해 둔 원문 비우기
+        _raw_pairs.cache_clear()
+
+    def test_import_parses_once(self):
+        """import_books가 245를 한 번만 파싱 테스트"""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", encoding="utf-8", delete=False) as f:
+            writer = csv.writer(f)
+            writer.writerow(["등록번호", "020", "245", "260", "300"])
+            writer.writerow(["B001", "$a9788937460449 :$c15000", "$a도서관 역사 /$d김민준 지음", "$a서울 :$b한울",
+                             "$a320 p. ;$c23 cm"])
+        self.addCleanup(os.remove, f.name)
+
+        with mock.patch("books.marc.iter_subfields", wraps=iter_subfields) as parse:
+            call_command("import_books", file=f.name, stdout=io.StringIO())
+        self.assertEqual([c for c in parse.call_args_list if c.args[0].startswith("$a도서관")], [mock.call("$a도서관 역사 /$d김민준 지음")])
+
+        book = Book.objects.get(book_code="B001")
+        self.assertEqual((book.title, book.author, book.publisher, book.isbn),
+                         ("도서관 역사", "김민준 지음", "한울", "9788937460449"))
+        self.assertEqual(book.marc.data["245"]["subfields"], {"a": ["도서관 역사"], "d": ["김민준 지음"]})
+        self.assertEqual(book.marc.subfield("020", "c"), "15000")
+
+    def test_detail_without_parsing(self):
+        """상세 조회 시 MARC 문자열 파싱 없음 테스트"""
+        book = Book.objects.create(book_code="B001", title="도서관 역사")
+        Marc.objects.create(book=book, field_245="$a도서관 역사 /$d김민준", field_300="$a320 p. ;$c23 cm")
+        with mock.patch("books.marc.iter_subfields") as parse:
+            response = self.client.get(f"/books/{book.id}/")
+        parse.assert_not_called()
+        self.assertEqual(response.data["marc"]["245"]["subfields"]["d"], ["김민준"])
+
+    def test_data_assigned_directly(self):
+        """data를 직접 넣어도 저장 시 서브필드 채움 테스트"""
+        book = Book.objects.create(book_code="B001", title="도서관 역사")
+        marc = Marc.objects.create(book=book, data={"260": {"a": "$a서울 :$b한울"}})
+        self.assertEqual(marc.subfield("260", "b"), "한울")
+        self.assertEqual(BookNgram.objects.filter(book=book, field="marc").count(), 0)
+
+        marc.field_245 = "$a문헌정보학 개론"
+        marc.save()
+        grams = set(BookNgram.objects.filter(book=book, field="marc").values_list("gram", flat=True))
+        self.assertIn("정보학", grams)
+        self.assertFalse([g for g in grams if "$" in g])
+
+    def test_stale_subfields_recomputed(self):
+        """원문과 맞지 않는 subfields를 들고 온 data 저장 테스트"""
+        book = Book.objects.create(book_code="B001", title="도서관 역사")
+        marc = Marc.objects.create(book=book, field_245="$a도서관 역사")
+        data = copy.deepcopy(marc.data)
+        data["245"]["a"] = "$a문헌정보학 개론"
+        marc.data = data
+        marc.save()
+        marc = Marc.objects.get(pk=marc.pk)
+        self.assertEqual(marc.data["245"]["subfields"], {"a": ["문헌정보학 개론"]})
+        grams = set(BookNgram.objects.filter(book=book, field="marc").values_list("gram", flat=True))
+        self.assertIn("정보학", grams)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   BOOK_CACHE_ALLOW_LOCAL=True)
+class BookDetailCacheTest(APITestCase):
+    """상세 응답 캐시 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        detail_cache._cache().clear()
+        self.book = Book.objects.create(book_code="B001", title="도서관 역사")
+        self.marc = Marc.objects.create(book=self.book, field_300="$a320 p. ;$c23 cm")
+
+    def tearDown(self):
+        # 테스트 트랜잭션은 커밋되지 않아 무효화가 일어나지 않으므로 직접 비움
+        detail_cache._cache().clear()
+
+    def detail(self):
+        return self.client.get(f"/books/{self.book.id}/").data
+
+    def test_cached(self):
+        """두 번째 조회는 DB 조회 없음 테스트"""
+        self.assertEqual(self.detail()["physical"], "320p, 23cm")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.detail()["title"], "도서관 역사")
+        self.assertEqual(detail_cache.stats()["hits"], 1)
+        self.assertEqual(detail_cache.stats()["misses"], 1)
+
+    def test_invalidate(self):
+        """Book/Marc/Target/Curation 변경 시 무효화 테스트"""
+        self.detail()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "도서관 경영"
+            self.book.save()
+        self.assertEqual(self.detail()["title"], "도서관 경영")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.marc.field_300 = "$a100 p."
+            self.marc.save()
+        self.assertEqual(self.detail()["physical"], "100p")
+
+        for change in (
+            lambda: Target.objects.create(book=self.book, target=TargetName.objects.create(name="일반")),
+            lambda: Curation.objects.create(book=self.book, field_500_curation="추천"),
+        ):
+            version = detail_cache.version(self.book.id)
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertNotEqual(detail_cache.version(self.book.id), version)
+
+    def test_local_cache_disabled(self):
+        """프로세스별 메모리 캐시면 캐시하지 않음 테스트"""
+        with override_settings(BOOK_CACHE_ALLOW_LOCAL=False):
+            self.detail()
+            with self.assertNumQueries(1):
+                self.assertEqual(self.detail()["title"], "도서관 역사")
+            self.assertFalse(detail_cache.stats()["enabled"])
+
+    def test_rollback_keeps_cache(self):
+        """커밋 전에는 무효화하지 않음 테스트"""
+        self.detail()
+        version = detail_cache.version(self.book.id)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.book.title = "롤백"
+            self.book.save()
+        self.assertEqual(detail_cache.version(self.book.id), version)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   BOOK_CACHE_ALLOW_LOCAL=True)
+class BookConditionalGetTest(APITestCase):
+    """ETag/Last-Modified 조건부 GET 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        detail_cache._cache().clear()
+        self.book = Book.objects.create(book_code="B001", title="도서관 역사")
+
+    def tearDown(self):
+        detail_cache._cache().clear()
+
+    def test_version_bump(self):
+        """관련 행 변경 시 버전 증가 테스트"""
+        version = Book.objects.get(pk=self.book.pk).version
+        Marc.objects.create(book=self.book, field_300="$a100 p.")
+        Target.objects.create(book=self.book, target=TargetName.objects.create(name="일반"))
+        Curation.objects.create(book=self.book, field_500_curation="추천")
+        self.book.refresh_from_db()
+        self.book.book_status = "RENTED"
+        self.book.save(update_fields=["book_status"])
+        self.assertEqual(Book.objects.get(pk=self.book.pk).version, version + 4)
+
+    def test_stale_instance_save(self):
+        """touch 전에 읽은 인스턴스 저장 시 버전 재사용 없음 테스트"""
+        book = Book.objects.get(pk=self.book.pk)
+        Book.touch(self.book.pk)
+        touched = Book.objects.get(pk=self.book.pk).version
+        book.book_status = "RENTED"
+        book.save(update_fields=["book_status"])
+        self.assertEqual(book.version, touched + 1)
+        self.assertEqual(Book.objects.get(pk=self.book.pk).version, touched + 1)
+
+    def test_detail_not_modified(self):
+        """상세 304 테스트"""
+        response = self.client.get(f"/books/{self.book.id}/")
+        etag = response["ETag"]
+        self.assertTrue(response.has_header("Last-Modified"))
+
+        response = self.client.get(f"/books/{self.book.id}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Curation.objects.create(book=self.book, field_500_curation="추천")
+        response = self.client.get(f"/books/{self.book.id}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_not_modified(self):
+        """목록 304 테스트"""
+        response = self.client.get("/books/")
+        etag = response["ETag"]
+        self.assertFalse(response.has_header("Last-Modified"))
+        with self.assertNumQueries(1): # 변경 순번만
+            response = self.client.get("/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # 수정 시각만으로는 삭제를 알 수 없어 목록은 If-Modified-Since로 304를 주지 않음
+        response = self.client.get("/books/", HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(book_code="B002", title="정보 검색")
+        response = self.client.get("/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        etag = response["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.get(book_code="B002").delete()
+        response = self.client.get("/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_list_like_changes_etag(self):
+        """좋아요 변경 시 목록 ETag 변경 테스트"""
+        user = get_user_model().objects.create_user(username="u1", password="pw1234!!", name="사용자")
+        self.client.force_authenticate(user)
+        etag = self.client.get("/books/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/books/{self.book.id}/like/")
+        response = self.client.get("/books/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["like_count"], 1)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   BOOK_CACHE_ALLOW_LOCAL=True)
+class BookSparseFieldsTest(APITestCase):
+    """?fields=, ?marc_tags= 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        detail_cache._cache().clear()
+        self.book = Book.objects.create(book_code="B001", title="도서관 역사", author="김민준", publisher="한울")
+        Marc.objects.create(book=self.book, field_245="$a도서관 역사", field_260="$a서울 :$b한울",
+                            field_300="$a320 p. ;$c23 cm")
+
+    def tearDown(self):
+        detail_cache._cache().clear()
+
+    def test_list_fields(self):
+        """목록 필드 선택 + 필요한 컬럼만 조회 테스트"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/books/", {"fields": "id,title,book_status"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["results"][0]), {"id", "title", "book_status"})
+        select = [q["sql"] for q in ctx.captured_queries if "books_book\".\"title\"" in q["sql"]][-1]
+        self.assertNotIn('"books_book"."publisher"', select)
+
+        response = self.client.get("/books/", {"fields": "id,nope"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_detail_fields(self):
+        """상세 필드/MARC 태그 선택 테스트"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f"/books/{self.book.id}/", {"fields": "title,marc", "marc_tags": "245,300"})
+        self.assertEqual(set(response.data), {"title", "marc"})
+        self.assertEqual(set(response.data["marc"]), {"245", "300"})
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("field_650", ctx.captured_queries[0]["sql"])
+
+        # 전체 응답 캐시 후 일부만 잘라서 응답
+        full = self.client.get(f"/books/{self.book.id}/").data
+        self.assertIn("260", full["marc"])
+        with self.assertNumQueries(0):
+            response = self.client.get(f"/books/{self.book.id}/", {"fields": "physical,book_status"})
+        self.assertEqual(response.data, {"physical": "320p, 23cm", "book_status": "AVAILABLE"})
+
+
+class FastRowSerializationTest(APITestCase):
+    """values() 기반 목록 직렬화 테스트"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="reader", password="pw", name="독자")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = timezone.localdate()
+        self.books = [
+            Book.objects.create(book_code="B001", title="도서관 역사", author="김민준", publisher="한울",
+                                image_url="https://example.com/b001.jpg"),
+            Book.objects.create(book_code="B002", title="문헌정보학 개론", author="이서준", book_status="RENTED"),
+            Book.objects.create(book_code="B003", title="도서관 경영", author="박지현", book_status="RESERVED"),
+        ]
+        self.books[0].liked_users.add(self.user)
+        Rental.objects.create(user=self.user, book=self.books[1], due_date=today - timedelta(days=3))
+        Rental.objects.create(user=self.user, book=self.books[2], due_date=today + timedelta(days=7))
+        Reservation.objects.create(user=self.user, book=self.books[1], due_date=today + timedelta(days=2))
+        Reservation.objects.create(user=self.user, book=self.books[2], status=ReservationStatus.CANCELED,
+                                   cancel_date=timezone.now())
+
+    def assertSameResponse(self, url, params=None):
+        slow = self.client.get(url, params or {})
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            fast = self.client.get(url, params or {})
+        self.assertEqual(slow.status_code, status.HTTP_200_OK)
+        self.assertEqual(fast.content, slow.content)
+        return fast
+
+    def test_book_list_parity(self):
+        """도서 목록(검색, 필드 선택 포함) 출력 일치 테스트"""
+        response = self.assertSameResponse("/books/")
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertSameResponse("/books/", {"search": "도서관"})
+        self.assertSameResponse("/books/", {"search": "문헌 도서관", "size": 1})
+        self.assertSameResponse("/books/", {"fields": "id,is_liked,image_url"})
+        self.assertSameResponse("/books/", {"facets": "true"})
+
+    def test_rental_current_parity(self):
+        """대출 현황 출력 일치 테스트"""
+        response = self.assertSameResponse("/rentals/current/")
+        overdue = [r["is_overdue"] for r in response.json()["results"]]
+        self.assertEqual(sorted(overdue), [False, True])
+
+    def test_reservation_list_parity(self):
+        """예약 목록 출력 일치 테스트"""
+        response = self.assertSameResponse("/reservations/")
+        self.assertEqual(len(response.json()["results"]), 2)
+
+    def test_other_lists_paged(self):
+        """대출/예약/리뷰 목록 커서 페이지 테스트"""
+        Review.objects.create(user=self.user, book=self.books[0], content="좋아요")
+        Review.objects.create(user=self.user, book=self.books[1], content="보통")
+        for url in ("/rentals/", "/reservations/", "/reviews/"):
+            seen = []
+            response = self.client.get(url, {"size": 1})
+            while True:
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                seen += [row["id"] for row in response.data["results"]]
+                if not response.data["next"]:
+                    break
+                response = self.client.get(response.data["next"])
+            self.assertEqual(len(seen), 2)
+            if url != "/reviews/":
+                self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_fast_list_uses_values(self):
+        """모델 인스턴스 없이 values() 행으로 직렬화 테스트"""
+        with override_settings(FAST_LIST_SERIALIZATION=True), mock.patch.object(Book, "__init__") as init:
+            with self.assertNumQueries(3): # 목록 + 좋아요 + 변경 순번(ETag)
+                response = self.client.get("/books/")
+        init.assert_not_called()
+        self.assertEqual([b["is_liked"] for b in response.data["results"]], [False, False, True])
+
+    def test_unsupported_field(self):
+        """values()로 만들 수 없는 필드 거부 테스트"""
+        with self.assertRaises(TypeError):
+            RowMapper(BookDetailSerializer)
+
+
+class ORJSONRendererTest(APITestCase):
+    """orjson 렌더러/파서 테스트"""
+
+    def test_same_output_as_json_renderer(self):
+        """기본 JSONRenderer와 같은 출력 테스트"""
+        data = {
+            "title": "도서관 역사 \u2028",
+            "rental_date": datetime.date(2025, 3, 1),
+            "reservation_date": datetime.datetime(2025, 3, 1, 9, 30, 15, tzinfo=datetime.timezone.utc),
+            "label": gettext_lazy("대출가능"),
+            "marc": {"245": "$a도서관 역사", "300": None},
+            "counts": {1: 2},
+            "results": [{"id": 1, "is_liked": True}],
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_django_encoder_formats(self):
+        """Decimal/마이크로초는 DjangoJSONEncoder 형식 테스트"""
+        data = {
+            "fine": Decimal("1.50"),
+            "at": datetime.datetime(2025, 3, 1, 9, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), b'{"fine":"1.50","at":"2025-03-01T09:30:15.123Z"}')
+
+    def test_parser(self):
+        """JSON 요청 파싱 테스트"""
+        user = get_user_model().objects.create_user(username="u1", password="pw1234!!", name="사용자")
+        self.client.force_authenticate(user)
+        Book.objects.create(book_code="B001", title="도서관 역사")
+        response = self.client.post("/books/lookup/", {"book_code": ["B001"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["book_code"]["B001"]), 1)
+
+        response = self.client.post("/books/lookup/", b"{broken", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookCursorPaginationTest(APITestCase):
+    """목록 keyset 커서 페이지네이션 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.books = [Book.objects.create(book_code=f"B{i:03d}", title=f"도서관 {i}") for i in range(5)]
+        Book.objects.create(book_code="B100", title="도서관 0", isbn="9788937460449")
+        Book.objects.create(book_code="B101", title="도서관 0", isbn="9788937460449")
+
+    def walk(self, params):
+        pages, url = [], "/books/"
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url, params if url == "/books/" else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertFalse([q for q in ctx.captured_queries if "OFFSET" in q["sql"]])
+            pages.append([row["id"] for row in response.data["results"]])
+            url = response.data["next"]
+        return pages
+
+    def test_walk_pages(self):
+        """id 역순으로 모든 페이지 순회 테스트"""
+        pages = self.walk({"size": 3})
+        ids = sorted(Book.objects.values_list("pk", flat=True), reverse=True)
+        self.assertEqual(pages, [ids[:3], ids[3:6], ids[6:]])
+
+    def test_collapse_pages(self):
+        """표제 단위 목록 순회 테스트"""
+        pages = self.walk({"size": 2, "collapse": "true"})
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), sorted(sum(pages, []), reverse=True))
+
+    def test_search_ranked_pages(self):
+        """검색은 관련도 순 커서로 순회 테스트"""
+        expected = [row["id"] for row in self.client.get("/books/", {"search": "도서관", "size": 100}).data["results"]]
+        pages = self.walk({"search": "도서관", "size": 3})
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_search_collapse_pages(self):
+        """검색 + 표제 단위 커서 순회 테스트"""
+        pages = self.walk({"search": "도서관", "size": 2, "collapse": "true"})
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(len(set(sum(pages, []))), 6)
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                   BOOK_CACHE_ALLOW_LOCAL=True)
+class BookAvailabilityTest(APITestCase):
+    """소장 상태 일괄 조회 테스트"""
+
+    def setUp(self):
+        availability._cache().clear()
+        self.addCleanup(availability._cache().clear)
+        User = get_user_model()
+        self.user = User.objects.create_user(username="u1", password="pw1234!!", name="사용자1")
+        self.other = User.objects.create_user(username="u2", password="pw1234!!", name="사용자2")
+        self.due = timezone.localdate() + timedelta(days=7)
+        self.free = Book.objects.create(book_code="B001", title="도서관 역사", location="과실")
+        self.rented = Book.objects.create(book_code="B002", title="문헌정보학 개론", location="과실",
+                                          book_status="RENTED")
+        self.elsewhere = Book.objects.create(book_code="B003", title="도서관 경영", location="열람실")
+        Rental.objects.create(user=self.user, book=self.rented, due_date=self.due)
+        Rental.objects.create(user=self.user, book=self.free, due_date=self.due, is_returned=True,
+                              return_date=timezone.localdate())
+        Reservation.objects.create(user=self.user, book=self.rented)
+        Reservation.objects.create(user=self.other, book=self.rented)
+        Reservation.objects.create(user=self.other, book=self.free, status=ReservationStatus.CANCELED,
+                                   cancel_date=timezone.now())
+
+    def test_by_ids(self):
+        """id 목록으로 상태/반납예정일/대기 수 조회 테스트"""
+        with self.assertNumQueries(1):
+            response = self.client.get("/books/availability/", {"ids": f"{self.rented.id},{self.free.id}"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            "fields": ["id", "book_status", "due_date", "queue_length"],
+            "results": [[self.free.id, "AVAILABLE", None, 0], [self.rented.id, "RENTED", self.due.isoformat(), 2]],
+        })
+
+    def test_by_location_cached(self):
+        """위치로 조회, 같은 조회는 캐시 응답 테스트"""
+        self.client.get("/books/availability/", {"location": "과실"})
+        with self.assertNumQueries(0):
+            response = self.client.get("/books/availability/", {"location": "과실"})
+        self.assertEqual([row[0] for row in response.data["results"]], [self.free.id, self.rented.id])
+
+    def test_local_cache_disabled(self):
+        """프로세스별 메모리 캐시면 매번 조회 테스트"""
+        with override_settings(BOOK_CACHE_ALLOW_LOCAL=False):
+            self.client.get("/books/availability/", {"location": "과실"})
+            with self.assertNumQueries(1):
+                self.client.get("/books/availability/", {"location": "과실"})
+
+    def test_packed(self):
+        """packed 형식 테스트"""
+        response = self.client.get("/books/availability/", {"location": "과실", "packed": "1"})
+        data = response.json()
+        self.assertEqual(data["rows"], [
+            self.free.id, data["statuses"].index("AVAILABLE"), None, 0,
+            self.rented.id, data["statuses"].index("RENTED"), self.due.isoformat(), 2,
+        ])
+
+    def test_invalid_params(self):
+        """파라미터 오류 테스트"""
+        for params in ({}, {"ids": "1,a"}, {"ids": ",".join(map(str, range(availability.MAX_IDS + 1)))}):
+            response = self.client.get("/books/availability/", params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BookChangeFeedTest(APITestCase):
+    """변경 피드 테스트"""
+
+    def setUp(self):
+        self.client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book = Book.objects.create(book_code="B001", title="도서관 역사")
+            self.other = Book.objects.create(book_code="B002", title="문헌정보학 개론")
+        self.seq = BookChange.objects.latest("pk").pk
+
+    def feed(self, since, **params):
+        response = self.client.get("/books/changes/", {"since": since, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_upserts_and_deletes(self):
+        """seq 이후 수정/관련 행 변경/삭제만 반환 테스트"""
+        self.assertEqual(self.feed(self.seq), {"seq": self.seq, "more": False, "upserts": [], "deletes": []})
+
+        other_id = self.other.id
+        with self.captureOnCommitCallbacks(execute=True):
+            Marc.objects.create(book=self.book, field_245="$a도서관 역사")
+            Curation.objects.create(book=self.book, field_500_curation="추천")
+            self.other.delete()
+        data = self.feed(self.seq, fields="id,title")
+        self.assertEqual(data["upserts"], [{"id": self.book.id, "title": "도서관 역사"}])
+        self.assertEqual(data["deletes"], [other_id])
+        self.assertEqual(data["seq"], BookChange.objects.latest("pk").pk)
+        self.assertEqual(self.feed(data["seq"])["upserts"], [])
+
+    def test_limit(self):
+        """limit 단위로 이어 받기 테스트"""
+        start = self.seq - 2 # setUp에서 만든 두 도서 앞
+        data = self.feed(start, limit=1)
+        self.assertTrue(data["more"])
+        self.assertEqual([row["id"] for row in data["upserts"]], [self.book.id])
+        data = self.feed(data["seq"], limit=1)
+        self.assertFalse(data["more"])
+        self.assertEqual([row["id"] for row in data["upserts"]], [self.other.id])
+
+        with override_settings(FAST_LIST_SERIALIZATION=True):
+            fast = self.feed(start)
+        self.assertEqual(fast, self.feed(start))
+
+    def test_rollback_not_recorded(self):
+        """롤백된 변경은 기록하지 않음 테스트"""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.book.title = "도서관 역사 2판"
+                    self.book.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.feed(self.seq)["upserts"], [])
+
+    def test_unsettled_gap(self):
+        """앞 순번이 아직 보이지 않으면 seq를 그 앞에서 멈춤 테스트"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "도서관 역사 2판"
+            self.book.save()
+            self.other.title = "문헌정보학 개론 2판"
+            self.other.save()
+        first, second = BookChange.objects.filter(pk__gt=self.seq).order_by("pk")
+        # first가 아직 커밋되지 않은 상황
+        first.delete()
+        data = self.feed(self.seq)
+        self.assertEqual([row["id"] for row in data["upserts"]], [self.other.id])
+        self.assertEqual(data["seq"], self.seq)
+
+        # 오래된 빈 id는 롤백된 것으로 보고 넘어감
+        BookChange.objects.filter(pk=second.pk).update(changed_at=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.feed(self.seq)["seq"], second.pk)
+
+    def test_prune(self):
+        """오래된 변경 기록 정리, floor 미만 since는 410 테스트"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.book.title = "도서관 역사 2판"
+            self.book.save()
+            other_id = self.other.id
+            self.other.delete()
+        old_seq = BookChange.objects.latest("pk").pk
+        BookChange.objects.update(changed_at=timezone.now() - timedelta(days=40))
+        with self.captureOnCommitCallbacks(execute=True):
+            Curation.objects.create(book=self.book, field_500_curation="추천")
+
+        call_command("prune_book_changes", days=30, stdout=io.StringIO())
+        # 도서마다 최신 행만, 오래된 삭제 기록은 지움
+        self.assertEqual(list(BookChange.objects.values_list("book_id", flat=True)), [self.book.id])
+        self.assertEqual(changes.floor_seq(), old_seq)
+
+        # 삭제 기록이 지워진 구간 앞에서 이어 받으려는 클라이언트
+        response = self.client.get("/books/changes/", {"since": self.seq})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+        self.assertEqual([row["id"] for row in self.feed(0)["upserts"]], [self.book.id])
+        self.assertEqual(self.feed(old_seq)["deletes"], [])
+        self.assertNotIn(other_id, self.feed(0)["deletes"])
+
+    def test_invalid_since(self):
+        """since 오류 테스트"""
+        response = self.client.get("/books/changes/", {"since": "a"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
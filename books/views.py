@@ -1,3 +1,6 @@
+import time
+
+from django.conf import settings
 from django.shortcuts import render
 from django.core.exceptions import ValidationError
 from rest_framework.decorators import action
@@ -5,11 +8,24 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 from rest_framework import status, viewsets, filters, permissions, serializers
-from .models import Book, BookStatus
+from django.db.models import F, OuterRef, Subquery
+from .models import Book, BookContributor, BookSeries, BookStatus, BookSubject, Contributor, Series, Subject
 from reservations.models import Reservation
-from .serializers import BookSerializer, BookDetailSerializer
+from .serializers import (
+    BookSerializer, BookDetailSerializer, BookLookupSerializer, ContributorSerializer, SeriesSerializer,
+    SubjectSerializer, WorkSerializer, liked_book_ids, parse_list_param, sparse_detail,
+)
+from .headings import normalize_heading
+from .likes import toggle_like
+from .lookup import lookup_books
+from . import availability, cache as detail_cache, changes, conditional, querylog, rows
+from .facets import filtered_counts, unfiltered_counts
 from reservations.serializers import ReservationSerializer
-from .filters import MinLengthSearchFilter
+from .filters import BM25RankingFilter, NgramSearchFilter
+from .pagination import RankedSearchPagination, ShelfPagination
+from .rows import RowMapper
+from .suggest import MAX_LIMIT, suggest
+from .works import collapse_works, with_representatives
 
 
 # Create your views here.
@@ -18,18 +34,13 @@ class BookLikedView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, book_id):
-        try:
-            book = Book.objects.get(id=book_id)
-        except Book.DoesNotExist:
+        # 좋아요 행 삭제 또는 추가 + like_count 갱신 (한 트랜잭션)
+        liked = toggle_like(book_id, request.user.pk)
+        if liked is None:
             return Response({"detail": "책을 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-
-        user = request.user
-        if book.liked_users.filter(pk=user.pk).exists():
-            book.liked_users.remove(user)
+        if not liked:
             return Response({"message": "좋아요 취소됨"}, status=status.HTTP_200_OK)
-        else:
-            book.liked_users.add(user)
-            return Response({"message": "좋아요 등록됨"}, status=status.HTTP_201_CREATED)
+        return Response({"message": "좋아요 등록됨"}, status=status.HTTP_201_CREATED)
 
 # 목록 + 상세
 class BookViewSet(viewsets.ModelViewSet):
@@ -38,14 +49,365 @@ class BookViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     # filter_backends = [filters.SearchFilter]
-    filter_backends = [MinLengthSearchFilter]
+    # filter_backends = [MinLengthSearchFilter]
+    filter_backends = [NgramSearchFilter, BM25RankingFilter] # n-gram 색인 검색 + BM25 정렬
     search_fields = ['=isbn', '=issn', '=book_code','title', 'author', '^publisher']
+    pagination_class = RankedSearchPagination # 검색 시 상위 k건만
+
+    # 표목 필터: 파라미터 -> (연결 모델, 표목 FK)
+    HEADING_FILTERS = {
+        "subject": (BookSubject, "subject"),
+        "series": (BookSeries, "series"),
+        "contributor": (BookContributor, "contributor"),
+    }
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+
+        # 주제명/총서/부출 표목 필터 (?subject=, ?series=, ?contributor= <id 또는 표목>)
+        # 목록(과 같은 조건의 변경 피드)에만 적용, 상세/수정/삭제는 도서 id만으로 찾는다
+        if self.action in ("list", "change_feed"):
+            qs = self.filter_headings(qs)
+
+        # 출력할 필드의 컬럼만 읽기 (?fields=)
+        if self.action in ("list", "retrieve", "change_feed") and not self._flag("collapse"):
+            fields, _ = self.sparse_params()
+            columns = self.get_serializer_class().columns(fields)
+            if self.action == "retrieve":
+                columns += ["updated_at", "version"] # ETag/Last-Modified
+            if any(c.startswith("marc__") for c in columns):
+                qs = qs.select_related("marc")
+            qs = qs.only(*columns)
+        return qs
+
+    def filter_headings(self, qs):
+        for param, (link_model, fk) in self.HEADING_FILTERS.items():
+            value = self.request.query_params.get(param, "").strip()
+            if not value:
+                continue
+            links = link_model.objects.all()
+            if value.isdigit():
+                links = links.filter(**{f"{fk}_id": int(value)})
+            else:
+                links = links.filter(**{f"{fk}__normalized": normalize_heading(value)})
+            qs = qs.filter(pk__in=links.values("book_id"))
+        return qs
+
+    def sparse_params(self):
+        # (?fields= 목록, ?marc_tags= 목록), 없는 필드 이름이면 400
+        fields = parse_list_param(self.request.query_params.get("fields"))
+        marc_tags = parse_list_param(self.request.query_params.get("marc_tags"))
+        if fields:
+            serializer_class = WorkSerializer if self._flag("collapse") else self.get_serializer_class()
+            unknown = set(fields) - set(serializer_class.field_names())
+            if unknown:
+                raise serializers.ValidationError({"fields": f"알 수 없는 필드: {', '.join(sorted(unknown))}"})
+        return fields, marc_tags
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action in ("list", "retrieve", "change_feed"):
+            context["fields"], context["marc_tags"] = self.sparse_params()
+        return context
+
+    def _flag(self, name: str) -> bool:
+        return self.request.query_params.get(name, "").lower() in ("1", "true", "t", "yes", "y")
+
+    # ?facets=true: 결과와 함께 패싯별 개수 반환
+    # ?collapse=true: 복본을 표제 단위로 묶어 복본 수/대출가능 수와 함께 반환
+    # If-None-Match가 맞으면 직렬화 없이 304 (목록은 Last-Modified 없음, books/conditional.py)
+    def list(self, request, *args, **kwargs):
+        # 검증값은 데이터보다 먼저 읽는다 (그 사이 변경은 다음 요청에서 ETag가 달라짐)
+        etag = conditional.list_etag(request)
+        response = conditional.not_modified(request, etag, None)
+        if response is None:
+            response = self._list(request, self.filter_queryset(self.get_queryset()))
+            # 검색 결과가 없으면 오타 허용 검색 (첫 페이지가 비었는지로 판단, COUNT/EXISTS 없음)
+            fallback = getattr(self, "fuzzy_fallback", None)
+            if fallback and not response.data["results"] and "cursor" not in request.query_params:
+                queryset = fallback()
+                if queryset is not None:
+                    response = self._list(request, queryset)
+            conditional.set_validators(response, etag, None)
+        return response
+
+    def _list(self, request, queryset):
+        with_facets, collapse = self._flag("facets"), self._flag("collapse")
+        facets = None
+        if with_facets:
+            # 조건이 하나도 없는 목록만 미리 집계된 값 사용 (검색, 표목 등 어떤 필터든 걸리면 직접 센다)
+            filtered = bool(queryset.query.where)
+            facets = filtered_counts(queryset) if filtered else unfiltered_counts()
+
+        serializer_class = self.get_serializer_class()
+        if collapse:
+            queryset, serializer_class = collapse_works(queryset), WorkSerializer
+        context = self.get_serializer_context()
+
+        if rows.enabled() and not collapse:
+            # values() 행을 바로 dict로 (settings.FAST_LIST_SERIALIZATION)
+            mapper = RowMapper(serializer_class, context)
+            # 검색 결과는 커서에 점수가 필요
+            extra = ("relevance",) if "relevance" in queryset.query.annotations else ()
+            queryset = mapper.values(queryset, *extra)
+            serialize = lambda items: self._fast_serialize(mapper, items)
+        elif collapse:
+            serialize = lambda items: serializer_class(with_representatives(items), many=True, context=context).data
+        else:
+            serialize = lambda items: serializer_class(items, many=True, context=context).data
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(serialize(page))
+            if with_facets:
+                response.data["facets"] = facets
+            return response
+        data = serialize(queryset)
+        if not with_facets:
+            return Response(data, status=status.HTTP_200_OK)
+        return Response({"results": data, "facets": facets}, status=status.HTTP_200_OK)
+
+    def _fast_serialize(self, mapper, items):
+        # BookListSerializer처럼 페이지의 좋아요 여부를 한 번에 조회
+        items = list(items)
+        mapper.context["liked_ids"] = liked_book_ids(self.request, [r[mapper.pk_key] for r in items])
+        return mapper(items)
+
+    # 상세: book id + 버전 키로 응답 캐시 (변경 시 books/cache.py에서 버전 증가)
+    # 캐시에 검증값도 함께 두어 적중 시 DB 조회 없이 304 판단
+    def retrieve(self, request, *args, **kwargs):
+        pk = str(kwargs.get(self.lookup_url_kwarg or self.lookup_field, ""))
+        if not pk.isdigit():
+            return super().retrieve(request, *args, **kwargs)
+
+        fields, marc_tags = self.sparse_params()
+        cached, ver = detail_cache.get_detail(pk)
+        if cached is not None:
+            etag, last_modified = cached["etag"], cached["last_modified"]
+            response = conditional.not_modified(request, etag, last_modified)
+            if response is None:
+                response = Response(sparse_detail(cached["data"], fields, marc_tags), status=status.HTTP_200_OK)
+            return conditional.set_validators(response, etag, last_modified)
+
+        book = self.get_object()
+        etag, last_modified = conditional.book_validators(book)
+        response = conditional.not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        data = self.get_serializer(book).data
+        # 전체 응답만 캐시 (일부 필드 응답은 캐시된 전체 응답에서 잘라 쓴다)
+        if not (fields or marc_tags):
+            detail_cache.set_detail(pk, ver, {"data": data, "etag": etag, "last_modified": last_modified})
+        return conditional.set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
+
+    # 상세 캐시 적중/실패 수 (관리자)
+    @action(detail=False, methods=["get"], url_path="cache-stats", permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        return Response(detail_cache.stats(), status=status.HTTP_200_OK)
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return BookDetailSerializer
         return BookSerializer
+
+    # 인기 도서 (좋아요 많은 순, idx_book_popular 인덱스 순서로 상위 limit건)
+    @action(detail=False, methods=["get"], url_path="popular")
+    def popular(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 20)), 100))
+        except ValueError:
+            limit = 20
+        books = Book.objects.filter(like_count__gt=0).order_by("-like_count", "id")[:limit]
+        return Response(BookSerializer(books, many=True, context=self.get_serializer_context()).data,
+                        status=status.HTTP_200_OK)
+
+    # 서가 순서 둘러보기 (?from=<청구기호>, 앞뒤 이동은 next/previous 커서)
+    @action(detail=False, methods=["get"], url_path="shelf")
+    def shelf(self, request):
+        paginator = ShelfPagination()
+        page = paginator.paginate_queryset(self.get_queryset(), request, view=self)
+        serializer = BookSerializer(page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    # 장서번호/ISBN/ISSN 일괄 조회 (입력 코드별 결과, 종류별 IN 쿼리)
+    @action(detail=False, methods=["post"], url_path="lookup")
+    def lookup(self, request):
+        params = BookLookupSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+
+        found = {
+            field: lookup_books(self.get_queryset(), field, codes)
+            for field, codes in params.validated_data.items()
+        }
+        # 좋아요 여부는 전체 결과에 대해 한 번만 조회
+        book_ids = {book.pk for by_code in found.values() for books in by_code.values() for book in books}
+        context = self.get_serializer_context()
+        context["liked_ids"] = liked_book_ids(request, book_ids)
+
+        results = {
+            field: {code: BookSerializer(books, many=True, context=context).data for code, books in by_code.items()}
+            for field, by_code in found.items()
+        }
+        return Response(results, status=status.HTTP_200_OK)
+
+    def _browse(self, qs, serializer_class, default_limit=50):
+        # 표목 목록 공통: ?q=앞부분 일치, 권수 많은 순
+        q = self.request.query_params.get("q", "").strip()
+        if q:
+            qs = qs.filter(normalized__startswith=normalize_heading(q))
+        try:
+            limit = max(1, min(int(self.request.query_params.get("limit", default_limit)), 200))
+        except ValueError:
+            limit = default_limit
+
+        # 권수는 표목 행에 저장된 값 (books/headings.py), (-book_count, name) 인덱스 순서
+        qs = qs.filter(book_count__gt=0).order_by("-book_count", "name")[:limit]
+        return Response(serializer_class(qs, many=True).data, status=status.HTTP_200_OK)
+
+    # 주제명 목록 (권수 많은 순, ?q=앞부분 일치, ?tag=650)
+    @action(detail=False, methods=["get"], url_path="subjects")
+    def subjects(self, request):
+        qs = Subject.objects.all()
+        tag = request.query_params.get("tag", "").strip()
+        if tag:
+            qs = qs.filter(tag=tag)
+        return self._browse(qs, SubjectSerializer)
+
+    # 총서 목록 (?q=앞부분 일치)
+    @action(detail=False, methods=["get"], url_path="series")
+    def series(self, request):
+        return self._browse(Series.objects.all(), SeriesSerializer)
+
+    # 부출 표목 목록 (?q=앞부분 일치, ?tag=700|710)
+    @action(detail=False, methods=["get"], url_path="contributors")
+    def contributors(self, request):
+        qs = Contributor.objects.all()
+        tag = request.query_params.get("tag", "").strip()
+        if tag:
+            qs = qs.filter(tag=tag)
+        return self._browse(qs, ContributorSerializer)
+
+    # 같은 총서/부출 표목의 다른 도서 (상세 화면용, ?limit=는 구역마다 따로 적용)
+    @action(detail=True, methods=["get"], url_path="related")
+    def related(self, request, pk=None):
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), 50))
+        except ValueError:
+            limit = 10
+        book = self.get_object()
+
+        series_ids = BookSeries.objects.filter(book_id=book.pk).values("series_id")
+        contributor_ids = BookContributor.objects.filter(book_id=book.pk).values("contributor_id")
+        series_books = BookSeries.objects.filter(series_id__in=series_ids).values("book_id")
+        same_series = BookSeries.objects.filter(book_id=OuterRef("pk"), series_id__in=series_ids)
+        columns = ("id", "title", "author", "callnumber", "image_url")
+
+        # 총서: 권차 순, 부출 표목: 총서에 이미 나온 도서는 빼고 id 순
+        in_series = (
+            Book.objects.filter(pk__in=series_books).exclude(pk=book.pk)
+            .annotate(volume_no=Subquery(same_series.order_by("volume_no").values("volume_no")[:1]))
+            .order_by(F("volume_no").asc(nulls_last=True), "pk")
+            .values(*columns)[:limit]
+        )
+        by_contributor = (
+            Book.objects
+            .filter(pk__in=BookContributor.objects.filter(contributor_id__in=contributor_ids).values("book_id"))
+            .exclude(pk=book.pk).exclude(pk__in=series_books)
+            .order_by("pk")
+            .values(*columns)[:limit]
+        )
+
+        related = {"series": list(in_series), "contributor": list(by_contributor)}
+        for row in related["series"] + related["contributor"]:
+            row["image_url"] = row["image_url"] or settings.DEFAULT_BOOK_IMAGE_URL
+        return Response(related, status=status.HTTP_200_OK)
+
+    def initial(self, request, *args, **kwargs):
+        self.started_at = time.perf_counter()
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # 검색어 기록 (정규화한 검색어, 응답 시간, 캐시 적중 여부)
+        if self.action == "list" and hasattr(self, "started_at"):
+            terms = filters.SearchFilter().get_search_terms(request)
+            if terms:
+                elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+                querylog.record(querylog.normalize_query(terms), elapsed_ms,
+                                getattr(self, "search_cache_hit", False))
+        # 오타 허용 검색으로 대체된 경우 표시
+        fallback = getattr(self, "search_fallback", None)
+        if fallback:
+            response["X-Search-Fallback"] = fallback
+        return response
+
+    # 자동완성 (DB 조회 없이 메모리 색인에서 응답)
+    @action(detail=False, methods=["get"], url_path="suggest",
+            permission_classes=[permissions.AllowAny], authentication_classes=[])
+    def suggest(self, request):
+        q = request.query_params.get("q", "").strip()
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 10)), MAX_LIMIT))
+        except ValueError:
+            limit = 10
+
+        results = [{"type": kind, "text": text} for kind, text in suggest(q, limit)] if q else []
+        return Response({"query": q, "results": results}, status=status.HTTP_200_OK)
     
+    # 변경 피드: seq 이후 바뀐 도서(목록과 같은 형식)와 삭제된 도서 id (?since=<seq>, ?limit=, ?fields=)
+    # 응답의 seq를 다음 since로 넘기고, more가 false가 될 때까지 반복
+    # 아직 커밋되지 않은 앞 순번이 있을 수 있으면 seq는 그 앞에서 멈춘다 (다음 요청에서 일부를 다시 받음, books/changes.py)
+    # since가 정리된 구간(floor seq 미만)이면 410: 목록 캐시를 비우고 since=0부터 다시 받는다
+    @action(detail=False, methods=["get"], url_path="changes")
+    def change_feed(self, request):
+        try:
+            since = max(0, int(request.query_params.get("since", 0)))
+            limit = max(1, min(int(request.query_params.get("limit", 500)), changes.MAX_LIMIT))
+        except ValueError:
+            return Response({"detail": "since, limit은 숫자만 가능합니다."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if since and since < changes.floor_seq():
+            return Response({"detail": "오래된 변경 기록이 정리되었습니다. since=0부터 다시 받아야 합니다."},
+                            status=status.HTTP_410_GONE)
+
+        seq, more, latest = changes.changes_since(since, limit)
+        # 삭제됐거나 지금은 조회 조건(?subject= 등)에 맞지 않는 도서는 deletes로
+        queryset = self.get_queryset().filter(pk__in=[pk for pk, deleted in latest.items() if not deleted])
+        found = set(queryset.values_list("pk", flat=True)) if latest else set()
+        deletes = sorted(set(latest) - found)
+
+        queryset = queryset.order_by("pk")
+        context = self.get_serializer_context()
+        if not found:
+            upserts = []
+        elif rows.enabled():
+            mapper = RowMapper(BookSerializer, context)
+            upserts = self._fast_serialize(mapper, mapper.values(queryset))
+        else:
+            upserts = BookSerializer(queryset, many=True, context=context).data
+        return Response({"seq": seq, "more": more, "upserts": upserts, "deletes": deletes}, status=status.HTTP_200_OK)
+
+    # 소장 상태 일괄 조회 (?ids=1,2,3 또는 ?location=, ?packed=1이면 한 배열로 압축)
+    @action(detail=False, methods=["get"], url_path="availability",
+            permission_classes=[permissions.AllowAny], authentication_classes=[])
+    def bulk_availability(self, request):
+        ids = parse_list_param(request.query_params.get("ids"))
+        location = request.query_params.get("location", "").strip() or None
+        if ids is None and location is None:
+            return Response({"detail": "ids 또는 location이 필요합니다."}, status=status.HTTP_400_BAD_REQUEST)
+        if ids is not None:
+            if not all(v.isdigit() for v in ids):
+                return Response({"detail": "ids는 숫자만 가능합니다."}, status=status.HTTP_400_BAD_REQUEST)
+            if len(ids) > availability.MAX_IDS:
+                return Response({"detail": f"ids는 최대 {availability.MAX_IDS}개입니다."},
+                                status=status.HTTP_400_BAD_REQUEST)
+            ids = [int(v) for v in ids]
+
+        entries = availability.availability(ids, location)
+        if self._flag("packed"):
+            return Response(availability.pack(entries), status=status.HTTP_200_OK)
+        return Response({"fields": list(availability.FIELDS), "results": entries}, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated], url_path="reserve")
     def reserve(self, request, pk=None):
         book = self.get_object()
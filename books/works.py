@@ -0,0 +1,92 @@
+# 표제(저작) 단위 묶기
+# Book 한 행은 복본 하나(장서등록번호)이므로, ISBN 또는 표제/저자로 만든 work_key로 같은 책을 묶는다.
+
+import hashlib
+
+from django.db.models import CharField, Count, F, Max, Min, Q
+from django.db.models.functions import Cast, Coalesce
+
+from .marc import clean_isbn
+from .search import tokenize
+
+# work_key 계산에 쓰는 필드 (변경 시 다시 계산)
+WORK_KEY_FIELDS = ("isbn", "title", "author")
+# 묶음 행 이름 -> 대표 도서 컬럼
+WORK_COLUMNS = {
+    "work_title": "title",
+    "work_author": "author",
+    "work_publisher": "publisher",
+    "work_isbn": "isbn",
+    "work_image_url": "image_url",
+}
+
+
+def isbn13(isbn: str | None) -> str | None:
+    # ISBN-10은 ISBN-13으로 바꿔 같은 책이 같은 키를 갖도록
+    isbn = clean_isbn(isbn)
+    if not isbn:
+        return None
+    isbn = isbn.upper()
+    if len(isbn) == 10:
+        body = "978" + isbn[:9]
+        check = (10 - sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(body)) % 10) % 10
+        return f"{body}{check}"
+    return isbn if len(isbn) == 13 and isbn.isdigit() else None
+
+
+def work_key(isbn: str | None, title: str | None, author: str | None) -> str | None:
+    # "isbn:9788..." 또는 "ta:<표제/저자 해시>"
+    normalized = isbn13(isbn)
+    if normalized:
+        return f"isbn:{normalized}"
+    title = " ".join(tokenize(title))
+    if not title:
+        return None
+    author = " ".join(tokenize(author))
+    digest = hashlib.sha1(f"{title}\x1f{author}".encode("utf-8")).hexdigest()
+    return f"ta:{digest}"
+
+
+def collapse_works(queryset):
+    # 표제별 한 행: 대표 도서 id(묶음에서 가장 작은 id) + 복본 수 + 대출가능 수 (집계 쿼리 한 번)
+    # 서지 컬럼은 컬럼별 Max()로 고르면 여러 복본 값이 섞이므로, 페이지를 자른 뒤 with_representatives()로 채운다
+    from .models import BookStatus
+
+    # work_key가 없는 도서는 자기 자신만으로 묶음
+    group = Coalesce("work_key", Cast("pk", output_field=CharField()), output_field=CharField())
+    ranked = "relevance" in queryset.query.annotations
+
+    rows = (
+        queryset.order_by()
+        .annotate(group_key=group)
+        .values("group_key")
+        .annotate(
+            book_id=Min("pk"),
+            copy_count=Count("pk"),
+            available_count=Count("pk", filter=Q(book_status=BookStatus.AVAILABLE)),
+        )
+    )
+    # 검색 시 묶음 안에서 가장 높은 BM25 점수 순
+    if ranked:
+        rows = rows.annotate(work_relevance=Max("relevance")).order_by(
+            F("work_relevance").desc(nulls_last=True), "book_id"
+        )
+    else:
+        rows = rows.order_by("book_id")
+    return rows
+
+
+def with_representatives(rows) -> list:
+    # 묶음 행마다 대표 도서 한 권의 서지 컬럼을 채운다 (페이지 단위 쿼리 한 번)
+    from .models import Book
+
+    rows = list(rows)
+    columns = {
+        book["id"]: book
+        for book in Book.objects.filter(pk__in=[row["book_id"] for row in rows]).values("id", *WORK_COLUMNS.values())
+    }
+    for row in rows:
+        book = columns.get(row["book_id"], {})
+        for name, column in WORK_COLUMNS.items():
+            row[name] = book.get(column)
+    return rows
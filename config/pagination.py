@@ -0,0 +1,13 @@
+# 목록 keyset 커서 페이지네이션 (뷰마다 pagination_class로 지정: 대출/예약/리뷰, 도서 목록은 books.pagination)
+# 응답은 {next, previous, results}
+# 인덱스가 있는 정렬 컬럼 기준 keyset 커서: WHERE id < 마지막 id ORDER BY id DESC LIMIT size+1
+# OFFSET/COUNT(*)가 없어 깊은 페이지도 첫 페이지와 비용이 같다.
+
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetCursorPagination(CursorPagination):
+    ordering = "-id" # PK 인덱스 (최근 생성 순)
+    page_size = 20
+    page_size_query_param = "size"
+    max_page_size = 100
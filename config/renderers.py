@@ -0,0 +1,38 @@
+# orjson 기반 JSON 렌더러
+# DRF 기본 JSONRenderer(표준 json)보다 빠르게 직렬화한다. 목록/상세(MARC JSON) 응답 크기가 커서 차이가 크다.
+# orjson이 모르는 값(Decimal, 날짜/시간, 지연 번역 문자열 등)은 DjangoJSONEncoder와 같은 방식으로 바꾼다.
+# orjson이 설치되어 있지 않거나 들여쓰기를 요청하면(브라우저블 API 등) 기본 렌더러로 동작한다.
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models.query import QuerySet
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError: # pragma: no cover
+    orjson = None
+
+_django_encoder = DjangoJSONEncoder()
+
+
+def default(obj):
+    # orjson이 직접 처리하지 못하는 값
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    return _django_encoder.default(obj) # datetime/date/time/timedelta/Decimal/UUID/Promise, 그 외는 TypeError
+
+
+class ORJSONRenderer(JSONRenderer):
+    # 날짜/시간은 default()로 넘겨 DjangoJSONEncoder와 같은 형식(밀리초, "+00:00" -> "Z")으로 출력
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = orjson.dumps(data, default=default, option=self.options)
+        # JSONRenderer와 같이 U+2028/U+2029는 이스케이프 (JSONP/스크립트 삽입 대비)
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
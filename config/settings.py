@@ -143,6 +143,25 @@ DATABASES = {
 	}
 }
 
+# 캐시 (도서 상세 응답, 소장 상태, 인기 검색어)
+# 무효화(버전 증가)가 모든 웹 워커와 관리 명령(import_books 등)에 닿아야 하므로 Redis를 함께 쓴다.
+# REDIS_URL이 없으면(로컬) 프로세스별 메모리 캐시이고, 이때 위 캐시들은 꺼진다. (books/cache.py shared_cache)
+REDIS_URL = secrets.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+            "KEY_PREFIX": "mungo",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -205,6 +224,16 @@ REST_FRAMEWORK = {
     "DEFAULT_THROTTLE_RATES": {
         "find_username": "5/min", # 1분당 5회 허용
     },
+    # orjson 기반 JSON 렌더러/파서 (orjson이 없으면 DRF 기본 동작)
+    "DEFAULT_RENDERER_CLASSES": [
+        "config.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "config.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 # REST_FRAMEWORK = {
 #     # 인증 방식
@@ -189,6 +189,12 @@ class RentalStatusListSerializer(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
+    # 메서드 필드가 읽는 컬럼 (books/rows.py의 values() 직렬화용)
+    sparse_columns = {
+        "is_overdue": ["return_date", "due_date"],
+        "overdue_days": ["return_date", "due_date"],
+    }
+
     def get_is_overdue(self, obj):
         base = obj.return_date or timezone.localdate()
         return base > obj.due_date
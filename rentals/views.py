@@ -3,6 +3,9 @@ from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db import transaction
 from django.utils import timezone
+from books import rows
+from books.rows import RowMapper
+from config.pagination import KeysetCursorPagination
 from .models import Rental
 from .serializers import (
     RentalSerializer, RentalCreateSerializer, RentalUpdateSerializer, RentalListSerializer, RentalStatusListSerializer
@@ -14,6 +17,7 @@ class IsAdminOrOwner(permissions.BasePermission):
 
 class RentalViewSet(viewsets.ModelViewSet):
     queryset = Rental.objects.all().select_related("user", "book")
+    pagination_class = KeysetCursorPagination # id 역순 커서 (OFFSET/COUNT(*) 없음)
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -76,9 +80,17 @@ class RentalViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["GET"], url_path="current")
     def current(self, request):
         qs = self.get_queryset().filter(is_returned=False).select_related("book")
-        page = self.paginate_queryset(qs)
         # ser_class = RentalListSerializer  # 목록 전용
         ser_class = RentalStatusListSerializer
+        if rows.enabled():
+            # values() 행을 바로 dict로 (모델 인스턴스 생성 없이)
+            mapper = RowMapper(ser_class, self.get_serializer_context())
+            qs = mapper.values(qs)
+            page = self.paginate_queryset(qs)
+            if page is not None:
+                return self.get_paginated_response(mapper(page))
+            return Response(mapper(qs), status=status.HTTP_200_OK)
+        page = self.paginate_queryset(qs)
         if page is not None:
             serializer = ser_class(page, many=True, context=self.get_serializer_context())
             return self.get_paginated_response(serializer.data)
@@ -1,6 +1,9 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from books import rows
+from books.rows import RowMapper
+from config.pagination import KeysetCursorPagination
 from .models import Reservation
 from .serializers import ReservationCreateSerializer, ReservationSerializer
 
@@ -11,6 +14,7 @@ class IsAdminOrOwner(permissions.BasePermission):
 
 class ReservationViewSet(viewsets.ModelViewSet):
     queryset = Reservation.objects.select_related("book", "user")
+    pagination_class = KeysetCursorPagination # id 역순 커서 (OFFSET/COUNT(*) 없음)
     
     def get_permissions(self):
         base = [permissions.IsAuthenticated()]
@@ -34,6 +38,17 @@ class ReservationViewSet(viewsets.ModelViewSet):
             return qs
         return qs.filter(user=self.request.user)
     
+    # 예약 목록: settings.FAST_LIST_SERIALIZATION이면 values() 행을 바로 dict로
+    def list(self, request, *args, **kwargs):
+        if not rows.enabled():
+            return super().list(request, *args, **kwargs)
+        mapper = RowMapper(ReservationSerializer, self.get_serializer_context())
+        qs = mapper.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(qs)
+        if page is not None:
+            return self.get_paginated_response(mapper(page))
+        return Response(mapper(qs), status=status.HTTP_200_OK)
+
     # 예약 생성
     def get_serializer_class(self):
         if self.action == "create":
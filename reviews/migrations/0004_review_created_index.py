@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 06:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('books', '0029_book_version'),
+        ('reviews', '0003_alter_review_options'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['created_at'], name='idx_review_created'),
+        ),
+    ]
@@ -19,6 +19,7 @@ class Review(models.Model):
     class Meta:
         unique_together = ('book', 'user')  # 한 사용자당 한 책에 하나의 리뷰만
         ordering = ['-created_at']  # 최신순으로 정렬
+        indexes = [models.Index(fields=["created_at"], name="idx_review_created")] # 최신순 커서 페이지네이션
         verbose_name = "Review"
         verbose_name_plural = "Reviews"
 
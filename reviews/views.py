@@ -2,6 +2,7 @@ from django.db.models import QuerySet
 from rest_framework import viewsets, permissions
 from rest_framework.filters import OrderingFilter, SearchFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from config.pagination import KeysetCursorPagination
 from .models import Review
 from .serializers import ReviewSerializer, ReviewCreateSerializer, ReviewUpdateSerializer
 
@@ -13,6 +14,7 @@ class IsOwnerOrReadOnly(permissions.BasePermission): # POST, PUT, PATCH, DELETE
 
 class ReviewViewSet(viewsets.ModelViewSet):
     queryset = Review.objects.select_related("user", "book").all()
+    pagination_class = KeysetCursorPagination # 최신순(created_at 인덱스) 커서
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
     serializer_class = ReviewSerializer
 